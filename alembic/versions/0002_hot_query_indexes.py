@@ -0,0 +1,60 @@
+"""hot query indexes
+
+Составные индексы под запросы, которые фильтруют по внешнему ключу
+и сортируют по (created_at, id): комментарии поста, лайки поста, подписки
+и подписчики, посты автора. На PostgreSQL строятся CONCURRENTLY — без
+блокировки записи в таблицы, поэтому вне транзакции миграции.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 11:52:40.118305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (имя, таблица, колонки, INCLUDE для PostgreSQL)
+INDEXES = (
+    ("ix_comments_post_created", "comments", ["post_id", "created_at", "id"], None),
+    ("ix_likes_post_user", "likes", ["post_id", "user_id"], None),
+    ("ix_follows_follower_created", "follows", ["follower_id", "created_at", "id"], ["user_id"]),
+    ("ix_follows_user_created", "follows", ["user_id", "created_at", "id"], ["follower_id"]),
+    ("ix_posts_owner_created", "posts", ["owner_id", "created_at", "id"], None),
+)
+
+
+def _concurrently() -> bool:
+    return op.get_context().dialect.name == "postgresql"
+
+
+def upgrade() -> None:
+    if not _concurrently():
+        for name, table, columns, _ in INDEXES:
+            op.create_index(name, table, columns, unique=False)
+        return
+    # CREATE INDEX CONCURRENTLY нельзя выполнять внутри транзакции;
+    # if_not_exists — чтобы перезапуск после прерванной сборки не падал
+    with op.get_context().autocommit_block():
+        for name, table, columns, include in INDEXES:
+            op.create_index(
+                name, table, columns, unique=False, if_not_exists=True,
+                postgresql_concurrently=True, postgresql_include=include or [],
+            )
+
+
+def downgrade() -> None:
+    if not _concurrently():
+        for name, table, _, _ in INDEXES:
+            op.drop_index(name, table_name=table)
+        return
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in INDEXES:
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
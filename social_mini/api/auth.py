@@ -3,7 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from social_mini import crud, database, schemas
-from social_mini.core.security import create_access_token, verify_password
+from social_mini.core.security import create_access_token, verify_password_async
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -20,63 +20,10 @@ async def login(
     db: AsyncSession = Depends(database.get_db)
 ):
     user = await crud.get_user_by_username(db, form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(status_code=400, detail="Incorrect username or password")
     access_token = create_access_token(
         data={"sub": user.username},
         expires_delta=timedelta(minutes=30)
     )
     return {"access_token": access_token, "token_type": "bearer"}
-
-# ---------- Получение текущего пользователя по JWT-токену ----------
-
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-
-from ..database import get_db
-from ..models.user import User
-
-try:  # SECRET_KEY
-    SECRET_KEY  # type: ignore[name-defined]
-except NameError:
-    SECRET_KEY = "supersecret"
-
-try:  # ALGORITHM
-    ALGORITHM  # type: ignore[name-defined]
-except NameError:
-    ALGORITHM = "HS256"
-
-try:  # oauth2_scheme
-    oauth2_scheme  # type: ignore[name-defined]
-except NameError:
-    oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
-
-
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db),
-) -> User:
-    """Достаём пользователя из JWT-токена."""
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-
-    result = await db.execute(select(User).where(User.id == int(user_id)))
-    user = result.scalar_one_or_none()
-    if user is None:
-        raise credentials_exception
-
-    return user
\ No newline at end of file
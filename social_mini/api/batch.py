@@ -0,0 +1,26 @@
+from fastapi import HTTPException, Query, status
+
+from social_mini.core import config
+
+
+def parse_ids(raw: list[str]) -> list[int]:
+    """Разбирает id из ?ids=1,2,3 (или ?ids=1&ids=2) и проверяет лимит BATCH_MAX_IDS."""
+    try:
+        ids = [int(part) for item in raw for part in item.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="ids must be integers")
+    check_batch_size(ids)
+    return ids
+
+
+def check_batch_size(ids: list[int]) -> None:
+    if len(ids) > config.BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many ids (max {config.BATCH_MAX_IDS})",
+        )
+
+
+def batch_ids(ids: list[str] = Query(..., description="id через запятую")) -> list[int]:
+    """Зависимость для GET-эндпоинтов вида /.../batch?ids=1,2,3."""
+    return parse_ids(ids)
@@ -0,0 +1,52 @@
+import hashlib
+
+from fastapi import Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from social_mini.core import config
+from social_mini.crud import versions
+from social_mini.database import is_replica
+
+# Ответ можно хранить, но перед использованием — переспросить с If-None-Match
+PUBLIC_REVALIDATE = "public, no-cache"
+# То же для ответов, зависящих от пользователя (liked_by_me)
+PRIVATE_REVALIDATE = "private, no-cache"
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    """Слабое сравнение ETag по RFC 9110: префикс W/ не учитывается."""
+    if if_none_match.strip() == "*":
+        return True
+    bare = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == bare for tag in if_none_match.split(","))
+
+
+async def not_modified(
+    request: Request,
+    response: Response,
+    scopes: list[str],
+    cache_control: str = PUBLIC_REVALIDATE,
+    vary: str = "",
+    extra_headers: dict | None = None,
+    db: AsyncSession | None = None,
+) -> Response | None:
+    """
+    Считает слабый ETag из версий коллекций (crud/versions.py) и параметров запроса.
+    Если клиент прислал тот же If-None-Match — возвращает готовый 304, и эндпоинт
+    отдаёт его, не трогая БД. Иначе ставит ETag и Cache-Control на будущий ответ.
+    vary — то, от чего ещё зависит тело (например, id пользователя).
+    db — сессия, из которой эндпоинт прочитает тело: если это реплика, а метка
+    моложе READ_YOUR_WRITES_SECONDS, ответ уходит без ETag.
+    """
+    stamps = [await versions.current(scope) for scope in scopes]
+    key = "|".join([*stamps, request.url.path, str(request.url.query), vary])
+    etag = 'W/"%s"' % hashlib.blake2b(key.encode(), digest_size=12).hexdigest()
+    headers = {"ETag": etag, "Cache-Control": cache_control, **(extra_headers or {})}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if db is not None and is_replica(db) and min(map(versions.stamp_age, stamps)) < config.READ_YOUR_WRITES_SECONDS:
+        # реплика могла ещё не догнать запись, поставившую метку
+        del headers["ETag"]
+    response.headers.update(headers)
+    return None
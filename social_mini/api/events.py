@@ -0,0 +1,117 @@
+from collections import deque
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from social_mini.core import config
+from social_mini.core.events import ALL_POSTS, author_channel, broker, post_channel, user_channel
+from social_mini.core.security import get_current_user_optional, optional_oauth2_scheme
+from social_mini.database import get_db
+from social_mini.models.follow import Follow
+from .batch import parse_ids
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+# через сколько браузерный EventSource переподключается после обрыва
+RETRY_MS = 3000
+PING = b": ping\n\n"
+
+
+def _lagged(dropped: int) -> bytes:
+    return f'event: lagged\ndata: {{"dropped":{dropped}}}\n\n'.encode()
+
+
+async def _stream(user_id: int, channels: list[str]):
+    """
+    Подписка живёт ровно столько, сколько генератор: finally срабатывает и при
+    обрыве соединения (отмена задачи), и при ошибке записи в сокет.
+    """
+    sub = broker.subscribe(channels)
+    reported = 0
+    # каналы новых постов, добавленные по ходу, — не больше EVENTS_NEW_POST_CHANNELS
+    new_posts: deque[str] = deque()
+    try:
+        yield f"retry: {RETRY_MS}\n\n".encode()
+        while True:
+            batch = await sub.next_batch(config.EVENTS_HEARTBEAT)
+            if batch is None:
+                # молчащее соединение прокси и балансировщики закрывают
+                yield PING
+                continue
+            for event in batch:
+                # сам подписался / отписался — сразу меняем набор авторов
+                if event.type.startswith("follow.") and event.data["follower_id"] == user_id:
+                    author = [author_channel(event.data["user_id"])]
+                    if event.type == "follow.created":
+                        broker.add_channels(sub, author)
+                    else:
+                        broker.remove_channels(sub, author)
+                # новый пост в ленте клиента — его лайки и комментарии тоже сюда,
+                # чтобы клиенту не переподключаться ради каждого поста
+                elif event.type == "post.created" and config.EVENTS_NEW_POST_CHANNELS > 0:
+                    channel = post_channel(event.data["id"])
+                    broker.add_channels(sub, [channel])
+                    new_posts.append(channel)
+                    if len(new_posts) > config.EVENTS_NEW_POST_CHANNELS:
+                        broker.remove_channels(sub, [new_posts.popleft()])
+                elif event.type == "post.deleted":
+                    channel = post_channel(event.data["id"])
+                    broker.remove_channels(sub, [channel])
+                    if channel in new_posts:
+                        new_posts.remove(channel)
+            chunk = b"".join(event.frame for event in batch)
+            if sub.dropped > reported:
+                # буфер переполнялся: клиент должен перечитать данные через REST
+                chunk = _lagged(sub.dropped - reported) + chunk
+                reported = sub.dropped
+            yield chunk
+    finally:
+        broker.unsubscribe(sub)
+
+
+@router.get("/stream")
+async def event_stream(
+    posts: list[str] = Query([], description="id постов через запятую: их лайки и комментарии"),
+    all_posts: bool = Query(False, description="все новые посты, а не только авторов из подписок"),
+    access_token: str | None = Query(None, description="для EventSource, который не умеет заголовки"),
+    token: str | None = Depends(optional_oauth2_scheme),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Server-sent events: новые посты авторов из подписок, лайки и комментарии
+    выбранных постов, подписки на текущего пользователя.
+
+    Соединение не держит ни сессию БД, ни задачу на сервере — только подписчика
+    брокера с ограниченным буфером. Отставший клиент получает событие lagged.
+    """
+    user = await get_current_user_optional(token or access_token, db)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if broker.subscribers >= config.EVENTS_MAX_CONNECTIONS:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many event streams",
+            headers={"Retry-After": str(RETRY_MS // 1000)},
+        )
+
+    post_ids = parse_ids(posts)
+    res = await db.execute(select(Follow.user_id).where(Follow.follower_id == user.id))
+    channels = [user_channel(user.id)]
+    channels += [author_channel(author_id) for author_id in res.scalars()]
+    channels += [post_channel(post_id) for post_id in post_ids]
+    if all_posts:
+        channels.append(ALL_POSTS)
+    # соединение с БД возвращаем в пул до начала стрима
+    await db.close()
+
+    return StreamingResponse(
+        _stream(user.id, channels),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from social_mini import crud, schemas
+from social_mini.api.pagination import fetch_page
+from social_mini.core.security import get_current_user
+from social_mini.crud import feed as feed_crud
+from social_mini.database import get_read_db
+from social_mini.models.user import User
+
+router = APIRouter(prefix="/feed", tags=["feed"])
+
+
+@router.get("", response_model=list[schemas.PostDetailOut], response_model_exclude_none=True)
+async def read_feed(
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    expand: bool = False,
+    comments: int = Query(0, ge=0, le=10),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Лента: посты авторов, на которых подписан текущий пользователь. expand/comments — как в GET /posts/."""
+    page = feed_crud.get_feed(db, current_user.id, cursor=cursor, limit=limit)
+    posts = await fetch_page(response, page)
+    if not expand and not comments:
+        return posts
+    return await crud.enrich_posts(
+        db, posts,
+        viewer_id=current_user.id,
+        expand=expand,
+        comments_preview=comments,
+    )
@@ -0,0 +1,19 @@
+from fastapi import HTTPException, Response, status
+
+from social_mini.crud.pagination import InvalidCursor
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+async def fetch_page(response: Response, page_coro):
+    """
+    Дожидается страницы из CRUD-слоя и кладёт курсор следующей страницы
+    в заголовок X-Next-Cursor (тело ответа остаётся списком).
+    """
+    try:
+        items, next_cursor = await page_coro
+    except InvalidCursor:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return items
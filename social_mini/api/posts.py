@@ -1,17 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from social_mini import crud, schemas
-from social_mini.core.security import get_current_user
-from social_mini.database import get_db
+from social_mini.core import config
+from social_mini.core.events import ALL_POSTS, broker, post_channel
+from social_mini.core.security import get_current_user, get_current_user_optional
+from social_mini.database import get_read_db, get_write_db
 from social_mini.models.user import User
 from social_mini.models.post import Post
 
 from ..schemas.comment import CommentCreate, CommentOut
-from ..schemas.like import LikeOut, LikesSummary
+from ..schemas.common import BatchIds, ChangeResult
+from ..schemas.like import LikeOut, LikesSummary, LikeStatus
 from ..crud import comment as comment_crud
 from ..crud import like as like_crud
+from ..crud import rows as rows_crud
+from ..crud import search as search_crud
+from ..crud import trending as trending_crud
+from ..crud.loader import post_loader
+from ..crud import versions
+from .batch import batch_ids, check_batch_size
+from .conditional import PRIVATE_REVALIDATE, PUBLIC_REVALIDATE, not_modified
+from .pagination import fetch_page
+from .responses import fast_response
 
 router = APIRouter(prefix="/posts", tags=["posts"])
 
@@ -21,25 +35,89 @@ router = APIRouter(prefix="/posts", tags=["posts"])
 @router.post("/", response_model=schemas.PostOut)
 async def create_post(
     post: schemas.PostCreate,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_write_db),
     current_user: User = Depends(get_current_user),
 ):
     return await crud.create_post(db, post, owner_id=current_user.id)
 
 
-@router.get("/", response_model=list[schemas.PostOut])
+@router.get("/", response_model=list[schemas.PostDetailOut], response_model_exclude_none=True)
 async def read_posts(
-    skip: int = 0,
-    limit: int = 10,
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(10, ge=1, le=100),
+    expand: bool = False,
+    comments: int = Query(0, ge=0, le=10),
+    db: AsyncSession = Depends(get_read_db),
+    viewer: User | None = Depends(get_current_user_optional),
+):
+    """
+    expand=true добавляет author_username и (для авторизованных) liked_by_me,
+    comments=K — последние K комментариев к каждому посту.
+    Поддерживает If-None-Match: пока список не менялся, отвечает 304 без запросов к БД.
+    """
+    cached = await not_modified(
+        request, response, [versions.POSTS],
+        cache_control=PRIVATE_REVALIDATE if viewer else PUBLIC_REVALIDATE,
+        vary=str(viewer.id) if viewer else "",
+        extra_headers={"Vary": "Authorization"},
+        db=db,
+    )
+    if cached:
+        return cached
+    if not expand and not comments and config.FAST_JSON_LISTS:
+        page = rows_crud.list_post_rows(db, cursor=cursor, limit=limit)
+        return fast_response(response, await fetch_page(response, page))
+    posts = await fetch_page(response, crud.get_posts(db, cursor=cursor, limit=limit))
+    if not expand and not comments:
+        return posts
+    return await crud.enrich_posts(
+        db, posts,
+        viewer_id=viewer.id if viewer else None,
+        expand=expand,
+        comments_preview=comments,
+    )
+
+
+@router.get("/search", response_model=list[schemas.PostSearchOut])
+async def search_posts(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    cursor: str | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    return await crud.get_posts(db, skip=skip, limit=limit)
+    """Полнотекстовый поиск по заголовку и тексту; самые релевантные сверху."""
+    return await fetch_page(response, search_crud.search_posts(db, q, cursor=cursor, limit=limit))
+
+
+@router.get("/batch", response_model=dict[int, schemas.PostOut])
+async def read_posts_batch(
+    ids: list[int] = Depends(batch_ids),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Посты по списку id: {id: пост}; неизвестные id пропускаются."""
+    return await post_loader.load_many(db, ids)
+
+
+@router.get("/trending", response_model=list[schemas.TrendingPostOut])
+async def read_trending(
+    window: Literal["hour", "day", "week"] = "day",
+    limit: int = Query(20, ge=1, le=config.TRENDING_TOP_K),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Посты с наибольшим затухающим счётом лайков и комментариев; период
+    полураспада — час, день или неделя. Топ держится в памяти, лайки не читаются.
+    """
+    return await trending_crud.get_trending(db, window, limit)
 
 
 @router.delete("/{post_id}")
 async def delete_post(
     post_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_write_db),
     current_user: User = Depends(get_current_user),
 ):
     post = await crud.get_post(db, post_id)
@@ -53,7 +131,7 @@ async def delete_post(
 async def update_post(
     post_id: int,
     post_in: schemas.PostCreate,   # можно завести отдельную схему, но этой достаточно
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_write_db),
     current_user: User = Depends(get_current_user),
 ):
     # ищем пост
@@ -72,9 +150,16 @@ async def update_post(
     # обновляем
     db_post.title = post_in.title
     db_post.content = post_in.content
+    await search_crud.index_post(db, db_post)
 
     await db.commit()
+    await crud.invalidate_post(post_id)
     await db.refresh(db_post)
+    await broker.publish(
+        "post.updated",
+        {"id": post_id, "title": db_post.title, "content": db_post.content, "owner_id": db_post.owner_id},
+        post_channel(post_id), ALL_POSTS,
+    )
     return db_post
 
 
@@ -83,93 +168,108 @@ async def update_post(
 @router.post("/{post_id}/like", response_model=LikeOut)
 async def like_post(
     post_id: int,
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_write_db),
     current_user: User = Depends(get_current_user),
 ):
-    # Проверим, что пост существует
-    q = select(Post).where(Post.id == post_id)
-    res = await db.execute(q)
-    post = res.scalar_one_or_none()
-    if not post:
+    # существование поста проверяется самим INSERT ... SELECT
+    like, created = await like_crud.like_post(db, current_user.id, post_id)
+    if like is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Post not found",
         )
-
-    like = await like_crud.like_post(db, current_user.id, post_id)
+    response.status_code = status.HTTP_201_CREATED if created else status.HTTP_200_OK
     return like
 
 
-@router.delete("/{post_id}/like", status_code=204)
+@router.delete("/{post_id}/like", response_model=ChangeResult)
 async def unlike_post(
     post_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_write_db),
     current_user: User = Depends(get_current_user),
 ):
-    await like_crud.unlike_post(db, current_user.id, post_id)
-    return
+    changed = await like_crud.unlike_post(db, current_user.id, post_id)
+    return ChangeResult(changed=changed)
 
 
 @router.get("/{post_id}/likes", response_model=LikesSummary)
 async def get_likes(
     post_id: int,
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
 ):
-    # Можно не проверять существование поста, но лучше всё-таки:
-    q = select(Post).where(Post.id == post_id)
-    res = await db.execute(q)
-    post = res.scalar_one_or_none()
-    if not post:
+    cached = await not_modified(request, response, [versions.likes_of(post_id)], db=db)
+    if cached:
+        return cached
+    # счётчик денормализован в posts: один запрос по PK заодно проверяет, что пост есть
+    count = await like_crud.get_likes_count(db, post_id)
+    if count is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Post not found",
         )
-
-    count = await like_crud.get_likes_count(db, post_id)
     return LikesSummary(post_id=post_id, likes_count=count)
 
 
+@router.post("/likes:batch", response_model=dict[int, LikeStatus], response_model_exclude_none=True)
+async def get_likes_batch(
+    body: BatchIds,
+    db: AsyncSession = Depends(get_read_db),
+    viewer: User | None = Depends(get_current_user_optional),
+):
+    """Счётчики лайков (и liked_by_me для авторизованных) по списку постов."""
+    check_batch_size(body.ids)
+    return await like_crud.get_likes_summaries(db, body.ids, viewer.id if viewer else None)
+
+
 # ---------- Комментарии ----------
 
 @router.post("/{post_id}/comments", response_model=CommentOut)
 async def create_comment(
     post_id: int,
     comment_in: CommentCreate,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_write_db),
     current_user: User = Depends(get_current_user),
 ):
-    # Проверим пост
-    q = select(Post).where(Post.id == post_id)
-    res = await db.execute(q)
-    post = res.scalar_one_or_none()
-    if not post:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Post not found",
-        )
-
     comment = await comment_crud.create_comment(
         db=db,
         user_id=current_user.id,
         post_id=post_id,
         data=comment_in,
     )
+    if comment is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Post not found",
+        )
     return comment
 
 
 @router.get("/{post_id}/comments", response_model=list[CommentOut])
 async def list_comments(
     post_id: int,
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    comments = await comment_crud.get_comments_for_post(db, post_id)
-    return comments
+    cached = await not_modified(request, response, [versions.comments_of(post_id)], db=db)
+    if cached:
+        return cached
+    if config.FAST_JSON_LISTS:
+        page = rows_crud.list_comment_rows(db, post_id, cursor=cursor, limit=limit)
+        return fast_response(response, await fetch_page(response, page))
+    page = comment_crud.get_comments_for_post(db, post_id, cursor=cursor, limit=limit)
+    return await fetch_page(response, page)
 
 
 @router.delete("/comments/{comment_id}", status_code=204)
 async def delete_comment(
     comment_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_write_db),
     current_user: User = Depends(get_current_user),
 ):
     ok = await comment_crud.delete_comment(db, comment_id, current_user.id)
@@ -0,0 +1,23 @@
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON для DTO из crud/rows.py: orjson понимает dataclass'ы и datetime нативно;
+    UTC — с суффиксом Z, как у pydantic.
+    """
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+
+
+def fast_response(response: Response, content) -> FastJSONResponse:
+    """
+    Готовый ответ в обход response_model. Заголовки, выставленные обработчиком
+    на параметр response (курсор, ETag), FastAPI в этом случае сам не переносит.
+    """
+    result = FastJSONResponse(content)
+    result.headers.raw.extend(response.headers.raw)
+    return result
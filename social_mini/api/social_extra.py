@@ -1,89 +1,58 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
-from sqlalchemy import select, func, delete
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from social_mini.database import get_db
-from social_mini.models.post import Post
+from social_mini.database import get_read_db, get_write_db
 from social_mini.models.user import User
-from social_mini.models.like import Like
 from social_mini.models.comment import Comment
-from social_mini.models.follow import Follow
 from social_mini.schemas.comment import CommentCreate, CommentOut
 from social_mini.schemas.like import LikeOut, LikesSummary
-from social_mini.schemas.follow import FollowOut
-from social_mini.core.security import SECRET_KEY, ALGORITHM
+from social_mini.schemas.follow import FollowCounts, FollowOut
+from social_mini.schemas.user import UserPublic, UserSuggestionOut
+from social_mini.schemas.common import ChangeResult
+from social_mini.core import config
+from social_mini.core.security import get_current_user
+from social_mini.crud import comment as comment_crud
+from social_mini.crud import follow as follow_crud
+from social_mini.crud import graph as graph_crud
+from social_mini.crud import like as like_crud
+from social_mini.crud import rows as rows_crud
+from social_mini.crud import user as user_crud
+from social_mini.crud.counters import bump_comments
+from social_mini.api.pagination import fetch_page
+from social_mini.api.responses import fast_response
 
 # 🟣 ВОТ ОН — router, которого не хватало
 router = APIRouter(tags=["social-extra"])
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
-
-
-# ---------- текущий пользователь по токену ----------
-async def get_current_user(
-    db: AsyncSession = Depends(get_db),
-    token: str = Depends(oauth2_scheme),
-) -> User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Не удалось проверить учетные данные",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-
-    result = await db.execute(select(User).where(User.username == username))
-    user = result.scalar_one_or_none()
-    if user is None:
-        raise credentials_exception
-    return user
-
 
 # ================= ЛАЙКИ =================
 
 @router.post("/posts/{post_id}/like", response_model=LikeOut)
 async def like_post(
     post_id: int,
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_write_db),
     current_user: User = Depends(get_current_user),
 ):
-    # Проверяем, что пост существует
-    res = await db.execute(select(Post).where(Post.id == post_id))
-    post = res.scalar_one_or_none()
-    if not post:
+    # один INSERT ... ON CONFLICT DO NOTHING вместо проверок SELECT'ами
+    like, created = await like_crud.like_post(db, current_user.id, post_id)
+    if like is None:
         raise HTTPException(status_code=404, detail="Post not found")
-
-    # Проверяем, есть ли уже лайк (делаем idempotent)
-    res = await db.execute(
-        select(Like).where(Like.user_id == current_user.id, Like.post_id == post_id)
-    )
-    like = res.scalar_one_or_none()
-    if like:
-        return like
-
-    like = Like(user_id=current_user.id, post_id=post_id)
-    db.add(like)
-    await db.commit()
-    await db.refresh(like)
+    response.status_code = 201 if created else 200
     return like
 
 
 @router.get("/posts/{post_id}/likes", response_model=LikesSummary)
 async def get_likes_for_post(
     post_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    res = await db.execute(select(func.count(Like.id)).where(Like.post_id == post_id))
-    count = res.scalar() or 0
+    count = await like_crud.get_likes_count(db, post_id)
+    if count is None:
+        raise HTTPException(status_code=404, detail="Post not found")
     return LikesSummary(post_id=post_id, likes_count=count)
 
 
@@ -93,43 +62,24 @@ async def get_likes_for_post(
 async def create_comment(
     post_id: int,
     comment_in: CommentCreate,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_write_db),
     current_user: User = Depends(get_current_user),
 ):
-    # Проверяем, что пост существует
-    res = await db.execute(select(Post).where(Post.id == post_id))
-    post = res.scalar_one_or_none()
-    if not post:
-        raise HTTPException(status_code=404, detail="Post not found")
-
-    comment = Comment(
+    comment = await comment_crud.create_comment(
+        db=db,
         user_id=current_user.id,
         post_id=post_id,
-        content=comment_in.content,
+        data=comment_in,
     )
-    db.add(comment)
-    await db.commit()
-    await db.refresh(comment)
+    if comment is None:
+        raise HTTPException(status_code=404, detail="Post not found")
     return comment
 
 
-@router.get("/posts/{post_id}/comments", response_model=List[CommentOut])
-async def list_comments(
-    post_id: int,
-    db: AsyncSession = Depends(get_db),
-):
-    res = await db.execute(
-        select(Comment)
-        .where(Comment.post_id == post_id)
-        .order_by(Comment.created_at.desc())
-    )
-    return res.scalars().all()
-
-
 @router.delete("/comments/{comment_id}", status_code=204)
 async def delete_comment(
     comment_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_write_db),
     current_user: User = Depends(get_current_user),
 ):
     res = await db.execute(select(Comment).where(Comment.id == comment_id))
@@ -139,7 +89,9 @@ async def delete_comment(
     if comment.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Forbidden")
     await db.delete(comment)
+    await bump_comments(db, comment.post_id, -1)
     await db.commit()
+    await comment_crud.comment_deleted(comment_id, comment.post_id, comment.created_at)
     return
 
 
@@ -148,65 +100,90 @@ async def delete_comment(
 @router.post("/users/{user_id}/follow", response_model=FollowOut)
 async def follow_user(
     user_id: int,
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_write_db),
     current_user: User = Depends(get_current_user),
 ):
     if current_user.id == user_id:
         raise HTTPException(status_code=400, detail="Нельзя подписаться на себя")
 
-    # Проверяем, что пользователь есть
-    res = await db.execute(select(User).where(User.id == user_id))
-    target = res.scalar_one_or_none()
-    if not target:
+    # подписка + догрузка постов автора в ленту; существование автора проверяет INSERT ... SELECT
+    follow, created = await follow_crud.follow_user(db, follower_id=current_user.id, user_id=user_id)
+    if follow is None:
         raise HTTPException(status_code=404, detail="User not found")
-
-    # Проверяем, существует ли подписка
-    res = await db.execute(
-        select(Follow).where(
-            Follow.follower_id == current_user.id,
-            Follow.user_id == user_id,
-        )
-    )
-    follow = res.scalar_one_or_none()
-    if follow:
-        return follow
-
-    follow = Follow(follower_id=current_user.id, user_id=user_id)
-    db.add(follow)
-    await db.commit()
-    await db.refresh(follow)
+    response.status_code = 201 if created else 200
     return follow
 
 
-@router.delete("/users/{user_id}/follow", status_code=204)
+@router.delete("/users/{user_id}/follow", response_model=ChangeResult)
 async def unfollow_user(
     user_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_write_db),
     current_user: User = Depends(get_current_user),
 ):
-    await db.execute(
-        delete(Follow).where(
-            Follow.follower_id == current_user.id,
-            Follow.user_id == user_id,
-        )
-    )
-    await db.commit()
-    return
+    changed = await follow_crud.unfollow_user(db, follower_id=current_user.id, user_id=user_id)
+    return ChangeResult(changed=changed)
 
 
 @router.get("/users/me/following", response_model=List[FollowOut])
 async def get_my_following(
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
-    res = await db.execute(select(Follow).where(Follow.follower_id == current_user.id))
-    return res.scalars().all()
+    if config.FAST_JSON_LISTS:
+        page = rows_crud.list_following_rows(db, current_user.id, cursor=cursor, limit=limit)
+        return fast_response(response, await fetch_page(response, page))
+    page = follow_crud.get_following(db, current_user.id, cursor=cursor, limit=limit)
+    return await fetch_page(response, page)
 
 
 @router.get("/users/me/followers", response_model=List[FollowOut])
 async def get_my_followers(
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    if config.FAST_JSON_LISTS:
+        page = rows_crud.list_follower_rows(db, current_user.id, cursor=cursor, limit=limit)
+        return fast_response(response, await fetch_page(response, page))
+    page = follow_crud.get_followers(db, current_user.id, cursor=cursor, limit=limit)
+    return await fetch_page(response, page)
+
+
+@router.get("/users/me/suggestions", response_model=List[UserSuggestionOut])
+async def get_my_suggestions(
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Кого почитать: на кого подписаны ваши подписки, сначала самые общие."""
+    return await graph_crud.get_suggestions(db, current_user.id, limit)
+
+
+@router.get("/users/{user_id}/mutual-followers", response_model=List[UserPublic])
+async def get_mutual_followers(
+    user_id: int,
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Кто подписан и на вас, и на user_id."""
+    return await graph_crud.get_mutual_followers(db, current_user.id, user_id, limit)
+
+
+@router.get("/users/{user_id}/follow-counts", response_model=FollowCounts)
+async def get_follow_counts(
+    user_id: int,
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
-    res = await db.execute(select(Follow).where(Follow.user_id == current_user.id))
-    return res.scalars().all()
\ No newline at end of file
+    """Число подписчиков и подписок — те же счётчики users, что и в профиле."""
+    profile = await user_crud.get_profile(db, user_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return FollowCounts(followers=profile["followers_count"], following=profile["following_count"])
@@ -1,56 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..database import get_db
-from ..crud import follow as follow_crud
-from ..schemas.follow import FollowOut
-from ..core.dependencies import get_current_user
-from ..models.user import User
+from ..database import get_read_db
+from ..crud import user as user_crud
+from ..crud.loader import user_loader
+from ..schemas.user import UserProfileOut, UserPublic
+from .batch import batch_ids
 
 router = APIRouter(prefix="/users", tags=["users"])
 
-@router.post("/{user_id}/follow", response_model=FollowOut)
-async def follow(
-    user_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user = Depends(get_current_user),
-):
-    # проверим, что пользователь есть
-    q = select(User).where(User.id == user_id)
-    res = await db.execute(q)
-    user = res.scalar_one_or_none()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-
-    try:
-        follow_obj = await follow_crud.follow_user(db, follower_id=current_user.id, user_id=user_id)
-    except ValueError as e:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
-
-    return follow_obj
 
-@router.delete("/{user_id}/follow", status_code=204)
-async def unfollow(
-    user_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user = Depends(get_current_user),
+@router.get("/batch", response_model=dict[int, UserPublic])
+async def read_users_batch(
+    ids: list[int] = Depends(batch_ids),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    await follow_crud.unfollow_user(db, follower_id=current_user.id, user_id=user_id)
-    return
+    """Пользователи по списку id: {id: пользователь}; неизвестные id пропускаются."""
+    return await user_loader.load_many(db, ids)
 
-@router.get("/me/following", response_model=list[FollowOut])
-async def get_my_following(
-    db: AsyncSession = Depends(get_db),
-    current_user = Depends(get_current_user),
-):
-    follows = await follow_crud.get_following(db, current_user.id)
-    return follows
-
-@router.get("/me/followers", response_model=list[FollowOut])
-async def get_my_followers(
-    db: AsyncSession = Depends(get_db),
-    current_user = Depends(get_current_user),
-):
-    follows = await follow_crud.get_followers(db, current_user.id)
-    return follows
 
+@router.get("/{user_id}", response_model=UserProfileOut)
+async def read_user_profile(user_id: int, db: AsyncSession = Depends(get_read_db)):
+    """Профиль: публичные поля и число подписчиков, подписок и постов."""
+    profile = await user_crud.get_profile(db, user_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return profile
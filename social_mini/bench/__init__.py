@@ -0,0 +1 @@
+"""Бенчмарки social_mini. Каждый модуль запускается как `python -m social_mini.bench.<имя>`."""
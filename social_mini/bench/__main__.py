@@ -0,0 +1,7 @@
+# social_mini/bench/__main__.py
+"""`python -m social_mini.bench` — нагрузочный прогон всех роутеров (см. bench/load.py)."""
+import asyncio
+
+from social_mini.bench.load import build_parser, main
+
+asyncio.run(main(build_parser().parse_args()))
@@ -0,0 +1,124 @@
+# social_mini/bench/common.py
+"""Общие помощники для бенчмарков: схема, сидинг, прогон запросов и статистика."""
+import asyncio
+import contextlib
+import json
+import time
+
+import httpx
+from sqlalchemy import insert, select
+
+from social_mini.database import Base, get_db, get_read_db, get_write_db
+from social_mini.models.comment import Comment  # noqa: F401  регистрируем таблицы в Base
+from social_mini.models.follow import Follow  # noqa: F401
+from social_mini.models.like import Like  # noqa: F401
+from social_mini.models.post import Post
+from social_mini.models.user import User
+
+BENCH_PASSWORD_HASH = "!bench-account-no-login"
+
+
+def percentile(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, round(p / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+def summarize(latencies: list[float], elapsed: float) -> dict:
+    """Латентности в миллисекундах и пропускная способность."""
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+async def create_schema(engine) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def ensure_user(session_maker, username: str = "bench_owner") -> int:
+    async with session_maker() as db:
+        res = await db.execute(select(User.id).where(User.username == username))
+        user_id = res.scalar_one_or_none()
+        if user_id is None:
+            user = User(
+                username=username,
+                email=f"{username}@bench.local",
+                hashed_password=BENCH_PASSWORD_HASH,
+            )
+            db.add(user)
+            await db.commit()
+            user_id = user.id
+    return user_id
+
+
+async def seed_posts(session_maker, owner_id: int, count: int, batch: int = 1000) -> None:
+    async with session_maker() as db:
+        for start in range(0, count, batch):
+            rows = [
+                {"title": f"bench post {i}", "content": f"content of bench post {i}", "owner_id": owner_id}
+                for i in range(start, min(start + batch, count))
+            ]
+            await db.execute(insert(Post), rows)
+        await db.commit()
+
+
+@contextlib.contextmanager
+def override_db(app, session_maker):
+    """
+    Подменяем get_db, get_read_db и get_write_db, чтобы приложение работало через
+    нужный движок: и чтения, и записи идут в базу бенчмарка, реплики нет.
+    Фоновые части, открывающие сессии сами (раскладка лент, граф подписок), — туда же.
+    """
+    from social_mini.crud import feed, graph
+
+    async def _get_db():
+        async with session_maker() as session:
+            yield session
+
+    dependencies = (get_db, get_read_db, get_write_db)
+    for dependency in dependencies:
+        app.dependency_overrides[dependency] = _get_db
+    saved = [(module, module.async_session_maker) for module in (feed, graph)]
+    for module, _ in saved:
+        module.async_session_maker = session_maker
+    try:
+        yield
+    finally:
+        for dependency in dependencies:
+            app.dependency_overrides.pop(dependency, None)
+        for module, original in saved:
+            module.async_session_maker = original
+
+
+def asgi_client(app, base_url: str = "http://bench") -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url=base_url)
+
+
+async def drive(make_request, total: int, concurrency: int) -> tuple[list[float], float]:
+    """
+    Выполняет total вызовов make_request() при фиксированной конкурентности.
+    Возвращает латентности (в секундах) и общее время прогона.
+    """
+    latencies: list[float] = []
+    counter = iter(range(total))
+
+    async def worker():
+        for i in counter:
+            start = time.perf_counter()
+            await make_request(i)
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - started
+
+
+def print_report(report: dict) -> None:
+    print(json.dumps(report, indent=2, ensure_ascii=False, default=str))
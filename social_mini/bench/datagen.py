@@ -0,0 +1,325 @@
+# social_mini/bench/datagen.py
+"""
+Генератор синтетических данных для проверки на больших объёмах: пользователи, посты,
+подписки (степенное распределение подписчиков), лайки и комментарии.
+
+    DATABASE_URL=postgresql+asyncpg://... python -m social_mini.bench.datagen \\
+        --users 1000000 --posts-per-user 10 --follows-per-user 50 --likes-per-post 5
+
+Строки генерируются потоком и пишутся пачками: на PostgreSQL через COPY
+(asyncpg copy_records_to_table), на остальных СУБД — executemany. Память не растёт
+с объёмом. id назначаются явно, продолжая уже имеющиеся, поэтому таблицы не надо
+перечитывать; на пустой БД один и тот же --seed даёт одни и те же данные.
+
+Пароли: --passwords skip (вход невозможен, быстрее всего), shared (один хэш на всех,
+пароль --password) или unique (у каждого свой "<password>-<id>", bcrypt в --hash-workers потоках).
+"""
+import argparse
+import asyncio
+import itertools
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select, text, update
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from social_mini.bench.common import BENCH_PASSWORD_HASH, create_schema, print_report
+from social_mini.core import config, security
+from social_mini.crud.counters import real_user_counts
+from social_mini.database import DATABASE_URL, build_engine_kwargs
+from social_mini.models.comment import Comment
+from social_mini.models.feed import FeedEntry
+from social_mini.models.follow import Follow
+from social_mini.models.like import Like
+from social_mini.models.post import Post
+from social_mini.models.user import User
+
+USER_PREFIX = "gen_"
+
+
+def skewed(rng: random.Random, n: int, skew: float) -> int:
+    """
+    Индекс 0..n-1, маленькие — чаще: P(индекс < r) = (r/n)^(1/skew).
+    Так получается степенной закон по рангу: несколько «звёзд» и длинный хвост.
+    """
+    return min(n - 1, int(n * rng.random() ** skew))
+
+
+class Plan:
+    """Размеры, смещения id и генераторы строк. Каждой таблице — свой ГПСЧ от seed."""
+
+    def __init__(self, args, offsets: dict[str, int]):
+        self.args = args
+        self.users = args.users
+        self.user_offset = offsets["users"]
+        self.post_offset = offsets["posts"]
+        self.follow_offset = offsets["follows"]
+        self.like_offset = offsets["likes"]
+        self.comment_offset = offsets["comments"]
+        self.posts = args.users * args.posts_per_user
+        self.started = datetime.now(timezone.utc) - timedelta(days=args.days)
+
+    def rng(self, table: str) -> random.Random:
+        return random.Random(f"{self.args.seed}:{table}")
+
+    def user_id(self, index: int) -> int:
+        return self.user_offset + 1 + index
+
+    def users_rows(self):
+        for i in range(self.users):
+            user_id = self.user_id(i)
+            name = f"{USER_PREFIX}{user_id}"
+            yield (user_id, name, f"{name}@example.com", None, "Gen", str(user_id), False)
+
+    def posts_stream(self):
+        """
+        (id, owner_id, created_at, лайков, комментариев) — счётчики известны заранее,
+        поэтому posts.likes_count/comments_count пишутся сразу, а генераторы лайков и
+        комментариев повторяют этот же поток (тот же seed) вместо хранения его в памяти.
+        """
+        rng = self.rng("posts")
+        step = timedelta(days=self.args.days) / max(self.posts, 1)
+        max_likes = min(self.users, self.args.likes_per_post * (self.args.skew + 1))
+        max_comments = self.args.comments_per_post * (self.args.skew + 1)
+        for i in range(self.posts):
+            owner = self.user_id(skewed(rng, self.users, self.args.skew - 1 or 1))
+            likes = int(max_likes * rng.random() ** self.args.skew)
+            comments = int(max_comments * rng.random() ** self.args.skew)
+            yield self.post_offset + 1 + i, owner, self.started + step * i, likes, comments
+
+    def posts_rows(self):
+        for post_id, owner, created_at, likes, comments in self.posts_stream():
+            yield (post_id, f"post {post_id}", f"generated post {post_id} by {owner}", created_at, owner,
+                   likes, comments)
+
+    def follows_rows(self):
+        rng = self.rng("follows")
+        follow_id = self.follow_offset
+        for i in range(self.users):
+            follower = self.user_id(i)
+            wanted = min(rng.randint(0, 2 * self.args.follows_per_user), self.users - 1)
+            targets = set()
+            # «звёзды» встречаются часто — ограничиваем число попыток, а не добираем до wanted любой ценой
+            for _ in range(wanted * 3):
+                if len(targets) >= wanted:
+                    break
+                target = self.user_id(skewed(rng, self.users, self.args.skew))
+                if target != follower:
+                    targets.add(target)
+            for target in sorted(targets):
+                follow_id += 1
+                yield follow_id, follower, target
+
+    def likes_rows(self):
+        rng = self.rng("likes")
+        like_id = self.like_offset
+        for post_id, _, _, likes, _ in self.posts_stream():
+            for index in rng.sample(range(self.users), likes):
+                like_id += 1
+                yield like_id, self.user_id(index), post_id
+
+    def comments_rows(self):
+        rng = self.rng("comments")
+        comment_id = self.comment_offset
+        for post_id, _, created_at, _, comments in self.posts_stream():
+            for n in range(comments):
+                comment_id += 1
+                author = self.user_id(rng.randrange(self.users))
+                yield comment_id, f"comment {n} on post {post_id}", created_at, author, post_id
+
+
+def batched(rows, size: int):
+    iterator = iter(rows)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+class PasswordColumn:
+    """Подставляет hashed_password в строки пользователей согласно --passwords."""
+
+    def __init__(self, mode: str, password: str, workers: int):
+        self.mode = mode
+        self.password = password
+        self.shared_hash = security.get_password_hash(password) if mode == "shared" else None
+        self.executor = ThreadPoolExecutor(max_workers=workers) if mode == "unique" else None
+
+    def fill(self, batch: list[tuple]) -> list[tuple]:
+        if self.mode == "skip":
+            hashes = itertools.repeat(BENCH_PASSWORD_HASH)
+        elif self.mode == "shared":
+            hashes = itertools.repeat(self.shared_hash)
+        else:
+            # bcrypt отпускает GIL, поэтому потоков достаточно
+            hashes = self.executor.map(
+                security.get_password_hash, (f"{self.password}-{row[0]}" for row in batch)
+            )
+        return [row[:3] + (hashed,) + row[4:] for row, hashed in zip(batch, hashes)]
+
+    def close(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown()
+
+
+async def copy_rows(engine, table, columns: list[str], rows, batch_size: int, transform=None) -> int:
+    """Пишет поток строк пачками: COPY на PostgreSQL, executemany на остальных."""
+    total = 0
+    async with engine.connect() as conn:
+        if engine.dialect.name == "postgresql":
+            raw = await conn.get_raw_connection()
+            driver = raw.driver_connection
+            for batch in batched(rows, batch_size):
+                batch = transform(batch) if transform else batch
+                await driver.copy_records_to_table(table.name, records=batch, columns=columns)
+                total += len(batch)
+        else:
+            stmt = table.insert()
+            for batch in batched(rows, batch_size):
+                batch = transform(batch) if transform else batch
+                await conn.execute(stmt, [dict(zip(columns, row)) for row in batch])
+                await conn.commit()
+                total += len(batch)
+    return total
+
+
+async def next_ids(engine) -> dict[str, int]:
+    offsets = {}
+    async with engine.connect() as conn:
+        for model in (User, Post, Follow, Like, Comment):
+            offsets[model.__tablename__] = (await conn.execute(select(func.coalesce(func.max(model.id), 0)))).scalar_one()
+    return offsets
+
+
+async def finish(engine, post_offset: int, follow_offset: int, feeds: bool = False, search_index: bool = False) -> dict:
+    """
+    Последовательности, флаг fanout_on_read, счётчики профилей, ленты и статистика
+    планировщика для строк, залитых в обход crud: посты с id > post_offset и
+    подписки с id > follow_offset. Его же вызывает сидирование bench/load.py.
+    """
+    steps = {}
+    async with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            for model in (User, Post, Follow, Like, Comment):
+                table = model.__tablename__
+                await conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f"(SELECT coalesce(max(id), 0) + 1 FROM {table}), false)"
+                ))
+
+        # авторы с тысячами подписчиков читаются при запросе ленты, как в crud/feed.fan_out_post
+        popular = (
+            select(Follow.user_id)
+            .where(Follow.id > follow_offset)
+            .group_by(Follow.user_id)
+            .having(func.count() > config.FEED_FANOUT_LIMIT)
+        )
+        res = await conn.execute(update(User).where(User.id.in_(popular)).values(fanout_on_read=True))
+        steps["fanout_on_read_authors"] = res.rowcount
+
+        # подписки и посты залиты в обход crud — счётчики профилей считаем по таблицам
+        started = time.perf_counter()
+        res = await conn.execute(update(User).values(real_user_counts()))
+        steps["user_counters"] = {"rows": res.rowcount, "seconds": round(time.perf_counter() - started, 2)}
+
+    if feeds:
+        started = time.perf_counter()
+        ranked = (
+            select(
+                Post.id, Post.owner_id, Post.created_at,
+                func.row_number().over(
+                    partition_by=Post.owner_id, order_by=(Post.created_at.desc(), Post.id.desc())
+                ).label("rn"),
+            )
+            .where(Post.id > post_offset)
+            .subquery()
+        )
+        rows = (
+            select(Follow.follower_id, ranked.c.id, ranked.c.owner_id, ranked.c.created_at)
+            .join(ranked, ranked.c.owner_id == Follow.user_id)
+            .join(User, User.id == Follow.user_id)
+            .where(
+                Follow.id > follow_offset,
+                ranked.c.rn <= config.FEED_BACKFILL_LIMIT,
+                User.fanout_on_read.is_(False),
+            )
+        )
+        async with engine.begin() as conn:
+            res = await conn.execute(
+                FeedEntry.__table__.insert().from_select(["user_id", "post_id", "author_id", "created_at"], rows)
+            )
+        steps["feed_entries"] = {"rows": res.rowcount, "seconds": round(time.perf_counter() - started, 2)}
+
+    if search_index and engine.dialect.name == "postgresql":
+        from social_mini.crud import search as search_crud
+
+        started = time.perf_counter()
+        async with engine.begin() as conn:
+            res = await conn.execute(
+                update(Post)
+                .where(Post.id > post_offset)
+                .values(search_vector=search_crud.search_vector_expr(Post.title, Post.content))
+            )
+        steps["search_vector"] = {"rows": res.rowcount, "seconds": round(time.perf_counter() - started, 2)}
+
+    if engine.dialect.name == "postgresql":
+        async with engine.connect() as conn:
+            await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.execute(text("ANALYZE"))
+    return steps
+
+
+async def main(args) -> None:
+    engine = create_async_engine(args.database_url, **build_engine_kwargs())
+    await create_schema(engine)
+    plan = Plan(args, await next_ids(engine))
+    passwords = PasswordColumn(args.passwords, args.password, args.hash_workers)
+
+    tables = [
+        (User, ["id", "username", "email", "hashed_password", "first_name", "last_name", "fanout_on_read"],
+         plan.users_rows, passwords.fill),
+        (Post, ["id", "title", "content", "created_at", "owner_id", "likes_count", "comments_count"],
+         plan.posts_rows, None),
+        (Follow, ["id", "follower_id", "user_id"], plan.follows_rows, None),
+        (Like, ["id", "user_id", "post_id"], plan.likes_rows, None),
+        (Comment, ["id", "content", "created_at", "user_id", "post_id"], plan.comments_rows, None),
+    ]
+    report = {"dialect": engine.dialect.name, "seed": args.seed, "tables": {}}
+    try:
+        for model, columns, rows, transform in tables:
+            started = time.perf_counter()
+            count = await copy_rows(engine, model.__table__, columns, rows(), args.batch, transform)
+            seconds = time.perf_counter() - started
+            report["tables"][model.__tablename__] = {
+                "rows": count, "seconds": round(seconds, 2), "rows_per_s": round(count / seconds) if seconds else None,
+            }
+            print(f"{model.__tablename__}: {count} rows in {seconds:.1f}s", flush=True)
+    finally:
+        passwords.close()
+    report["post_load"] = await finish(engine, plan.post_offset, plan.follow_offset, args.feeds, args.search_index)
+    await engine.dispose()
+    print_report(report)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--posts-per-user", type=int, default=10)
+    parser.add_argument("--follows-per-user", type=int, default=20, help="в среднем")
+    parser.add_argument("--likes-per-post", type=int, default=3, help="в среднем")
+    parser.add_argument("--comments-per-post", type=int, default=1, help="в среднем")
+    parser.add_argument("--skew", type=int, default=3, help="крутизна степенного закона (1 — равномерно)")
+    parser.add_argument("--days", type=int, default=365, help="на сколько дней назад растянуть посты")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch", type=int, default=10_000, help="строк в одной пачке COPY/executemany")
+    parser.add_argument("--passwords", choices=("skip", "shared", "unique"), default="skip")
+    parser.add_argument("--password", default="bench-password")
+    parser.add_argument("--hash-workers", type=int, default=config.PASSWORD_HASH_WORKERS)
+    parser.add_argument("--feeds", action="store_true", help="материализовать ленты подписчиков")
+    parser.add_argument("--search-index", action="store_true", help="заполнить search_vector (PostgreSQL)")
+    return parser
+
+
+if __name__ == "__main__":
+    asyncio.run(main(build_parser().parse_args()))
@@ -0,0 +1,95 @@
+# social_mini/bench/hashing.py
+"""
+Латентность GET /posts/ под шквалом логинов: bcrypt прямо в event loop
+против bcrypt в пуле потоков.
+
+    DATABASE_URL=postgresql+asyncpg://... python -m social_mini.bench.hashing --duration 5 --logins 16
+"""
+import argparse
+import asyncio
+import time
+from unittest import mock
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from social_mini.bench.common import (
+    asgi_client,
+    create_schema,
+    ensure_user,
+    override_db,
+    print_report,
+    seed_posts,
+    summarize,
+)
+from social_mini.core import security
+from social_mini.database import DATABASE_URL, build_engine_kwargs
+from social_mini.main import app
+from social_mini.models.user import User
+
+USERNAME = "bench_login"
+PASSWORD = "bench-password"
+
+
+async def inline_verify(plain_password: str, hashed_password: str) -> bool:
+    """Старое поведение: bcrypt блокирует event loop."""
+    return security.verify_password(plain_password, hashed_password)
+
+
+async def run_mix(client, duration: float, readers: int, logins: int) -> dict:
+    read_latencies: list[float] = []
+    login_status: dict[int, int] = {}
+    deadline = time.perf_counter() + duration
+
+    async def reader():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            resp = await client.get("/posts/")
+            resp.raise_for_status()
+            read_latencies.append(time.perf_counter() - start)
+
+    async def loginer():
+        while time.perf_counter() < deadline:
+            resp = await client.post("/auth/token", data={"username": USERNAME, "password": PASSWORD})
+            login_status[resp.status_code] = login_status.get(resp.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(reader() for _ in range(readers)), *(loginer() for _ in range(logins)))
+    result = summarize(read_latencies, time.perf_counter() - started)
+    result["logins"] = login_status
+    return result
+
+
+async def main(args) -> None:
+    engine = create_async_engine(args.database_url, **build_engine_kwargs())
+    session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await create_schema(engine)
+    owner_id = await ensure_user(session_maker)
+    await seed_posts(session_maker, owner_id, 20)
+    async with session_maker() as db:
+        user = (await db.execute(select(User).where(User.username == USERNAME))).scalar_one_or_none()
+        if user is None:
+            db.add(User(username=USERNAME, email=f"{USERNAME}@bench.local",
+                        hashed_password=security.get_password_hash(PASSWORD)))
+            await db.commit()
+
+    report = {"duration_s": args.duration, "readers": args.readers, "logins": args.logins}
+    with override_db(app, session_maker):
+        async with asgi_client(app) as client:
+            report["reads_only"] = await run_mix(client, args.duration, args.readers, 0)
+            with mock.patch("social_mini.api.auth.verify_password_async", inline_verify):
+                report["bcrypt_on_event_loop"] = await run_mix(client, args.duration, args.readers, args.logins)
+            report["bcrypt_in_executor"] = await run_mix(client, args.duration, args.readers, args.logins)
+    report["hasher"] = security.password_hasher.stats()
+    await engine.dispose()
+    print_report(report)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--logins", type=int, default=16)
+    asyncio.run(main(parser.parse_args()))
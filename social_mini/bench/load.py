@@ -0,0 +1,296 @@
+# social_mini/bench/load.py
+"""
+Нагрузочный прогон всех роутеров: смешанная нагрузка (регистрация, логин, посты,
+лайки, комментарии, подписки, ленты) при фиксированной конкурентности.
+Итог — JSON с RPS и p50/p95/p99 по каждому маршруту.
+
+    DATABASE_URL=postgresql+asyncpg://... python -m social_mini.bench --requests 5000 --concurrency 32
+    python -m social_mini.bench --output before.json
+    python -m social_mini.bench --compare before.json     # разница с прошлым прогоном
+
+Состав нагрузки задаётся весами: --mix list=30,feed=15,like=10 (остальные операции — 0).
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import time
+import uuid
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from social_mini.bench.common import asgi_client, create_schema, override_db, print_report, summarize
+from social_mini.bench.datagen import finish, next_ids
+from social_mini.core import security
+from social_mini.database import DATABASE_URL, build_engine_kwargs
+from social_mini.main import app
+from social_mini.models.follow import Follow
+from social_mini.models.post import Post
+from social_mini.models.user import User
+
+PASSWORD = "bench-password"
+USER_PREFIX = "load_"
+
+DEFAULT_MIX = {
+    "list": 30,
+    "feed": 15,
+    "likes": 10,
+    "comments": 5,
+    "like": 12,
+    "comment": 6,
+    "post": 8,
+    "follow": 6,
+    "login": 4,
+    "register": 2,
+    "search": 2,
+}
+
+
+class Workload:
+    """Операции нагрузки. Каждая возвращает (маршрут, ответ)."""
+
+    def __init__(self, client, tokens: dict[int, str], post_ids: list[int], seed: int):
+        self.client = client
+        self.tokens = tokens
+        self.user_ids = list(tokens)
+        self.post_ids = post_ids
+        self.rng = random.Random(seed)
+
+    def _user(self) -> tuple[int, dict]:
+        user_id = self.rng.choice(self.user_ids)
+        return user_id, {"Authorization": f"Bearer {self.tokens[user_id]}"}
+
+    def _post(self) -> int:
+        # свежие посты популярнее: берём из хвоста списка чаще
+        return self.post_ids[-1 - int(self.rng.random() ** 2 * len(self.post_ids))]
+
+    async def list(self):
+        _, headers = self._user()
+        return "GET /posts/", await self.client.get("/posts/?expand=true&comments=3", headers=headers)
+
+    async def feed(self):
+        _, headers = self._user()
+        return "GET /feed", await self.client.get("/feed", headers=headers)
+
+    async def likes(self):
+        return "GET /posts/{post_id}/likes", await self.client.get(f"/posts/{self._post()}/likes")
+
+    async def comments(self):
+        return "GET /posts/{post_id}/comments", await self.client.get(f"/posts/{self._post()}/comments")
+
+    async def like(self):
+        _, headers = self._user()
+        return "POST /posts/{post_id}/like", await self.client.post(f"/posts/{self._post()}/like", headers=headers)
+
+    async def comment(self):
+        _, headers = self._user()
+        resp = await self.client.post(
+            f"/posts/{self._post()}/comments", json={"content": "load comment"}, headers=headers
+        )
+        return "POST /posts/{post_id}/comments", resp
+
+    async def post(self):
+        _, headers = self._user()
+        resp = await self.client.post("/posts/", json={"title": "load post", "content": "load content"},
+                                      headers=headers)
+        if resp.status_code == 200:
+            self.post_ids.append(resp.json()["id"])
+        return "POST /posts/", resp
+
+    async def follow(self):
+        follower_id, headers = self._user()
+        target = self.rng.choice(self.user_ids)
+        if target == follower_id:
+            target = self.user_ids[(self.user_ids.index(target) + 1) % len(self.user_ids)]
+        return "POST /users/{user_id}/follow", await self.client.post(f"/users/{target}/follow", headers=headers)
+
+    async def login(self):
+        resp = await self.client.post("/auth/token", data={
+            "username": f"{USER_PREFIX}{self.rng.randrange(len(self.user_ids))}", "password": PASSWORD,
+        })
+        return "POST /auth/token", resp
+
+    async def register(self):
+        name = f"{USER_PREFIX}new_{uuid.uuid4().hex[:12]}"
+        resp = await self.client.post("/auth/register", json={
+            "username": name, "email": f"{name}@example.com", "password": PASSWORD,
+            "first_name": "Load", "last_name": "Test",
+        })
+        return "POST /auth/register", resp
+
+    async def search(self):
+        return "GET /posts/search", await self.client.get("/posts/search", params={"q": "bench"})
+
+
+async def seed(engine, users: int, posts: int, follows: int, seed_value: int) -> tuple[list[int], list[int]]:
+    """
+    Пользователи load_0..N-1 (один общий хэш пароля), посты и подписки. Повторный запуск досеивает.
+    Строки идут в обход crud, поэтому потом — тот же шаг, что у datagen: счётчики
+    профилей, ленты подписчиков и поисковый индекс.
+    """
+    rng = random.Random(seed_value)
+    session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_maker() as db:
+        existing = dict((await db.execute(
+            select(User.username, User.id).where(User.username.like(f"{USER_PREFIX}%"))
+        )).all())
+        missing = [f"{USER_PREFIX}{i}" for i in range(users) if f"{USER_PREFIX}{i}" not in existing]
+        if missing:
+            hashed = security.get_password_hash(PASSWORD)
+            await db.execute(insert(User), [
+                {"username": name, "email": f"{name}@example.com", "hashed_password": hashed,
+                 "first_name": "Load", "last_name": "Test"}
+                for name in missing
+            ])
+            await db.commit()
+            existing = dict((await db.execute(
+                select(User.username, User.id).where(User.username.like(f"{USER_PREFIX}%"))
+            )).all())
+        user_ids = [existing[f"{USER_PREFIX}{i}"] for i in range(users)]
+
+        post_ids = list((await db.execute(
+            select(Post.id).where(Post.owner_id.in_(user_ids)).order_by(Post.id)
+        )).scalars())
+        if len(post_ids) < posts:
+            offsets = await next_ids(engine)
+            await db.execute(insert(Post), [
+                {"title": f"bench post {i}", "content": f"seeded bench post {i}", "owner_id": rng.choice(user_ids)}
+                for i in range(len(post_ids), posts)
+            ])
+            pairs = {(rng.choice(user_ids), rng.choice(user_ids)) for _ in range(follows)}
+            follow_rows = [{"follower_id": a, "user_id": b} for a, b in pairs if a != b]
+            if follow_rows and not (await db.execute(select(Follow.id).limit(1))).first():
+                await db.execute(insert(Follow), follow_rows)
+            await db.commit()
+            await finish(engine, offsets["posts"], offsets["follows"], feeds=True, search_index=True)
+            post_ids = list((await db.execute(
+                select(Post.id).where(Post.owner_id.in_(user_ids)).order_by(Post.id)
+            )).scalars())
+    return user_ids, post_ids
+
+
+def parse_mix(value: str | None) -> dict[str, int]:
+    if not value:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise SystemExit(f"unknown operation {name!r}; known: {', '.join(DEFAULT_MIX)}")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+async def run_workload(workload: Workload, mix: dict[str, int], total: int, concurrency: int) -> dict:
+    names = [n for n, w in mix.items() if w > 0]
+    weights = [mix[n] for n in names]
+    plan = workload.rng.choices(names, weights, k=total)
+    counter = iter(plan)
+    latencies: dict[str, list[float]] = {}
+    statuses: dict[str, dict[int, int]] = {}
+
+    async def worker():
+        for name in counter:
+            start = time.perf_counter()
+            route, resp = await getattr(workload, name)()
+            elapsed = time.perf_counter() - start
+            latencies.setdefault(route, []).append(elapsed)
+            by_status = statuses.setdefault(route, {})
+            by_status[resp.status_code] = by_status.get(resp.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    routes = {}
+    for route in sorted(latencies):
+        routes[route] = {**summarize(latencies[route], elapsed), "status": statuses[route]}
+    everything = [x for values in latencies.values() for x in values]
+    return {"total": summarize(everything, elapsed), "routes": routes}
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: dict, baseline: dict) -> dict:
+    """Изменение RPS и p95 по маршрутам относительно прошлого отчёта, в процентах."""
+
+    def delta(new, old):
+        return round((new - old) / old * 100, 1) if old else None
+
+    result = {}
+    pairs = {"total": (current["total"], baseline.get("total", {}))}
+    for route, stats in current["routes"].items():
+        pairs[route] = (stats, baseline.get("routes", {}).get(route, {}))
+    for route, (new, old) in pairs.items():
+        if old:
+            result[route] = {"rps_%": delta(new["rps"], old["rps"]), "p95_%": delta(new["p95_ms"], old["p95_ms"])}
+    return result
+
+
+async def main(args) -> None:
+    engine = create_async_engine(args.database_url, **build_engine_kwargs())
+    session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await create_schema(engine)
+    user_ids, post_ids = await seed(engine, args.users, args.posts, args.follows, args.seed)
+    mix = parse_mix(args.mix)
+
+    with override_db(app, session_maker):
+        async with asgi_client(app) as client:
+            tokens = {}
+            for i, user_id in enumerate(user_ids):
+                resp = await client.post("/auth/token", data={"username": f"{USER_PREFIX}{i}", "password": PASSWORD})
+                resp.raise_for_status()
+                tokens[user_id] = resp.json()["access_token"]
+            workload = Workload(client, tokens, post_ids, args.seed)
+            if args.warmup:
+                await run_workload(workload, mix, args.warmup, args.concurrency)
+            result = await run_workload(workload, mix, args.requests, args.concurrency)
+    await engine.dispose()
+
+    report = {
+        "revision": _git_revision(),
+        "dialect": engine.dialect.name,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "dataset": {"users": args.users, "posts": len(post_ids)},
+        "mix": mix,
+        **result,
+    }
+    if args.compare:
+        with open(args.compare) as f:
+            report["compare"] = compare(result, json.load(f))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    print_report(report)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--posts", type=int, default=2000)
+    parser.add_argument("--follows", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--mix", help="веса операций, например list=30,like=10")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="сохранить отчёт в файл")
+    parser.add_argument("--compare", help="отчёт прошлого прогона для сравнения")
+    return parser
+
+
+if __name__ == "__main__":
+    asyncio.run(main(build_parser().parse_args()))
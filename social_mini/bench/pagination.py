@@ -0,0 +1,83 @@
+# social_mini/bench/pagination.py
+"""
+OFFSET против keyset-курсора на первой и на глубокой странице GET /posts/.
+
+    DATABASE_URL=postgresql+asyncpg://... python -m social_mini.bench.pagination --posts 100000 --page 10000
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from social_mini import crud
+from social_mini.bench.common import create_schema, ensure_user, percentile, print_report, seed_posts
+from social_mini.crud.pagination import encode_cursor
+from social_mini.database import DATABASE_URL, build_engine_kwargs
+from social_mini.models.post import Post
+
+
+async def timed(fn, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - start)
+    return {"p50_ms": round(percentile(samples, 50) * 1000, 3), "p95_ms": round(percentile(samples, 95) * 1000, 3)}
+
+
+async def main(args) -> None:
+    engine = create_async_engine(args.database_url, **build_engine_kwargs())
+    session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await create_schema(engine)
+
+    async with session_maker() as db:
+        total = (await db.execute(select(func.count(Post.id)))).scalar_one()
+    need = args.page * args.limit + args.limit
+    if total < need:
+        owner_id = await ensure_user(session_maker)
+        await seed_posts(session_maker, owner_id, need - total)
+
+    report = {"limit": args.limit, "deep_page": args.page}
+    async with session_maker() as db:
+        # курсор, который клиент получил бы на странице args.page
+        deep = (
+            await db.execute(
+                select(Post.created_at, Post.id)
+                .order_by(Post.created_at.desc(), Post.id.desc())
+                .offset(args.page * args.limit - 1)
+                .limit(1)
+            )
+        ).one()
+        deep_cursor = encode_cursor(deep.created_at, deep.id)
+
+        async def offset_page(page):
+            q = select(Post).order_by(Post.created_at.desc(), Post.id.desc())
+            await db.execute(q.offset(page * args.limit).limit(args.limit))
+            db.expunge_all()
+
+        async def keyset_page(cursor):
+            await crud.get_posts(db, cursor=cursor, limit=args.limit)
+            db.expunge_all()
+
+        report["offset"] = {
+            "page_1": await timed(lambda: offset_page(0), args.repeat),
+            f"page_{args.page}": await timed(lambda: offset_page(args.page), args.repeat),
+        }
+        report["keyset"] = {
+            "page_1": await timed(lambda: keyset_page(None), args.repeat),
+            f"page_{args.page}": await timed(lambda: keyset_page(deep_cursor), args.repeat),
+        }
+    await engine.dispose()
+    print_report(report)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--page", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,67 @@
+# social_mini/bench/pool.py
+"""
+NullPool против пула соединений на горячем пути чтения GET /posts/.
+
+    DATABASE_URL=postgresql+asyncpg://... python -m social_mini.bench.pool --requests 2000 --concurrency 32
+"""
+import argparse
+import asyncio
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from social_mini.bench.common import (
+    asgi_client,
+    create_schema,
+    drive,
+    ensure_user,
+    override_db,
+    print_report,
+    seed_posts,
+    summarize,
+)
+from social_mini.database import DATABASE_URL, build_engine_kwargs, get_pool_stats
+from social_mini.main import app
+
+
+async def bench_mode(mode: str, url: str, requests: int, concurrency: int) -> dict:
+    engine = create_async_engine(url, **build_engine_kwargs(mode))
+    session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    try:
+        with override_db(app, session_maker):
+            async with asgi_client(app) as client:
+                async def read_posts(_):
+                    resp = await client.get("/posts/", params={"limit": 10})
+                    resp.raise_for_status()
+
+                await drive(read_posts, min(requests, concurrency * 2), concurrency)  # прогрев
+                latencies, elapsed = await drive(read_posts, requests, concurrency)
+        result = summarize(latencies, elapsed)
+        result["pool"] = get_pool_stats(engine)
+        return result
+    finally:
+        await engine.dispose()
+
+
+async def main(args) -> None:
+    seed_engine = create_async_engine(args.database_url, **build_engine_kwargs("null"))
+    seed_maker = sessionmaker(seed_engine, class_=AsyncSession, expire_on_commit=False)
+    await create_schema(seed_engine)
+    if args.seed:
+        owner_id = await ensure_user(seed_maker)
+        await seed_posts(seed_maker, owner_id, args.seed)
+    await seed_engine.dispose()
+
+    report = {"database_url": args.database_url.split("@")[-1], "concurrency": args.concurrency}
+    for mode in ("null", "queue"):
+        report[mode] = await bench_mode(mode, args.database_url, args.requests, args.concurrency)
+    print_report(report)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=200, help="сколько постов досоздать перед прогоном")
+    asyncio.run(main(parser.parse_args()))
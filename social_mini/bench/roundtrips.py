@@ -0,0 +1,145 @@
+# social_mini/bench/roundtrips.py
+"""
+Сколько обращений к БД стоит один лайк/подписка: старый путь SELECT → INSERT → COMMIT → REFRESH
+против INSERT ... ON CONFLICT DO NOTHING RETURNING.
+
+    DATABASE_URL=postgresql+asyncpg://... python -m social_mini.bench.roundtrips --ops 500
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import event, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from social_mini.bench.common import BENCH_PASSWORD_HASH, create_schema, ensure_user, print_report
+from social_mini.crud import follow as follow_crud
+from social_mini.crud import like as like_crud
+from social_mini.database import DATABASE_URL, build_engine_kwargs
+from social_mini.models.follow import Follow
+from social_mini.models.like import Like
+from social_mini.models.post import Post
+from social_mini.models.user import User
+
+
+class RoundTripCounter:
+    """Считает SQL-выражения и COMMIT'ы — каждый из них отдельный поход в БД."""
+
+    def __init__(self, sync_engine):
+        self.count = 0
+        event.listen(sync_engine, "before_cursor_execute", self._on_statement)
+        event.listen(sync_engine, "commit", self._on_statement)
+
+    def _on_statement(self, *args, **kwargs):
+        self.count += 1
+
+
+async def legacy_like(db: AsyncSession, user_id: int, post_id: int):
+    """Путь до перехода на upsert: проверка поста, проверка лайка, INSERT, COMMIT, REFRESH."""
+    res = await db.execute(select(Post).where(Post.id == post_id))
+    if res.scalar_one_or_none() is None:
+        return None
+    res = await db.execute(select(Like).where(Like.user_id == user_id, Like.post_id == post_id))
+    like = res.scalar_one_or_none()
+    if like:
+        return like
+    like = Like(user_id=user_id, post_id=post_id)
+    db.add(like)
+    await db.commit()
+    await db.refresh(like)
+    return like
+
+
+async def legacy_follow(db: AsyncSession, follower_id: int, user_id: int):
+    res = await db.execute(select(User).where(User.id == user_id))
+    if res.scalar_one_or_none() is None:
+        return None
+    res = await db.execute(
+        select(Follow).where(Follow.follower_id == follower_id, Follow.user_id == user_id)
+    )
+    follow = res.scalar_one_or_none()
+    if follow:
+        return follow
+    follow = Follow(follower_id=follower_id, user_id=user_id)
+    db.add(follow)
+    await db.commit()
+    await db.refresh(follow)
+    return follow
+
+
+async def measure(session_maker, counter: RoundTripCounter, op, targets: list[int]) -> dict:
+    counter.count = 0
+    start = time.perf_counter()
+    for target in targets:
+        async with session_maker() as db:
+            await op(db, target)
+    elapsed = time.perf_counter() - start
+    return {
+        "round_trips_per_op": round(counter.count / len(targets), 2),
+        "us_per_op": round(elapsed / len(targets) * 1e6, 1),
+    }
+
+
+async def main(args) -> None:
+    engine = create_async_engine(args.database_url, **build_engine_kwargs())
+    session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await create_schema(engine)
+    counter = RoundTripCounter(engine.sync_engine)
+
+    actor_id = await ensure_user(session_maker, "bench_actor")
+    owner_id = await ensure_user(session_maker)
+    async with session_maker() as db:
+        post_ids, user_ids = [], []
+        for i in range(args.ops * 2):
+            res = await db.execute(
+                insert(Post).values(title=f"rt {i}", content="rt", owner_id=owner_id).returning(Post.id)
+            )
+            post_ids.append(res.scalar_one())
+            res = await db.execute(
+                insert(User)
+                .values(username=f"rt_{time.time_ns()}_{i}", email=f"rt{i}_{time.time_ns()}@bench.local",
+                        hashed_password=BENCH_PASSWORD_HASH)
+                .returning(User.id)
+            )
+            user_ids.append(res.scalar_one())
+        await db.commit()
+
+    legacy_posts, new_posts = post_ids[:args.ops], post_ids[args.ops:]
+    legacy_users, new_users = user_ids[:args.ops], user_ids[args.ops:]
+    report = {"dialect": engine.dialect.name, "ops": args.ops, "like": {}, "follow": {}}
+
+    async def new_like(db, post_id):
+        await like_crud.like_post(db, actor_id, post_id)
+
+    async def old_like(db, post_id):
+        await legacy_like(db, actor_id, post_id)
+
+    async def new_follow(db, user_id):
+        await follow_crud.follow_user(db, actor_id, user_id)
+
+    async def old_follow(db, user_id):
+        await legacy_follow(db, actor_id, user_id)
+
+    async def new_unlike(db, post_id):
+        await like_crud.unlike_post(db, actor_id, post_id)
+
+    # первый проход — новая запись, второй — повторный «двойной тап»
+    report["like"]["legacy_first"] = await measure(session_maker, counter, old_like, legacy_posts)
+    report["like"]["legacy_repeat"] = await measure(session_maker, counter, old_like, legacy_posts)
+    report["like"]["upsert_first"] = await measure(session_maker, counter, new_like, new_posts)
+    report["like"]["upsert_repeat"] = await measure(session_maker, counter, new_like, new_posts)
+    report["like"]["unlike_returning"] = await measure(session_maker, counter, new_unlike, new_posts)
+    report["follow"]["legacy_first"] = await measure(session_maker, counter, old_follow, legacy_users)
+    report["follow"]["legacy_repeat"] = await measure(session_maker, counter, old_follow, legacy_users)
+    report["follow"]["upsert_first"] = await measure(session_maker, counter, new_follow, new_users)
+    report["follow"]["upsert_repeat"] = await measure(session_maker, counter, new_follow, new_users)
+    await engine.dispose()
+    print_report(report)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    parser.add_argument("--ops", type=int, default=500)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,139 @@
+# social_mini/bench/search.py
+"""
+Поиск по постам: ILIKE '%слово%' (полный скан) против tsvector + GIN
+(на SQLite — против инвертированного индекса в памяти).
+
+Корпус синтетический: словарь из 5000 «слов», частоты убывают степенным законом,
+поэтому есть и редкие, и очень частые термины.
+
+    DATABASE_URL=postgresql+asyncpg://... python -m social_mini.bench.search --posts 1000000
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from sqlalchemy import func, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from social_mini.bench.common import create_schema, ensure_user, percentile, print_report
+from social_mini.crud import search as search_crud
+from social_mini.database import DATABASE_URL, build_engine_kwargs
+from social_mini.models.post import Post
+
+VOCABULARY = 5000
+WORDS_PER_POST = 20
+TITLE_WORDS = 3
+
+# слово — 'w' + номер; power(random(), 3) делает маленькие номера частыми
+_PG_SEED = text("""
+INSERT INTO posts (title, content, owner_id)
+SELECT t.title, t.content, :owner_id
+FROM generate_series(1, :n) AS g
+CROSS JOIN LATERAL (
+    SELECT string_agg(w, ' ') FILTER (WHERE i <= :title_words) AS title,
+           string_agg(w, ' ') AS content
+    FROM (
+        SELECT i, 'w' || lpad(floor(power(random(), 3) * :vocab)::int::text, 4, '0') AS w
+        FROM generate_series(1, :words) AS i
+        WHERE g > 0
+    ) AS words
+) AS t
+""")
+
+
+def _word(rng: random.Random) -> str:
+    return "w%04d" % int(rng.random() ** 3 * VOCABULARY)
+
+
+async def seed_corpus(session_maker, owner_id: int, count: int, dialect: str, batch: int = 50000) -> None:
+    rng = random.Random(42)
+    async with session_maker() as db:
+        for start in range(0, count, batch):
+            size = min(batch, count - start)
+            if dialect == "postgresql":
+                await db.execute(_PG_SEED, {
+                    "owner_id": owner_id, "n": size, "title_words": TITLE_WORDS,
+                    "vocab": VOCABULARY, "words": WORDS_PER_POST,
+                })
+            else:
+                rows = []
+                for _ in range(size):
+                    words = [_word(rng) for _ in range(WORDS_PER_POST)]
+                    rows.append({"title": " ".join(words[:TITLE_WORDS]), "content": " ".join(words),
+                                 "owner_id": owner_id})
+                await db.execute(Post.__table__.insert(), rows)
+            await db.commit()
+            print(f"seeded {start + size}/{count}", flush=True)
+
+
+async def timed(fn, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        found = await fn()
+        samples.append(time.perf_counter() - start)
+    return {
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "rows": found,
+    }
+
+
+async def main(args) -> None:
+    engine = create_async_engine(args.database_url, **build_engine_kwargs())
+    session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await create_schema(engine)
+    dialect = engine.dialect.name
+
+    async with session_maker() as db:
+        total = (await db.execute(select(func.count(Post.id)))).scalar_one()
+    if total < args.posts:
+        owner_id = await ensure_user(session_maker)
+        await seed_corpus(session_maker, owner_id, args.posts - total, dialect)
+    async with session_maker() as db:
+        started = time.perf_counter()
+        indexed = await search_crud.reindex_posts(db)
+        index_s = round(time.perf_counter() - started, 2)
+        if dialect == "postgresql":
+            await db.execute(text("ANALYZE posts"))
+            await db.commit()
+
+    # редкое, среднее и частое слово; отсутствующее — худший случай для скана
+    terms = {"rare": "w4990", "medium": "w1500", "common": "w0001", "absent": "w9999"}
+    report = {"dialect": dialect, "posts": max(total, args.posts), "limit": args.limit,
+              "index_build": {"rows": indexed, "seconds": index_s}}
+    async with session_maker() as db:
+        for label, term in terms.items():
+            pattern = f"%{term}%"
+
+            async def ilike():
+                q = (
+                    select(Post.id)
+                    .where(or_(Post.title.ilike(pattern), Post.content.ilike(pattern)))
+                    .order_by(Post.id.desc())
+                    .limit(args.limit)
+                )
+                return len((await db.execute(q)).all())
+
+            async def fulltext():
+                rows, _ = await search_crud.search_posts(db, term, limit=args.limit)
+                return len(rows)
+
+            report[label] = {
+                "term": term,
+                "ilike_scan": await timed(ilike, args.repeat),
+                "fulltext_index": await timed(fulltext, args.repeat),
+            }
+    await engine.dispose()
+    print_report(report)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    parser.add_argument("--posts", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,156 @@
+# social_mini/bench/serialization.py
+"""
+Страница из 1000 элементов: ORM-объекты + pydantic (from_attributes) + JSON
+против Core-строк в __slots__-DTO + orjson (crud/rows.py, api/responses.py).
+
+Меряется весь путь «запрос в БД → байты ответа»: процессорное время на страницу
+и на элемент, пик памяти на страницу (tracemalloc, отдельным прогоном).
+
+    DATABASE_URL=postgresql+asyncpg://... python -m social_mini.bench.serialization --items 1000
+"""
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+
+from pydantic import TypeAdapter
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from social_mini.api.responses import FastJSONResponse
+from social_mini.bench.common import BENCH_PASSWORD_HASH, create_schema, ensure_user, print_report, seed_posts
+from social_mini.crud import comment as comment_crud
+from social_mini.crud import follow as follow_crud
+from social_mini.crud import post as post_crud
+from social_mini.crud import rows as rows_crud
+from social_mini.database import DATABASE_URL, build_engine_kwargs
+from social_mini.models.comment import Comment
+from social_mini.models.follow import Follow
+from social_mini.models.post import Post
+from social_mini.models.user import User
+from social_mini.schemas.comment import CommentOut
+from social_mini.schemas.follow import FollowOut
+from social_mini.schemas.post import PostOut
+
+FOLLOWER_PREFIX = "bench_follower_"
+
+
+async def seed(session_maker, items: int) -> tuple[int, int]:
+    """Не меньше items постов, комментариев у одного поста и подписчиков у одного автора."""
+    owner_id = await ensure_user(session_maker)
+    async with session_maker() as db:
+        posts = (await db.execute(select(func.count(Post.id)))).scalar_one()
+    if posts < items:
+        await seed_posts(session_maker, owner_id, items - posts)
+
+    async with session_maker() as db:
+        post_id = (await db.execute(
+            select(Post.id).where(Post.owner_id == owner_id).order_by(Post.id).limit(1)
+        )).scalar_one()
+        comments = (await db.execute(
+            select(func.count(Comment.id)).where(Comment.post_id == post_id)
+        )).scalar_one()
+        if comments < items:
+            await db.execute(insert(Comment), [
+                {"content": f"bench comment {i}", "user_id": owner_id, "post_id": post_id}
+                for i in range(comments, items)
+            ])
+
+        followers = (await db.execute(
+            select(func.count(Follow.id)).where(Follow.user_id == owner_id)
+        )).scalar_one()
+        if followers < items:
+            names = [f"{FOLLOWER_PREFIX}{i}" for i in range(followers, items)]
+            await db.execute(insert(User), [
+                {"username": n, "email": f"{n}@example.com", "hashed_password": BENCH_PASSWORD_HASH}
+                for n in names
+            ])
+            ids = (await db.execute(select(User.id).where(User.username.in_(names)))).scalars().all()
+            await db.execute(insert(Follow), [{"follower_id": i, "user_id": owner_id} for i in ids])
+        await db.commit()
+    return owner_id, post_id
+
+
+def legacy_render(adapter: TypeAdapter, items) -> bytes:
+    """Как FastAPI с response_model: валидация from_attributes, dump в JSON-совместимое и json.dumps."""
+    validated = adapter.validate_python(items, from_attributes=True)
+    content = adapter.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def fast_render(items) -> bytes:
+    return FastJSONResponse(items).body
+
+
+async def measure(session_maker, fetch, render, repeat: int) -> dict:
+    async def once():
+        # новая сессия на каждую страницу — как новый запрос
+        async with session_maker() as db:
+            items, _ = await fetch(db)
+            return render(items), len(items)
+
+    await once()
+    cpu = []
+    for _ in range(repeat):
+        started = time.process_time()
+        body, count = await once()
+        cpu.append(time.process_time() - started)
+
+    tracemalloc.start()
+    await once()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    best = min(cpu)
+    return {
+        "items": count,
+        "cpu_ms_per_page": round(best * 1000, 2),
+        "cpu_us_per_item": round(best / max(count, 1) * 1e6, 2),
+        "peak_kib_per_page": round(peak / 1024, 1),
+        "bytes": len(body),
+    }
+
+
+async def main(args) -> None:
+    engine = create_async_engine(args.database_url, **build_engine_kwargs())
+    session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await create_schema(engine)
+    owner_id, post_id = await seed(session_maker, args.items)
+    n = args.items
+
+    cases = {
+        "posts": (
+            lambda db: post_crud.get_posts(db, limit=n), TypeAdapter(list[PostOut]),
+            lambda db: rows_crud.list_post_rows(db, limit=n),
+        ),
+        "comments": (
+            lambda db: comment_crud.get_comments_for_post(db, post_id, limit=n), TypeAdapter(list[CommentOut]),
+            lambda db: rows_crud.list_comment_rows(db, post_id, limit=n),
+        ),
+        "followers": (
+            lambda db: follow_crud.get_followers(db, owner_id, limit=n), TypeAdapter(list[FollowOut]),
+            lambda db: rows_crud.list_follower_rows(db, owner_id, limit=n),
+        ),
+    }
+    report = {"dialect": engine.dialect.name, "repeat": args.repeat}
+    for name, (legacy_fetch, adapter, fast_fetch) in cases.items():
+        legacy = await measure(session_maker, legacy_fetch, lambda items: legacy_render(adapter, items), args.repeat)
+        fast = await measure(session_maker, fast_fetch, fast_render, args.repeat)
+        report[name] = {
+            "orm_pydantic_json": legacy,
+            "rows_dto_fastjson": fast,
+            "cpu_speedup": round(legacy["cpu_ms_per_page"] / fast["cpu_ms_per_page"], 2),
+            "memory_ratio": round(legacy["peak_kib_per_page"] / fast["peak_kib_per_page"], 2),
+        }
+    await engine.dispose()
+    print_report(report)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,230 @@
+# social_mini/core/admission.py
+"""
+Допуск запросов: лучше быстро ответить 503, чем копить очередь в пуле БД.
+
+Запросы делятся на классы по стоимости: auth (bcrypt), write, read. У каждого
+класса — свой предел одновременных запросов и ограниченная очередь ожидания
+с дедлайном. Очередь полна или дедлайн истёк — 503 с Retry-After.
+
+Отдельно — лимит частоты на клиента (пользователь по токену, иначе IP):
+GCRA, то есть token bucket в виде одного числа на ключ. Хранилище — бэкенд
+кэша (core/cache.py): memory в процессе или shared на всех воркерах.
+"""
+import asyncio
+import json
+import math
+import time
+from collections import deque
+
+from social_mini.core import config
+from social_mini.core.cache import MemoryBackend, build_cache
+from social_mini.core.security import decode_token_subject
+
+AUTH, WRITE, READ = "auth", "write", "read"
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+# долгие соединения и служебное: у стрима событий свой лимит (EVENTS_MAX_CONNECTIONS)
+EXEMPT_PREFIXES = ("/health", "/metrics", "/events/stream", "/frontend", "/docs", "/redoc", "/openapi.json")
+
+
+class Rejected(Exception):
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def route_class(method: str, path: str) -> str | None:
+    """Класс запроса по методу и пути; None — без ограничений."""
+    if path.startswith(EXEMPT_PREFIXES):
+        return None
+    if path.startswith("/auth/"):
+        return AUTH
+    if method in SAFE_METHODS:
+        return READ
+    return WRITE
+
+
+class ConcurrencyLimiter:
+    """
+    Не больше limit запросов одновременно и не больше max_queue ждущих.
+    Освободившийся слот передаётся первому в очереди напрямую (FIFO),
+    поэтому новые запросы не обгоняют ждущих.
+    """
+
+    def __init__(self, limit: int, max_queue: int, timeout: float):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.in_flight = 0
+        self.rejected = {"queue_full": 0, "timeout": 0}
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> None:
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            self.rejected["queue_full"] += 1
+            raise Rejected("queue_full", self.timeout)
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done():
+                # слот уже передали, а мы уходим — отдаём его следующему
+                self.release()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.rejected["timeout"] += 1
+            raise Rejected("timeout", self.timeout) from None
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # in_flight не меняется: слот переходит к ждущему
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "max_queue": self.max_queue,
+            "rejected": dict(self.rejected),
+        }
+
+
+class RateLimiter:
+    """
+    GCRA: на ключ хранится одно время tat («когда ведро снова полное»).
+    rate запросов в секунду в среднем и до burst подряд.
+
+    В shared-хранилище чтение и запись — два запроса, и параллельный воркер
+    может вклиниться между ними: лимит мягкий, с точностью до пары запросов.
+    """
+
+    def __init__(self, rate: float, burst: int, store=None):
+        self.rate = rate
+        self.burst = burst
+        self.interval = 1 / rate
+        self.window = burst * self.interval
+        self.store = store or MemoryBackend(config.RATE_LIMIT_KEYS, self.window + 1)
+        self.rejected = 0
+
+    async def take(self, key: str) -> None:
+        now = time.time()
+        tat = max(await self.store.get(key) or now, now)
+        new_tat = tat + self.interval
+        if new_tat - now > self.window:
+            self.rejected += 1
+            raise Rejected("rate_limited", new_tat - now - self.window)
+        await self.store.set(key, new_tat, self.window + 1)
+
+    def stats(self) -> dict:
+        return {"rate": self.rate, "burst": self.burst, "rejected": self.rejected}
+
+
+def build_limiters() -> dict[str, ConcurrencyLimiter]:
+    timeout = config.ADMISSION_QUEUE_TIMEOUT
+    return {
+        AUTH: ConcurrencyLimiter(config.ADMISSION_AUTH_LIMIT, config.ADMISSION_AUTH_QUEUE, timeout),
+        WRITE: ConcurrencyLimiter(config.ADMISSION_WRITE_LIMIT, config.ADMISSION_WRITE_QUEUE, timeout),
+        READ: ConcurrencyLimiter(config.ADMISSION_READ_LIMIT, config.ADMISSION_READ_QUEUE, timeout),
+    }
+
+
+def build_rate_limiter() -> RateLimiter | None:
+    """RATE_LIMIT_PER_SECOND=0 — без лимита частоты; хранилище — по CACHE_BACKEND."""
+    if config.RATE_LIMIT_PER_SECOND <= 0:
+        return None
+    rate, burst = config.RATE_LIMIT_PER_SECOND, config.RATE_LIMIT_BURST
+    store = None
+    if config.CACHE_BACKEND == "shared":
+        store = build_cache("ratelimit", config.RATE_LIMIT_KEYS, burst / rate + 1)
+    return RateLimiter(rate, burst, store)
+
+
+def client_key(scope) -> str:
+    """Пользователь из Bearer-токена, иначе адрес клиента."""
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer":
+                username = decode_token_subject(token.strip())
+                if username is not None:
+                    return f"user:{username}"
+            break
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+class AdmissionMiddleware:
+    """Чистый ASGI, как MetricsMiddleware: отказ — до роутинга, зависимостей и get_db."""
+
+    def __init__(self, app, limits: dict | None = None, rate: RateLimiter | None = None):
+        self.app = app
+        self.limiters = limiters if limits is None else limits
+        self.rate_limiter = rate_limiter if rate is None else rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        kind = route_class(scope["method"], scope["path"])
+        if kind is None:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limiters[kind]
+        try:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.take(client_key(scope))
+            await limiter.acquire()
+        except Rejected as e:
+            await self._reject(send, e)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+
+    @staticmethod
+    async def _reject(send, rejected: Rejected) -> None:
+        if rejected.reason == "rate_limited":
+            status, detail = 429, "Too many requests"
+        else:
+            status, detail = 503, "Server is overloaded, retry later"
+        body = json.dumps({"detail": detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(rejected.retry_after))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+
+limiters = build_limiters()
+rate_limiter = build_rate_limiter()
+
+
+def get_admission_stats() -> dict:
+    result = {kind: limiter.stats() for kind, limiter in limiters.items()}
+    if rate_limiter is not None:
+        result["rate_limit"] = rate_limiter.stats()
+    return result
@@ -0,0 +1,208 @@
+# social_mini/core/cache.py
+"""
+Небольшой in-process кэш (LRU с ограничением размера и TTL на запись)
+и подключаемые асинхронные бэкенды поверх него или общего Redis.
+"""
+import json
+import time
+from collections import OrderedDict
+
+from social_mini.core import config
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    LRU-кэш с временем жизни записей и счётчиками попаданий.
+    Рассчитан на один event loop, поэтому без блокировок.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        item = self._data.get(key, _MISSING)
+        if item is not _MISSING:
+            value, expires_at = item
+            if expires_at > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._data[key]
+        self.misses += 1
+        return default
+
+    def set(self, key, value, ttl: float | None = None) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        self._data[key] = (value, time.monotonic() + ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+# ---------- Подключаемые бэкенды ----------
+
+class MemoryBackend:
+    """Асинхронная обёртка над TTLCache: кэш в памяти процесса."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize, ttl)
+
+    async def get(self, key):
+        return self._cache.get(key)
+
+    async def set(self, key, value, ttl: float | None = None) -> None:
+        self._cache.set(key, value, ttl)
+
+    async def delete(self, key) -> None:
+        self._cache.delete(key)
+
+    async def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return {"backend": "memory", **self._cache.stats()}
+
+
+class NullBackend:
+    """Кэш выключен: всегда промах."""
+
+    async def get(self, key):
+        return None
+
+    async def set(self, key, value, ttl: float | None = None) -> None:
+        pass
+
+    async def delete(self, key) -> None:
+        pass
+
+    async def clear(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {"backend": "none"}
+
+
+class LocalSharedClient:
+    """
+    Локальная замена Redis с тем же подмножеством API (get / set(ex=) / delete / flushdb):
+    значения — байты, время жизни — в секундах. Для разработки и тестов общего бэкенда.
+    """
+
+    def __init__(self):
+        self._data: dict[str, tuple[bytes, float]] = {}
+
+    async def get(self, key: str):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    async def set(self, key: str, value: bytes, ex: int | None = None) -> None:
+        expires_at = time.monotonic() + ex if ex else float("inf")
+        self._data[key] = (value, expires_at)
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    async def flushdb(self) -> None:
+        self._data.clear()
+
+
+class SharedBackend:
+    """
+    Общий для всех процессов кэш поверх Redis-совместимого клиента.
+    Значения сериализуются в JSON, поэтому кэшировать можно только простые данные.
+    """
+
+    def __init__(self, client, prefix: str, ttl: float):
+        self._client = client
+        self._prefix = prefix
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, key) -> str:
+        return f"{self._prefix}:{key}"
+
+    async def get(self, key):
+        raw = await self._client.get(self._key(key))
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    async def set(self, key, value, ttl: float | None = None) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        await self._client.set(self._key(key), json.dumps(value).encode(), ex=max(1, int(ttl)))
+
+    async def delete(self, key) -> None:
+        await self._client.delete(self._key(key))
+
+    async def clear(self) -> None:
+        # только для тестов/локальной замены: FLUSHDB на общем Redis стёр бы чужие ключи
+        if isinstance(self._client, LocalSharedClient):
+            await self._client.flushdb()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "backend": "shared",
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+def _shared_client(url: str):
+    if not url:
+        return LocalSharedClient()
+    try:
+        import redis.asyncio as redis
+    except ImportError as e:
+        raise RuntimeError("CACHE_URL is set, but the 'redis' package is not installed") from e
+    return redis.from_url(url)
+
+
+def build_cache(prefix: str, maxsize: int, ttl: float):
+    """Бэкенд по config.CACHE_BACKEND: memory (по умолчанию), shared или none."""
+    if config.CACHE_BACKEND == "none" or ttl <= 0:
+        return NullBackend()
+    if config.CACHE_BACKEND == "shared":
+        return SharedBackend(_shared_client(config.CACHE_URL), prefix, ttl)
+    if config.CACHE_BACKEND == "memory":
+        return MemoryBackend(maxsize, ttl)
+    raise ValueError(f"Unknown CACHE_BACKEND {config.CACHE_BACKEND!r}")
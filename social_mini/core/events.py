@@ -0,0 +1,297 @@
+# social_mini/core/events.py
+"""
+Брокер событий для стрима GET /events/stream.
+
+CRUD после commit публикует событие в каналы (user:<id>, author:<id>, post:<id>, posts).
+Бэкенд доставляет его брокеру каждого процесса: local — сразу в этом же процессе,
+shared — через Redis pub/sub (пустой EVENTS_URL — локальная замена с тем же API).
+Брокер раскладывает событие по подписчикам каналов.
+
+У каждого подписчика — ограниченный буфер. Публикация никогда не ждёт медленного
+читателя: при переполнении выбрасываются самые старые события, а читатель получает
+lagged с их числом и сам перечитывает данные.
+"""
+import asyncio
+import itertools
+import json
+import logging
+from collections import deque
+from datetime import datetime
+
+from social_mini.core import config
+
+logger = logging.getLogger(__name__)
+
+ALL_POSTS = "posts"
+
+
+def user_channel(user_id: int) -> str:
+    """Личное: на пользователя подписались / он подписался сам."""
+    return f"user:{user_id}"
+
+
+def author_channel(user_id: int) -> str:
+    """Новые посты автора — для его подписчиков."""
+    return f"author:{user_id}"
+
+
+def post_channel(post_id: int) -> str:
+    """Лайки, комментарии, правки и удаление конкретного поста."""
+    return f"post:{post_id}"
+
+
+def _default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class Event:
+    """Событие с уже готовым SSE-кадром: кодируется один раз на всех подписчиков."""
+
+    __slots__ = ("id", "type", "data", "frame")
+
+    def __init__(self, event_id: int, event_type: str, data: dict):
+        self.id = event_id
+        self.type = event_type
+        self.data = data
+        payload = json.dumps(data, default=_default, ensure_ascii=False, separators=(",", ":"))
+        self.frame = f"id: {event_id}\nevent: {event_type}\ndata: {payload}\n\n".encode()
+
+
+class Subscriber:
+    """Очередь одного соединения: deque с maxlen сама выбрасывает старые события."""
+
+    __slots__ = ("channels", "dropped", "_queue", "_ready")
+
+    def __init__(self, buffer: int):
+        self.channels: set[str] = set()
+        self.dropped = 0
+        self._queue: deque = deque(maxlen=buffer)
+        self._ready = asyncio.Event()
+
+    def push(self, event: Event) -> None:
+        if len(self._queue) == self._queue.maxlen:
+            self.dropped += 1
+        self._queue.append(event)
+        self._ready.set()
+
+    async def next_batch(self, timeout: float) -> list[Event] | None:
+        """Всё, что накопилось; None — если за timeout ничего не пришло."""
+        if not self._queue:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        batch = list(self._queue)
+        self._queue.clear()
+        return batch
+
+
+class LocalBackend:
+    """Один процесс: публикация сразу доставляется своему брокеру."""
+
+    def __init__(self):
+        self._deliver = None
+
+    def attach(self, deliver) -> None:
+        self._deliver = deliver
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def publish(self, message: dict) -> None:
+        self._deliver(message)
+
+
+class LocalPubSubClient:
+    """
+    Локальная замена Redis pub/sub с тем же подмножеством API:
+    publish(channel, data) и pubsub() c subscribe / listen / unsubscribe / aclose.
+    """
+
+    def __init__(self):
+        self._queues: dict[str, set[asyncio.Queue]] = {}
+
+    async def publish(self, channel: str, data: bytes) -> int:
+        queues = self._queues.get(channel, ())
+        for queue in queues:
+            queue.put_nowait({"type": "message", "channel": channel, "data": data})
+        return len(queues)
+
+    def pubsub(self) -> "_LocalPubSub":
+        return _LocalPubSub(self)
+
+
+class _LocalPubSub:
+    def __init__(self, client: LocalPubSubClient):
+        self._client = client
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._channels: set[str] = set()
+
+    async def subscribe(self, *channels: str) -> None:
+        for channel in channels:
+            self._client._queues.setdefault(channel, set()).add(self._queue)
+            self._channels.add(channel)
+
+    async def unsubscribe(self, *channels: str) -> None:
+        for channel in channels or tuple(self._channels):
+            self._client._queues.get(channel, set()).discard(self._queue)
+            self._channels.discard(channel)
+
+    async def listen(self):
+        while True:
+            yield await self._queue.get()
+
+    async def aclose(self) -> None:
+        await self.unsubscribe()
+
+
+class SharedBackend:
+    """
+    Несколько процессов: все события идут через один канал Redis, каждый процесс
+    слушает его фоновой задачей и раздаёт своим подписчикам.
+    """
+
+    def __init__(self, client, channel: str = "social_mini:events"):
+        self._client = client
+        self._channel = channel
+        self._deliver = None
+        self._pubsub = None
+        self._task: asyncio.Task | None = None
+
+    def attach(self, deliver) -> None:
+        self._deliver = deliver
+
+    async def start(self) -> None:
+        """Вызывается в lifespan приложения: без слушателя события до процесса не дойдут."""
+        self._pubsub = self._client.pubsub()
+        await self._pubsub.subscribe(self._channel)
+        self._task = asyncio.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        async for message in self._pubsub.listen():
+            if message.get("type") != "message":
+                continue
+            try:
+                self._deliver(json.loads(message["data"]))
+            except Exception:
+                logger.exception("Bad event message")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+
+    async def publish(self, message: dict) -> None:
+        data = json.dumps(message, default=_default, ensure_ascii=False)
+        await self._client.publish(self._channel, data.encode())
+
+
+class Broker:
+    def __init__(self, backend):
+        self.backend = backend
+        self._channels: dict[str, set[Subscriber]] = {}
+        self._ids = itertools.count(1)
+        self.subscribers = 0
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        backend.attach(self.deliver)
+
+    async def start(self) -> None:
+        await self.backend.start()
+
+    async def stop(self) -> None:
+        await self.backend.stop()
+
+    def subscribe(self, channels, buffer: int = config.EVENTS_BUFFER) -> Subscriber:
+        sub = Subscriber(buffer)
+        self.subscribers += 1
+        self.add_channels(sub, channels)
+        return sub
+
+    def add_channels(self, sub: Subscriber, channels) -> None:
+        for channel in channels:
+            self._channels.setdefault(channel, set()).add(sub)
+            sub.channels.add(channel)
+
+    def remove_channels(self, sub: Subscriber, channels) -> None:
+        for channel in channels:
+            subs = self._channels.get(channel)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._channels[channel]
+            sub.channels.discard(channel)
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        self.remove_channels(sub, list(sub.channels))
+        self.subscribers -= 1
+
+    async def publish(self, event_type: str, data: dict, *channels: str) -> None:
+        """
+        Вызывать после commit. Ошибка доставки не должна ронять уже выполненную
+        запись, поэтому она только логируется.
+        """
+        self.published += 1
+        try:
+            await self.backend.publish({"type": event_type, "data": data, "channels": channels})
+        except Exception:
+            logger.exception("Failed to publish %s", event_type)
+
+    def deliver(self, message: dict) -> None:
+        targets: set[Subscriber] = set()
+        for channel in message["channels"]:
+            targets.update(self._channels.get(channel, ()))
+        if not targets:
+            return
+        event = Event(next(self._ids), message["type"], message["data"])
+        for sub in targets:
+            before = sub.dropped
+            sub.push(event)
+            self.dropped += sub.dropped - before
+        self.delivered += len(targets)
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__,
+            "subscribers": self.subscribers,
+            "channels": len(self._channels),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
+
+
+def _shared_client(url: str):
+    if not url:
+        return LocalPubSubClient()
+    try:
+        import redis.asyncio as redis
+    except ImportError as e:
+        raise RuntimeError("EVENTS_URL is set, but the 'redis' package is not installed") from e
+    return redis.from_url(url)
+
+
+def build_broker() -> Broker:
+    """Бэкенд по config.EVENTS_BACKEND: local (по умолчанию) или shared."""
+    if config.EVENTS_BACKEND == "local":
+        return Broker(LocalBackend())
+    if config.EVENTS_BACKEND == "shared":
+        return Broker(SharedBackend(_shared_client(config.EVENTS_URL)))
+    raise ValueError(f"Unknown EVENTS_BACKEND {config.EVENTS_BACKEND!r}")
+
+
+broker = build_broker()
@@ -0,0 +1,332 @@
+# social_mini/core/jobs.py
+"""
+Фоновые задачи для побочных эффектов записи: обработчик делает commit,
+ставит задачу и отвечает, а тяжёлая часть (например, раскладка поста по
+лентам подписчиков) выполняется воркерами.
+
+- Воркеры — задачи asyncio, запускаются и останавливаются в lifespan приложения.
+  Пока они не запущены (тесты, скрипты), enqueue выполняет задачу сразу.
+- Воркер берёт пачку задач одного типа, обработчик получает список payload'ов.
+  Упавшая пачка перезапускается по одной задаче, упавшая задача повторяется
+  с экспоненциальной задержкой, после JOBS_MAX_ATTEMPTS — выбрасывается в лог.
+- Доставка «хотя бы один раз»: обработчики должны быть идемпотентными.
+- Хранилище: memory (в процессе; при остановке ждём опустошения очереди
+  JOBS_DRAIN_TIMEOUT секунд) или table (таблица jobs, переживает перезапуск).
+"""
+import asyncio
+import json
+import logging
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from heapq import heappop, heappush
+from itertools import count
+
+from sqlalchemy import delete, func, insert, select, update
+
+from social_mini.core import config
+from social_mini.database import async_session_maker
+from social_mini.models.job import Job as JobRow
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Job:
+    type: str
+    payload: dict
+    attempts: int = 0
+    enqueued_at: float = field(default_factory=time.time)
+    id: int | None = None
+
+
+class MemoryStore:
+    """Очередь в памяти процесса: ready — FIFO, отложенные повторы — куча по времени."""
+
+    def __init__(self):
+        self._ready: deque[Job] = deque()
+        self._delayed: list = []
+        self._seq = count()
+
+    def _promote(self) -> None:
+        now = time.time()
+        while self._delayed and self._delayed[0][0] <= now:
+            self._ready.append(heappop(self._delayed)[2])
+
+    async def put(self, jobs: list[Job]) -> None:
+        self._ready.extend(jobs)
+
+    async def take(self, limit: int) -> list[Job]:
+        """До limit задач того же типа, что и самая старая готовая."""
+        self._promote()
+        if not self._ready:
+            return []
+        job_type = self._ready[0].type
+        batch, skipped = [], deque()
+        while self._ready and len(batch) < limit:
+            job = self._ready.popleft()
+            (batch if job.type == job_type else skipped).append(job)
+        skipped.extend(self._ready)
+        self._ready = skipped
+        return batch
+
+    async def done(self, jobs: list[Job]) -> None:
+        pass
+
+    async def retry(self, job: Job, delay: float) -> None:
+        heappush(self._delayed, (time.time() + delay, next(self._seq), job))
+
+    async def drop(self, job: Job) -> None:
+        pass
+
+    async def refresh(self) -> None:
+        pass
+
+    def next_due(self) -> float | None:
+        """Через сколько секунд станет готов ближайший повтор."""
+        return max(0.0, self._delayed[0][0] - time.time()) if self._delayed else None
+
+    @property
+    def depth(self) -> int:
+        return len(self._ready) + len(self._delayed)
+
+    @property
+    def lag(self) -> float:
+        return time.time() - self._ready[0].enqueued_at if self._ready else 0.0
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class TableStore:
+    """
+    Очередь в таблице jobs. Взятая задача не удаляется, а сдвигается на JOBS_LEASE
+    вперёд: если процесс упадёт посреди обработки, её возьмёт следующий воркер.
+    На PostgreSQL несколько процессов разбирают очередь через SKIP LOCKED.
+    """
+
+    def __init__(self, session_maker, lease: float):
+        self._session_maker = session_maker
+        self.lease = lease
+        self.depth = 0
+        self.lag = 0.0
+
+    async def put(self, jobs: list[Job]) -> None:
+        now = _utcnow()
+        async with self._session_maker() as db:
+            await db.execute(insert(JobRow), [
+                {"type": j.type, "payload": json.dumps(j.payload), "attempts": j.attempts, "run_at": now}
+                for j in jobs
+            ])
+            await db.commit()
+
+    async def take(self, limit: int) -> list[Job]:
+        now = _utcnow()
+        async with self._session_maker() as db:
+            oldest = (
+                select(JobRow.type).where(JobRow.run_at <= now)
+                .order_by(JobRow.run_at, JobRow.id).limit(1).scalar_subquery()
+            )
+            q = (
+                select(JobRow).where(JobRow.type == oldest, JobRow.run_at <= now)
+                .order_by(JobRow.run_at, JobRow.id).limit(limit)
+            )
+            if db.get_bind().dialect.name == "postgresql":
+                q = q.with_for_update(skip_locked=True)
+            rows = (await db.execute(q)).scalars().all()
+            if rows:
+                await db.execute(
+                    update(JobRow)
+                    .where(JobRow.id.in_([r.id for r in rows]))
+                    .values(run_at=now + timedelta(seconds=self.lease))
+                )
+            await db.commit()
+        return [
+            Job(r.type, json.loads(r.payload), r.attempts, r.created_at.timestamp(), r.id)
+            for r in rows
+        ]
+
+    async def done(self, jobs: list[Job]) -> None:
+        async with self._session_maker() as db:
+            await db.execute(delete(JobRow).where(JobRow.id.in_([j.id for j in jobs])))
+            await db.commit()
+
+    async def retry(self, job: Job, delay: float) -> None:
+        async with self._session_maker() as db:
+            await db.execute(
+                update(JobRow)
+                .where(JobRow.id == job.id)
+                .values(attempts=job.attempts, run_at=_utcnow() + timedelta(seconds=delay))
+            )
+            await db.commit()
+
+    async def drop(self, job: Job) -> None:
+        await self.done([job])
+
+    async def refresh(self) -> None:
+        """Глубина и отставание для метрик: считаются воркером, а не при выгрузке /metrics."""
+        async with self._session_maker() as db:
+            depth, oldest = (await db.execute(
+                select(func.count(JobRow.id), func.min(JobRow.created_at))
+            )).one()
+        self.depth = depth
+        if oldest is not None and oldest.tzinfo is None:
+            oldest = oldest.replace(tzinfo=timezone.utc)
+        self.lag = (_utcnow() - oldest).total_seconds() if oldest is not None else 0.0
+
+    def next_due(self) -> float | None:
+        return None
+
+
+class JobQueue:
+    def __init__(
+        self,
+        store,
+        workers: int = config.JOBS_WORKERS,
+        batch_size: int = config.JOBS_BATCH_SIZE,
+        max_attempts: int = config.JOBS_MAX_ATTEMPTS,
+        backoff: float = config.JOBS_RETRY_BACKOFF,
+        poll_interval: float = config.JOBS_POLL_INTERVAL,
+    ):
+        self.store = store
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.poll_interval = poll_interval
+        self.handlers: dict = {}
+        self.processed: dict[str, int] = {}
+        self.failed: dict[str, int] = {}
+        self.dropped = 0
+        self._tasks: list[asyncio.Task] = []
+        self._wakeup: asyncio.Event | None = None
+        self._closing = False
+
+    def handler(self, job_type: str):
+        """Регистрирует обработчик: async def handle(payloads: list[dict]) -> None."""
+        def register(fn):
+            self.handlers[job_type] = fn
+            return fn
+        return register
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def enqueue(self, job_type: str, payload: dict) -> None:
+        """Вызывать после commit."""
+        if job_type not in self.handlers:
+            raise ValueError(f"Unknown job type {job_type!r}")
+        if not self.running:
+            # воркеров нет — выполняем сразу, как было до очереди
+            await self._run([Job(job_type, payload)], retry=False)
+            return
+        await self.store.put([Job(job_type, payload)])
+        self._wakeup.set()
+
+    async def start(self) -> None:
+        self._closing = False
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self, timeout: float = config.JOBS_DRAIN_TIMEOUT) -> None:
+        """Новые задачи идут inline; воркеры дорабатывают готовые и выходят, но не дольше timeout."""
+        if not self._tasks:
+            return
+        tasks, self._tasks = self._tasks, []
+        self._closing = True
+        self._wakeup.set()
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        if self.store.depth:
+            logger.warning("Job queue stopped with %d jobs left", self.store.depth)
+
+    async def _worker(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                batch = await self.store.take(self.batch_size)
+            except Exception:
+                logger.exception("Failed to take jobs")
+                batch = []
+            if batch:
+                try:
+                    await self._run(batch)
+                except Exception:
+                    # упало хранилище (done/retry/drop), а не обработчик: воркер живёт дальше,
+                    # TableStore отдаст задачи снова по истечении аренды
+                    logger.exception("Failed to settle %s jobs", batch[0].type)
+                continue
+            if self._closing:
+                return
+            try:
+                await self.store.refresh()
+            except Exception:
+                logger.exception("Failed to refresh job queue stats")
+            due = self.store.next_due()
+            wait = self.poll_interval if due is None else min(due, self.poll_interval)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run(self, batch: list[Job], retry: bool = True) -> None:
+        job_type = batch[0].type
+        handle = self.handlers.get(job_type)
+        try:
+            if handle is None:
+                raise LookupError(f"No handler for job type {job_type!r}")
+            await handle([job.payload for job in batch])
+        except Exception:
+            if len(batch) > 1:
+                # ищем, какая задача ломает пачку, — остальные пройдут
+                for job in batch:
+                    await self._run([job], retry)
+                return
+            await self._failed(batch[0], retry)
+            return
+        self.processed[job_type] = self.processed.get(job_type, 0) + len(batch)
+        if retry:
+            await self.store.done(batch)
+
+    async def _failed(self, job: Job, retry: bool) -> None:
+        self.failed[job.type] = self.failed.get(job.type, 0) + 1
+        job.attempts += 1
+        if not retry or job.attempts >= self.max_attempts:
+            self.dropped += 1
+            logger.exception("Job %s failed %d times, dropped: %r", job.type, job.attempts, job.payload)
+            if retry:
+                await self.store.drop(job)
+            return
+        logger.warning("Job %s failed (attempt %d), will retry", job.type, job.attempts, exc_info=True)
+        # экспоненциальная задержка с разбросом, чтобы повторы не шли одной волной
+        delay = self.backoff * 2 ** (job.attempts - 1) * random.uniform(0.5, 1.5)
+        await self.store.retry(job, delay)
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.store).__name__,
+            "workers": len(self._tasks),
+            "depth": self.store.depth,
+            "lag_seconds": round(self.store.lag, 3),
+            "processed": dict(self.processed),
+            "failed": dict(self.failed),
+            "dropped": self.dropped,
+        }
+
+
+def build_queue() -> JobQueue:
+    """Хранилище по config.JOBS_BACKEND: memory (по умолчанию) или table."""
+    if config.JOBS_BACKEND == "memory":
+        return JobQueue(MemoryStore())
+    if config.JOBS_BACKEND == "table":
+        return JobQueue(TableStore(async_session_maker, config.JOBS_LEASE))
+    raise ValueError(f"Unknown JOBS_BACKEND {config.JOBS_BACKEND!r}")
+
+
+job_queue = build_queue()
@@ -0,0 +1,237 @@
+# social_mini/core/metrics.py
+"""
+Метрики в текстовом формате Prometheus без внешних зависимостей.
+
+На горячем пути — только словарь по кортежу меток и bisect по границам
+гистограммы; текст собирается лишь при запросе /metrics.
+"""
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, doc: str, labelnames=()):
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """
+    Счётчик. Если задан collect, значение читается в момент выгрузки:
+    collect() возвращает число или словарь {кортеж меток: число}.
+    """
+    kind = "counter"
+
+    def __init__(self, name, doc, labelnames=(), collect=None):
+        super().__init__(name, doc, labelnames)
+        self._values: dict[tuple, float] = {}
+        self._collect = collect
+
+    def inc(self, *labelvalues, amount: float = 1) -> None:
+        self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues) -> float:
+        return self._values.get(labelvalues, 0)
+
+    def render(self) -> list[str]:
+        if self._collect is not None:
+            collected = self._collect()
+            self._values = collected if isinstance(collected, dict) else {(): collected}
+        lines = self.header()
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labelvalues, amount: float = 1) -> None:
+        self.inc(*labelvalues, amount=-amount)
+
+    def set(self, value: float, *labelvalues) -> None:
+        self._values[labelvalues] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, doc, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, doc, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # метки -> [счётчики по корзинам (+Inf последней), сумма, количество]
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labelvalues) -> None:
+        series = self._series.get(labelvalues)
+        if series is None:
+            series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def count(self, *labelvalues) -> int:
+        series = self._series.get(labelvalues)
+        return series[2] if series else 0
+
+    def sum(self, *labelvalues) -> float:
+        series = self._series.get(labelvalues)
+        return series[1] if series else 0.0
+
+    def render(self) -> list[str]:
+        lines = self.header()
+        for labels, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, n in zip((*self.buckets, float("inf")), counts):
+                cumulative += n
+                le = 'le="%s"' % _number(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route, method and status.", ("route", "method", "status")))
+http_latency = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency.", ("route", "method")))
+request_queries = registry.register(Histogram(
+    "http_request_db_queries", "SQL statements per HTTP request.", ("route",), QUERY_COUNT_BUCKETS))
+request_db_time = registry.register(Histogram(
+    "http_request_db_seconds", "Time spent in SQL per HTTP request.", ("route",), QUERY_BUCKETS))
+db_queries = registry.register(Counter("db_queries_total", "SQL statements executed."))
+db_query_latency = registry.register(Histogram(
+    "db_query_duration_seconds", "SQL statement latency.", (), QUERY_BUCKETS))
+
+# [число запросов, время в БД] текущего HTTP-запроса
+_request_db: ContextVar[list | None] = ContextVar("request_db", default=None)
+
+
+def install_db_metrics(sync_engine) -> None:
+    """Считает SQL-выражения и их время — всего и в рамках текущего HTTP-запроса."""
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _stop(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_started
+        db_queries.inc()
+        db_query_latency.observe(elapsed)
+        current = _request_db.get()
+        if current is not None:
+            current[0] += 1
+            current[1] += elapsed
+
+
+def _route_of(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or UNMATCHED_ROUTE
+
+
+# id(scope) -> scope запросов, которые сейчас обрабатываются
+_in_flight: dict[int, dict] = {}
+
+
+def _count_in_flight() -> dict:
+    """
+    Маршрут становится известен только после роутинга, и роутер пишет его
+    в тот же scope. Поэтому на горячем пути — только добавить/убрать scope,
+    а группировка по маршрутам делается при выгрузке метрик.
+    """
+    counts: dict[tuple, int] = {}
+    for scope in list(_in_flight.values()):
+        key = (_route_of(scope), scope["method"])
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+http_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "Requests currently being handled.", ("route", "method"),
+    collect=_count_in_flight))
+
+
+class MetricsMiddleware:
+    """Чистый ASGI (без BaseHTTPMiddleware): счётчики, латентность и SQL по маршрутам."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_holder = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder[0] = message["status"]
+            await send(message)
+
+        db_stats = [0, 0.0]
+        token = _request_db.set(db_stats)
+        _in_flight[id(scope)] = scope
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _in_flight.pop(id(scope), None)
+            _request_db.reset(token)
+            route = _route_of(scope)
+            method = scope["method"]
+            http_requests.inc(route, method, status_holder[0])
+            http_latency.observe(elapsed, route, method)
+            request_queries.observe(db_stats[0], route)
+            request_db_time.observe(db_stats[1], route)
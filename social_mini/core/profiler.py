@@ -0,0 +1,145 @@
+# social_mini/core/profiler.py
+"""
+Профилировщик SQL в рамках одного запроса (или блока кода в тестах).
+
+    with profile_queries() as profile:
+        ...
+    profile.count, profile.total_time, profile.n_plus_one()
+
+Выражения группируются по «форме»: параметры и списки IN (...) схлопываются,
+поэтому один и тот же SELECT в цикле по id виден как одна группа из N штук —
+типичный признак N+1.
+"""
+import contextlib
+import logging
+import re
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+
+from social_mini.core import config
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-query-profile"
+
+# плейсхолдеры всех драйверов, числа и строки; ::type (приведение в PG) не трогаем
+_PLACEHOLDER_RE = re.compile(r"\$\d+|\?|%\(\w+\)s|%s|(?<!:):(?!:)\w+|\b\d+(\.\d+)?\b|'(?:[^']|'')*'")
+_IN_LIST_RE = re.compile(r"\(\s*\?(\s*,\s*\?)+\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """SQL без значений: WHERE id = $1 и WHERE id = $7 — одна форма."""
+    shape = _PLACEHOLDER_RE.sub("?", statement)
+    shape = _IN_LIST_RE.sub("(?)", shape)
+    return _SPACE_RE.sub(" ", shape).strip()
+
+
+@dataclass
+class QueryProfile:
+    # (SQL, секунды) в порядке выполнения
+    statements: list = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    @property
+    def total_time(self) -> float:
+        return sum(seconds for _, seconds in self.statements)
+
+    def by_shape(self) -> dict[str, list[float]]:
+        groups: dict[str, list[float]] = {}
+        for statement, seconds in self.statements:
+            groups.setdefault(statement_shape(statement), []).append(seconds)
+        return groups
+
+    def n_plus_one(self, threshold: int | None = None) -> dict[str, int]:
+        """Формы, выполненные threshold и более раз: {форма: сколько раз}."""
+        threshold = threshold or config.QUERY_PROFILE_N_PLUS_ONE
+        return {
+            shape: len(times)
+            for shape, times in self.by_shape().items()
+            if len(times) >= threshold
+        }
+
+    def report(self) -> str:
+        lines = [f"{self.count} queries, {self.total_time * 1000:.1f} ms"]
+        for shape, times in sorted(self.by_shape().items(), key=lambda kv: -len(kv[1])):
+            lines.append(f"  {len(times)}x {sum(times) * 1000:.1f} ms  {shape}")
+        return "\n".join(lines)
+
+
+_current: ContextVar[QueryProfile | None] = ContextVar("query_profile", default=None)
+
+
+@contextlib.contextmanager
+def profile_queries():
+    """Собирает все SQL-выражения, выполненные внутри блока (в этом контексте)."""
+    profile = QueryProfile()
+    token = _current.set(profile)
+    try:
+        yield profile
+    finally:
+        _current.reset(token)
+
+
+def install_query_profiler(sync_engine) -> None:
+    """Хуки движка; пока профиль не включён, стоят одно чтение contextvar."""
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        if _current.get() is not None:
+            context._profile_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _stop(conn, cursor, statement, parameters, context, executemany):
+        profile = _current.get()
+        if profile is not None:
+            profile.statements.append((statement, time.perf_counter() - context._profile_started))
+
+
+class QueryProfilerMiddleware:
+    """
+    Включает профиль для запроса, если QUERY_PROFILE=1 или (в DEBUG) пришёл заголовок
+    X-Query-Profile. Итог — в заголовках ответа X-Query-Count и Server-Timing;
+    найденные N+1 — в X-Query-N-Plus-One и в лог.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def _enabled(self, scope) -> bool:
+        if config.QUERY_PROFILE:
+            return True
+        if not config.DEBUG:
+            return False
+        return any(name == PROFILE_HEADER.encode() for name, _ in scope["headers"])
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._enabled(scope):
+            await self.app(scope, receive, send)
+            return
+
+        with profile_queries() as profile:
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    suspects = profile.n_plus_one()
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-query-count", str(profile.count).encode()))
+                    headers.append((
+                        b"server-timing",
+                        f'db;dur={profile.total_time * 1000:.2f};desc="{profile.count} queries"'.encode(),
+                    ))
+                    if suspects:
+                        headers.append((b"x-query-n-plus-one", str(len(suspects)).encode()))
+                        logger.warning(
+                            "Possible N+1 in %s %s:\n%s", scope["method"], scope["path"], profile.report()
+                        )
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
@@ -1,3 +1,6 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from fastapi import Depends, HTTPException, status
@@ -7,7 +10,9 @@ from passlib.context import CryptContext
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from social_mini import crud, database
-from social_mini.schemas import TokenData
+from social_mini.core import config
+from social_mini.core.cache import TTLCache
+from social_mini.models.user import User
 
 SECRET_KEY = "social-mini-secret-key-change-in-production"
 ALGORITHM = "HS256"
@@ -15,6 +20,8 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
+# для публичных эндпоинтов: без токена — аноним, а не 401
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token", auto_error=False)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -22,31 +29,129 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+
+class PasswordHasher:
+    """
+    bcrypt в пуле потоков (C-код bcrypt отпускает GIL) с ограничением:
+    не больше workers вычислений одновременно и max_queue ждущих.
+    Сверх этого сразу отвечаем 429, а не копим очередь.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self.capacity = workers + max_queue
+        self.in_flight = 0
+        self.rejected = 0
+
+    async def run(self, fn, *args):
+        if self.in_flight >= self.capacity:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many authentication requests, retry later",
+                headers={"Retry-After": "1"},
+            )
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {"in_flight": self.in_flight, "capacity": self.capacity, "rejected": self.rejected}
+
+
+password_hasher = PasswordHasher(config.PASSWORD_HASH_WORKERS, config.PASSWORD_HASH_MAX_QUEUE)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_hasher.run(get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=15))
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(database.get_db)
-):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+# Кэш проверенных токенов: token -> username (живёт не дольше exp токена)
+token_cache = TTLCache(config.AUTH_TOKEN_CACHE_SIZE, config.AUTH_TOKEN_CACHE_TTL)
+# Кэш пользователей: username -> отсоединённый от сессии User
+user_cache = TTLCache(config.AUTH_USER_CACHE_SIZE, config.AUTH_USER_CACHE_TTL)
+
+
+def decode_token_subject(token: str) -> Optional[str]:
+    """username из JWT; None — если токен невалиден или истёк."""
+    username = token_cache.get(token)
+    if username is not None:
+        return username
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        token_data = TokenData(username=username)
     except JWTError:
-        raise credentials_exception
+        return None
+    username = payload.get("sub")
+    if username is None:
+        return None
+    exp = payload.get("exp")
+    ttl = exp - time.time() if exp else config.AUTH_TOKEN_CACHE_TTL
+    token_cache.set(token, username, ttl=ttl)
+    return username
 
-    user = await crud.get_user_by_username(db, username=token_data.username)
+
+def invalidate_user(username: str) -> None:
+    """Вызывать при любом изменении пользователя."""
+    user_cache.delete(username)
+
+
+def get_auth_cache_stats() -> dict:
+    return {"tokens": token_cache.stats(), "users": user_cache.stats()}
+
+
+async def _resolve_user(token: str, db: AsyncSession) -> Optional[User]:
+    """Пользователь по токену или None. В установившемся режиме не ходит в БД."""
+    username = decode_token_subject(token)
+    if username is None:
+        return None
+
+    user = user_cache.get(username)
+    if user is not None:
+        return user
+
+    user = await crud.get_user_by_username(db, username=username)
     if user is None:
-        raise credentials_exception
-    return user
\ No newline at end of file
+        return None
+    # отсоединяем, чтобы rollback/закрытие этой сессии не трогали закэшированный объект
+    db.expunge(user)
+    user_cache.set(username, user)
+    return user
+
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(database.get_db)
+):
+    """
+    Единая зависимость авторизации. В установившемся режиме не ходит в БД
+    и не проверяет подпись повторно.
+    """
+    user = await _resolve_user(token, db)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
+
+
+async def get_current_user_optional(
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    db: AsyncSession = Depends(database.get_db)
+) -> Optional[User]:
+    """Как get_current_user, но без токена (или с протухшим) отдаёт None."""
+    if not token:
+        return None
+    return await _resolve_user(token, db)
@@ -1,2 +1,2 @@
 from .user import get_user_by_username, create_user
-from .post import get_posts, create_post, get_post, delete_post
\ No newline at end of file
+from .post import get_posts, create_post, get_post, delete_post, enrich_posts, invalidate_post
\ No newline at end of file
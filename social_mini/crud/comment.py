@@ -1,8 +1,18 @@
-from sqlalchemy import select, delete
+from datetime import datetime
+
+from sqlalchemy import Integer, Text, delete, insert, literal, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..core.events import broker, post_channel
 from ..models.comment import Comment
+from ..models.post import Post
 from ..schemas.comment import CommentCreate
+from . import versions
+from .counters import bump_comments
+from .pagination import apply_cursor, make_page
+from .trending import record_comment
+
+COMMENT_COLUMNS = (Comment.id, Comment.content, Comment.user_id, Comment.post_id, Comment.created_at)
 
 
 async def create_comment(
@@ -10,22 +20,46 @@ async def create_comment(
     user_id: int,
     post_id: int,
     data: CommentCreate,
-) -> Comment:
-    comment = Comment(
-        user_id=user_id,
-        post_id=post_id,
-        content=data.content,
+):
+    """
+    INSERT ... SELECT FROM posts RETURNING: существование поста проверяет сама
+    вставка, а не кэш постов (пост мог быть удалён после попадания в кэш).
+    None — если поста нет.
+    """
+    stmt = (
+        insert(Comment)
+        .from_select(
+            ["user_id", "post_id", "content"],
+            select(literal(user_id, Integer), Post.id, literal(data.content, Text)).where(Post.id == post_id),
+        )
+        .returning(*COMMENT_COLUMNS)
     )
-    db.add(comment)
+    comment = (await db.execute(stmt)).first()
+    if comment is None:
+        await db.rollback()
+        return None
+    await bump_comments(db, post_id, 1)
     await db.commit()
-    await db.refresh(comment)
+    await versions.touch_comments(post_id)
+    record_comment(post_id, 1, at=comment.created_at)
+    await broker.publish(
+        "comment.created",
+        {"id": comment.id, "post_id": post_id, "user_id": user_id, "content": comment.content},
+        post_channel(post_id),
+    )
     return comment
 
 
-async def get_comments_for_post(db: AsyncSession, post_id: int):
-    q = select(Comment).where(Comment.post_id == post_id).order_by(Comment.created_at.desc())
+async def get_comments_for_post(
+    db: AsyncSession,
+    post_id: int,
+    cursor: str | None = None,
+    limit: int = 50,
+):
+    q = select(Comment).where(Comment.post_id == post_id)
+    q = apply_cursor(q, Comment.created_at, Comment.id, cursor, limit, db.get_bind().dialect.name)
     res = await db.execute(q)
-    return res.scalars().all()
+    return make_page(res.scalars().all(), limit)
 
 
 async def delete_comment(db: AsyncSession, comment_id: int, user_id: int) -> bool:
@@ -38,5 +72,14 @@ async def delete_comment(db: AsyncSession, comment_id: int, user_id: int) -> boo
         # не владелец — запрещаем
         return False
     await db.delete(comment)
+    await bump_comments(db, comment.post_id, -1)
     await db.commit()
-    return True
\ No newline at end of file
+    await comment_deleted(comment_id, comment.post_id, comment.created_at)
+    return True
+
+
+async def comment_deleted(comment_id: int, post_id: int, created_at: datetime | None) -> None:
+    """После commit удаления: версия для ETag, счёт в трендах и событие в стрим поста."""
+    await versions.touch_comments(post_id)
+    record_comment(post_id, -1, at=created_at)
+    await broker.publish("comment.deleted", {"id": comment_id, "post_id": post_id}, post_channel(post_id))
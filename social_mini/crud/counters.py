@@ -0,0 +1,136 @@
+import asyncio
+import logging
+
+from sqlalchemy import case, select, update, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core import config
+from ..models.comment import Comment
+from ..models.follow import Follow
+from ..models.like import Like
+from ..models.post import Post
+from ..models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+async def bump_likes(db: AsyncSession, post_id: int, delta: int) -> None:
+    """Атомарно меняет likes_count (без commit)."""
+    await db.execute(
+        update(Post)
+        .where(Post.id == post_id)
+        .values(likes_count=Post.likes_count + delta)
+    )
+
+
+async def bump_comments(db: AsyncSession, post_id: int, delta: int) -> None:
+    """Атомарно меняет comments_count (без commit)."""
+    await db.execute(
+        update(Post)
+        .where(Post.id == post_id)
+        .values(comments_count=Post.comments_count + delta)
+    )
+
+
+def follow_counts_update(follower_id, user_id, delta: int):
+    """
+    UPDATE following_count подписчика и followers_count автора; id — значения
+    или bindparam (на PostgreSQL это выражение встраивается в CTE подписки).
+    Одно выражение на обе строки — встречные подписки не ловят взаимную блокировку.
+    """
+    return (
+        update(User)
+        .where(User.id.in_([follower_id, user_id]))
+        .values(
+            following_count=User.following_count + case((User.id == follower_id, delta), else_=0),
+            followers_count=User.followers_count + case((User.id == user_id, delta), else_=0),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def bump_follows(db: AsyncSession, follower_id: int, user_id: int, delta: int) -> None:
+    """Атомарно меняет счётчики подписок обоих пользователей (без commit)."""
+    await db.execute(follow_counts_update(follower_id, user_id, delta))
+
+
+async def bump_posts(db: AsyncSession, owner_id: int, delta: int) -> None:
+    """Атомарно меняет posts_count автора (без commit)."""
+    await db.execute(
+        update(User)
+        .where(User.id == owner_id)
+        .values(posts_count=User.posts_count + delta)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def real_post_counts() -> dict:
+    """Счётчики поста, посчитанные по таблицам: {колонка: коррелированный подзапрос}."""
+    return {
+        "likes_count": select(func.count(Like.id)).where(Like.post_id == Post.id).scalar_subquery(),
+        "comments_count": select(func.count(Comment.id)).where(Comment.post_id == Post.id).scalar_subquery(),
+    }
+
+
+def real_user_counts() -> dict:
+    """Счётчики пользователя, посчитанные по таблицам."""
+    return {
+        "followers_count": select(func.count(Follow.id)).where(Follow.user_id == User.id).scalar_subquery(),
+        "following_count": select(func.count(Follow.id)).where(Follow.follower_id == User.id).scalar_subquery(),
+        "posts_count": select(func.count(Post.id)).where(Post.owner_id == User.id).scalar_subquery(),
+    }
+
+
+async def _reconcile(db: AsyncSession, model, real: dict, batch_size: int) -> int:
+    """
+    Пересчитывает счётчики пачками по id и исправляет только разошедшиеся
+    строки. Возвращает число исправленных строк.
+    """
+    mismatch = or_(*(getattr(model, name) != value for name, value in real.items()))
+    repaired = 0
+    last_id = 0
+    while True:
+        res = await db.execute(
+            select(model.id)
+            .where(model.id > last_id)
+            .order_by(model.id)
+            .offset(batch_size - 1)
+            .limit(1)
+        )
+        upper = res.scalar_one_or_none()
+        in_batch = model.id > last_id if upper is None else model.id.between(last_id + 1, upper)
+        res = await db.execute(
+            update(model)
+            .where(in_batch, mismatch)
+            .values(real)
+            .execution_options(synchronize_session=False)
+        )
+        repaired += res.rowcount or 0
+        await db.commit()
+        if upper is None:
+            return repaired
+        last_id = upper
+
+
+async def reconcile_post_counters(db: AsyncSession, batch_size: int = config.COUNTERS_RECONCILE_BATCH) -> int:
+    """Сверяет likes_count/comments_count с таблицами likes/comments."""
+    return await _reconcile(db, Post, real_post_counts(), batch_size)
+
+
+async def reconcile_user_counters(db: AsyncSession, batch_size: int = config.COUNTERS_RECONCILE_BATCH) -> int:
+    """Сверяет followers_count/following_count/posts_count с таблицами follows/posts."""
+    return await _reconcile(db, User, real_user_counts(), batch_size)
+
+
+async def run_reconciler(session_maker, interval: int = config.COUNTERS_RECONCILE_INTERVAL) -> None:
+    """Фоновая задача: периодически чинит дрейф счётчиков."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with session_maker() as db:
+                posts = await reconcile_post_counters(db)
+                users = await reconcile_user_counters(db)
+            if posts or users:
+                logger.warning("Counters reconciled: %d posts, %d users repaired", posts, users)
+        except Exception:
+            logger.exception("Counters reconciliation failed")
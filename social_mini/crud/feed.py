@@ -0,0 +1,137 @@
+import heapq
+
+from sqlalchemy import select, update, delete, func, literal, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core import config
+from ..core.jobs import job_queue
+from ..database import async_session_maker
+from ..models.feed import FeedEntry
+from ..models.follow import Follow
+from ..models.post import Post
+from ..models.user import User
+from .pagination import apply_cursor, make_page
+from .upsert import dialect_name, insert_ignore
+
+
+async def _has_many_followers(db: AsyncSession, author_id: int) -> bool:
+    # считаем не больше FEED_FANOUT_LIMIT + 1 строк, а не всех подписчиков
+    sub = (
+        select(Follow.id)
+        .where(Follow.user_id == author_id)
+        .limit(config.FEED_FANOUT_LIMIT + 1)
+        .subquery()
+    )
+    res = await db.execute(select(func.count()).select_from(sub))
+    return res.scalar_one() > config.FEED_FANOUT_LIMIT
+
+
+async def fan_out_post(db: AsyncSession, post_id: int, author_id: int) -> bool:
+    """
+    Раскладывает новый пост по лентам подписчиков автора (без commit).
+    Возвращает False, если автор в режиме подмешивания при чтении.
+
+    Флаг fanout_on_read липкий: автор, ставший «тяжёлым», обратно не переключается,
+    даже если подписчиков стало меньше FEED_FANOUT_LIMIT. Его прошлые посты не лежат
+    в feed_entries, и при возврате к раскладке они пропали бы из лент.
+    """
+    res = await db.execute(select(User.fanout_on_read).where(User.id == author_id))
+    if res.scalar_one_or_none():
+        return False
+    if await _has_many_followers(db, author_id):
+        await db.execute(update(User).where(User.id == author_id).values(fanout_on_read=True))
+        return False
+
+    rows = (
+        select(Follow.follower_id, Post.id, Post.owner_id, Post.created_at)
+        .join(Post, Post.owner_id == Follow.user_id)
+        .where(Post.id == post_id)
+    )
+    # повтор задачи или бэкфилл подписки могли уже положить пост в ленту
+    await db.execute(
+        insert_ignore(dialect_name(db), FeedEntry)
+        .from_select(["user_id", "post_id", "author_id", "created_at"], rows)
+        .on_conflict_do_nothing(index_elements=["user_id", "post_id"])
+    )
+    return True
+
+
+@job_queue.handler("feed.fan_out")
+async def fan_out_posts(payloads: list[dict]) -> None:
+    """Фоновая раскладка новых постов: вся пачка — одна транзакция."""
+    async with async_session_maker() as db:
+        for payload in payloads:
+            await fan_out_post(db, payload["post_id"], payload["author_id"])
+        await db.commit()
+
+
+async def backfill_author(db: AsyncSession, user_id: int, author_id: int) -> None:
+    """
+    После подписки добавляем в ленту последние посты автора (без commit).
+    Посты «тяжёлых» авторов не копируются — они подмешиваются при чтении.
+    """
+    recent = (
+        select(Post.id, Post.owner_id, Post.created_at)
+        .join(User, User.id == Post.owner_id)
+        .where(Post.owner_id == author_id, User.fanout_on_read.is_(False))
+        .order_by(Post.created_at.desc(), Post.id.desc())
+        .limit(config.FEED_BACKFILL_LIMIT)
+        .subquery()
+    )
+    # WHERE обязателен: без него SQLite не разбирает INSERT ... SELECT ... ON CONFLICT
+    rows = select(literal(user_id), recent.c.id, recent.c.owner_id, recent.c.created_at).where(true())
+    # фоновая раскладка нового поста могла успеть положить его в ленту
+    await db.execute(
+        insert_ignore(dialect_name(db), FeedEntry)
+        .from_select(["user_id", "post_id", "author_id", "created_at"], rows)
+        .on_conflict_do_nothing(index_elements=["user_id", "post_id"])
+    )
+
+
+async def trim_author(db: AsyncSession, user_id: int, author_id: int) -> None:
+    """После отписки убираем посты автора из ленты (без commit)."""
+    await db.execute(
+        delete(FeedEntry).where(
+            FeedEntry.user_id == user_id,
+            FeedEntry.author_id == author_id,
+        )
+    )
+
+
+async def get_feed(db: AsyncSession, user_id: int, cursor: str | None = None, limit: int = 20):
+    """
+    Лента пользователя: range scan по feed_entries плюс посты «тяжёлых» авторов,
+    которые не раскладываются при записи. Возвращает страницу и курсор.
+    """
+    dialect = db.get_bind().dialect.name
+    q = (
+        select(Post)
+        .join(FeedEntry, FeedEntry.post_id == Post.id)
+        .where(FeedEntry.user_id == user_id)
+    )
+    q = apply_cursor(q, FeedEntry.created_at, FeedEntry.post_id, cursor, limit, dialect)
+    res = await db.execute(q)
+    posts = list(res.scalars().all())
+
+    res = await db.execute(
+        select(Follow.user_id)
+        .join(User, User.id == Follow.user_id)
+        .where(Follow.follower_id == user_id, User.fanout_on_read.is_(True))
+    )
+    pull_ids = res.scalars().all()
+    if not pull_ids:
+        return make_page(posts, limit)
+
+    q = select(Post).where(Post.owner_id.in_(pull_ids))
+    q = apply_cursor(q, Post.created_at, Post.id, cursor, limit, dialect)
+    res = await db.execute(q)
+    pulled = res.scalars().all()
+
+    seen = {p.id for p in posts}
+    merged = heapq.merge(
+        posts,
+        [p for p in pulled if p.id not in seen],
+        key=lambda p: (p.created_at, p.id),
+        reverse=True,
+    )
+    return make_page(list(merged), limit)
@@ -1,45 +1,137 @@
-from sqlalchemy import select, delete
+from functools import lru_cache
+
+from sqlalchemy import Integer, bindparam, cast, exists, select, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..core.events import broker, user_channel
 from ..models.follow import Follow
+from ..models.user import User
+from . import feed as feed_crud
+from .counters import bump_follows, follow_counts_update
+from .graph import follow_graph
+from .pagination import apply_cursor, make_page
+from .user import invalidate_profiles
+from .upsert import dialect_name, insert_ignore, inserted_or_existing, supports_dml_cte
 
+FOLLOW_COLUMNS = (Follow.id, Follow.follower_id, Follow.user_id, Follow.created_at)
 
-async def follow_user(db: AsyncSession, follower_id: int, user_id: int) -> Follow:
-    if follower_id == user_id:
-        raise ValueError("Нельзя подписаться на себя")
 
-    q = select(Follow).where(
-        Follow.follower_id == follower_id,
-        Follow.user_id == user_id,
+@lru_cache
+def _build_follow_insert(dialect: str):
+    ins = (
+        # таблица, а не модель: иначе ORM примет параметры execute() за значения bulk INSERT
+        insert_ignore(dialect, Follow.__table__)
+        .from_select(
+            ["follower_id", "user_id"],
+            select(cast(bindparam("follower_id"), Integer), User.id).where(User.id == bindparam("user_id")),
+        )
+        .on_conflict_do_nothing(index_elements=["follower_id", "user_id"])
+        .returning(*FOLLOW_COLUMNS)
     )
-    res = await db.execute(q)
-    existing = res.scalar_one_or_none()
-    if existing:
-        return existing
+    if not supports_dml_cte(dialect):
+        return ins
+    ins = ins.cte("ins")
+    bump = (
+        follow_counts_update(bindparam("follower_id"), bindparam("user_id"), 1)
+        .where(exists(select(ins.c.id)))
+        .cte("bump")
+    )
+    existing = select(*FOLLOW_COLUMNS).where(
+        Follow.follower_id == bindparam("follower_id"),
+        Follow.user_id == bindparam("user_id"),
+    )
+    return inserted_or_existing(ins, existing).add_cte(bump)
+
+
+
+async def _publish_follow(event_type: str, follower_id: int, user_id: int) -> None:
+    # в личный канал обоим: автор видит нового подписчика, а стрим подписчика
+    # сам подписывается на посты автора (api/events.py)
+    await broker.publish(
+        event_type, {"follower_id": follower_id, "user_id": user_id},
+        user_channel(user_id), user_channel(follower_id),
+    )
+
+
+async def follow_user(db: AsyncSession, follower_id: int, user_id: int):
+    """
+    Идемпотентная подписка: INSERT ... SELECT FROM users ON CONFLICT DO NOTHING RETURNING.
+    Возвращает (подписка, создана_сейчас); (None, False) — если пользователя нет.
+    На PostgreSQL вставка, счётчики обоих пользователей и чтение уже существующей
+    подписки — один запрос с CTE.
+    """
+    if follower_id == user_id:
+        raise ValueError("Нельзя подписаться на себя")
 
-    follow = Follow(follower_id=follower_id, user_id=user_id)
-    db.add(follow)
+    stmt = _build_follow_insert(dialect_name(db))
+    row = (await db.execute(stmt, {"follower_id": follower_id, "user_id": user_id})).first()
+    if supports_dml_cte(dialect_name(db)):
+        created = bool(row and row.created)
+    else:
+        created = row is not None
+        if created:
+            await bump_follows(db, follower_id, user_id, 1)
+    if created:
+        await feed_crud.backfill_author(db, user_id=follower_id, author_id=user_id)
     await db.commit()
-    await db.refresh(follow)
-    return follow
+    if row is None:
+        # конфликт (подписка уже есть) или пользователя нет
+        res = await db.execute(
+            select(*FOLLOW_COLUMNS).where(
+                Follow.follower_id == follower_id,
+                Follow.user_id == user_id,
+            )
+        )
+        row = res.first()
+    if created:
+        await invalidate_profiles(follower_id, user_id)
+        follow_graph.follow(follower_id, user_id)
+        await _publish_follow("follow.created", follower_id, user_id)
+    return row, created
 
 
-async def unfollow_user(db: AsyncSession, follower_id: int, user_id: int) -> None:
-    q = delete(Follow).where(
-        Follow.follower_id == follower_id,
-        Follow.user_id == user_id,
+async def unfollow_user(db: AsyncSession, follower_id: int, user_id: int) -> bool:
+    """DELETE ... RETURNING; True — если подписка действительно была."""
+    q = (
+        delete(Follow)
+        .where(
+            Follow.follower_id == follower_id,
+            Follow.user_id == user_id,
+        )
+        .returning(Follow.id)
     )
-    await db.execute(q)
+    if supports_dml_cte(dialect_name(db)):
+        gone = q.cte("gone")
+        stmt = (
+            follow_counts_update(follower_id, user_id, -1)
+            .where(exists(select(gone.c.id)))
+            .returning(User.id)
+            .add_cte(gone)
+        )
+        changed = (await db.execute(stmt)).first() is not None
+    else:
+        changed = (await db.execute(q)).first() is not None
+        if changed:
+            await bump_follows(db, follower_id, user_id, -1)
+    if changed:
+        await feed_crud.trim_author(db, user_id=follower_id, author_id=user_id)
     await db.commit()
+    if changed:
+        await invalidate_profiles(follower_id, user_id)
+        follow_graph.unfollow(follower_id, user_id)
+        await _publish_follow("follow.deleted", follower_id, user_id)
+    return changed
 
 
-async def get_following(db: AsyncSession, user_id: int):
+async def get_following(db: AsyncSession, user_id: int, cursor: str | None = None, limit: int = 50):
     q = select(Follow).where(Follow.follower_id == user_id)
+    q = apply_cursor(q, Follow.created_at, Follow.id, cursor, limit, db.get_bind().dialect.name)
     res = await db.execute(q)
-    return res.scalars().all()
+    return make_page(res.scalars().all(), limit)
 
 
-async def get_followers(db: AsyncSession, user_id: int):
+async def get_followers(db: AsyncSession, user_id: int, cursor: str | None = None, limit: int = 50):
     q = select(Follow).where(Follow.user_id == user_id)
+    q = apply_cursor(q, Follow.created_at, Follow.id, cursor, limit, db.get_bind().dialect.name)
     res = await db.execute(q)
-    return res.scalars().all()
\ No newline at end of file
+    return make_page(res.scalars().all(), limit)
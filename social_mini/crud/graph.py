@@ -0,0 +1,252 @@
+"""
+Граф подписок в памяти: «кого читать» (друзья друзей), общие подписчики и
+число подписчиков/подписок без self-join по follows.
+
+Каждое направление (подписки и подписчики) — CSR: offsets[u]..offsets[u+1]
+в targets — отсортированные id соседей пользователя u; оба массива — array,
+то есть 8 и 4 байта на элемент вместо объекта Python на каждое ребро.
+
+Снимок неизменяем. Подписки и отписки после него (follow/unfollow после commit)
+лежат в оверлее added/removed, раз в GRAPH_REBUILD_INTERVAL секунд снимок
+строится заново из follows. Изменения, пришедшие во время перестройки,
+пишутся в журнал и применяются к новому снимку — в обе стороны идемпотентно,
+поэтому неважно, успела ли подписка попасть в выборку.
+
+Граф свой у каждого процесса: подписки, сделанные через другие воркеры,
+становятся видны после ближайшей перестройки.
+"""
+import asyncio
+import logging
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+from sqlalchemy import select
+
+from ..core import config
+from ..database import async_session_maker
+from ..models.follow import Follow
+from .loader import user_loader
+
+logger = logging.getLogger(__name__)
+
+
+class Adjacency:
+    """Одно направление графа: CSR-снимок и изменения после него."""
+
+    def __init__(self, offsets: array | None = None, targets: array | None = None):
+        self.offsets = offsets if offsets is not None else array("q", [0])
+        self.targets = targets if targets is not None else array("i")
+        self.added: dict[int, set[int]] = {}
+        self.removed: dict[int, set[int]] = {}
+
+    def _bounds(self, u: int) -> tuple[int, int]:
+        if 0 <= u < len(self.offsets) - 1:
+            return self.offsets[u], self.offsets[u + 1]
+        return 0, 0
+
+    def _in_base(self, u: int, v: int) -> bool:
+        lo, hi = self._bounds(u)
+        i = bisect_left(self.targets, v, lo, hi)
+        return i < hi and self.targets[i] == v
+
+    def add(self, u: int, v: int) -> None:
+        if self._in_base(u, v):
+            self.removed.get(u, set()).discard(v)
+        else:
+            self.added.setdefault(u, set()).add(v)
+
+    def remove(self, u: int, v: int) -> None:
+        if self._in_base(u, v):
+            self.removed.setdefault(u, set()).add(v)
+        else:
+            self.added.get(u, set()).discard(v)
+
+    def neighbors(self, u: int):
+        """Отсортированные соседи; без изменений после снимка — срез массива."""
+        lo, hi = self._bounds(u)
+        base = self.targets[lo:hi]
+        added, removed = self.added.get(u), self.removed.get(u)
+        if not added and not removed:
+            return base
+        return sorted({v for v in base if not removed or v not in removed} | (added or set()))
+
+    def degree(self, u: int) -> int:
+        lo, hi = self._bounds(u)
+        return hi - lo + len(self.added.get(u, ())) - len(self.removed.get(u, ()))
+
+    @property
+    def pending(self) -> int:
+        return sum(map(len, self.added.values())) + sum(map(len, self.removed.values()))
+
+
+def build_csr(src: array, dst: array) -> tuple[Adjacency, Adjacency]:
+    """
+    Рёбра src -> dst, отсортированные по (src, dst): подписки — готовый CSR,
+    подписчики — сортировка подсчётом по dst (устойчивая, так что внутри строки
+    id тоже по возрастанию).
+    """
+    n = max(max(src, default=-1), max(dst, default=-1)) + 1
+    out_offsets = array("q", bytes(8 * (n + 1)))
+    in_offsets = array("q", bytes(8 * (n + 1)))
+    for s in src:
+        out_offsets[s + 1] += 1
+    for d in dst:
+        in_offsets[d + 1] += 1
+    for i in range(n):
+        out_offsets[i + 1] += out_offsets[i]
+        in_offsets[i + 1] += in_offsets[i]
+    in_targets = array("i", bytes(4 * len(dst)))
+    pos = in_offsets[:-1]
+    for s, d in zip(src, dst):
+        in_targets[pos[d]] = s
+        pos[d] += 1
+    return Adjacency(out_offsets, dst), Adjacency(in_offsets, in_targets)
+
+
+def _intersect(small, large) -> list[int]:
+    # оба отсортированы: бинарный поиск элементов меньшего в большем
+    if len(small) > len(large):
+        small, large = large, small
+    result, lo = [], 0
+    for v in small:
+        lo = bisect_left(large, v, lo)
+        if lo == len(large):
+            break
+        if large[lo] == v:
+            result.append(v)
+    return result
+
+
+class FollowGraph:
+    def __init__(self):
+        self.following = Adjacency()
+        self.followers = Adjacency()
+        self.built = False
+        self.rebuilds = 0
+        self._journal: list[tuple[bool, int, int]] | None = None
+        self._lock = asyncio.Lock()
+
+    def _apply(self, created: bool, follower_id: int, user_id: int) -> None:
+        if created:
+            self.following.add(follower_id, user_id)
+            self.followers.add(user_id, follower_id)
+        else:
+            self.following.remove(follower_id, user_id)
+            self.followers.remove(user_id, follower_id)
+
+    def follow(self, follower_id: int, user_id: int) -> None:
+        """Вызывать после commit подписки."""
+        self._record(True, follower_id, user_id)
+
+    def unfollow(self, follower_id: int, user_id: int) -> None:
+        """Вызывать после commit отписки."""
+        self._record(False, follower_id, user_id)
+
+    def _record(self, created: bool, follower_id: int, user_id: int) -> None:
+        if self._journal is not None:
+            self._journal.append((created, follower_id, user_id))
+        if self.built:
+            self._apply(created, follower_id, user_id)
+
+    async def rebuild(self, session_maker=async_session_maker) -> None:
+        """Новый снимок из follows; чтения всё это время обслуживает старый."""
+        async with self._lock:
+            await self._rebuild(session_maker)
+
+    async def ensure_built(self) -> None:
+        """Первый запрос, пришедший раньше фоновой перестройки, строит граф сам."""
+        if self.built:
+            return
+        async with self._lock:
+            if not self.built:
+                await self._rebuild(async_session_maker)
+
+    async def _rebuild(self, session_maker) -> None:
+        self._journal = []
+        try:
+            src, dst = array("i"), array("i")
+            async with session_maker() as db:
+                result = await db.stream(
+                    select(Follow.follower_id, Follow.user_id)
+                    .order_by(Follow.follower_id, Follow.user_id)
+                    .execution_options(yield_per=config.GRAPH_LOAD_CHUNK)
+                )
+                async for rows in result.partitions():
+                    for follower_id, user_id in rows:
+                        src.append(follower_id)
+                        dst.append(user_id)
+            # проход по массивам — чистый CPU, не держим на нём event loop
+            following, followers = await asyncio.to_thread(build_csr, src, dst)
+            self.following, self.followers = following, followers
+            for change in self._journal:
+                self._apply(*change)
+            self.built = True
+            self.rebuilds += 1
+        finally:
+            self._journal = None
+
+    def counts(self, user_id: int) -> dict:
+        return {"followers": self.followers.degree(user_id), "following": self.following.degree(user_id)}
+
+    def mutual_followers(self, user_id: int, other_id: int, limit: int) -> list[int]:
+        """Кто подписан и на user_id, и на other_id."""
+        return _intersect(self.followers.neighbors(user_id), self.followers.neighbors(other_id))[:limit]
+
+    def suggestions(self, user_id: int, limit: int) -> list[tuple[int, int]]:
+        """
+        Друзья друзей: [(id, сколько моих подписок на него подписано)], по убыванию
+        пересечения, при равенстве — сначала у кого больше подписчиков.
+        Просматривается не больше GRAPH_SUGGEST_MAX_SCAN рёбер.
+        """
+        following = self.following.neighbors(user_id)
+        skip = set(following)
+        skip.add(user_id)
+        overlap = Counter()
+        budget = config.GRAPH_SUGGEST_MAX_SCAN
+        for v in following:
+            second = self.following.neighbors(v)
+            overlap.update(w for w in second[:budget] if w not in skip)
+            budget -= len(second)
+            if budget <= 0:
+                break
+        ranked = sorted(overlap.items(), key=lambda item: (-item[1], -self.followers.degree(item[0]), item[0]))
+        return ranked[:limit]
+
+    def stats(self) -> dict:
+        return {
+            "built": self.built,
+            "rebuilds": self.rebuilds,
+            "edges": len(self.following.targets),
+            "pending_changes": self.following.pending,
+        }
+
+
+follow_graph = FollowGraph()
+
+
+async def get_suggestions(db, user_id: int, limit: int) -> list[dict]:
+    await follow_graph.ensure_built()
+    ranked = follow_graph.suggestions(user_id, limit)
+    users = await user_loader.load_many(db, [uid for uid, _ in ranked])
+    return [
+        {**users[uid]._mapping, "mutual": mutual}
+        for uid, mutual in ranked if uid in users
+    ]
+
+
+async def get_mutual_followers(db, user_id: int, other_id: int, limit: int) -> list:
+    await follow_graph.ensure_built()
+    ids = follow_graph.mutual_followers(user_id, other_id, limit)
+    users = await user_loader.load_many(db, ids)
+    return [users[uid] for uid in ids if uid in users]
+
+
+async def run_rebuilds(interval: int = config.GRAPH_REBUILD_INTERVAL) -> None:
+    """Фоновая задача: первая сборка сразу при старте, дальше — раз в interval секунд."""
+    while True:
+        try:
+            await follow_graph.rebuild()
+        except Exception:
+            logger.exception("Follow graph rebuild failed")
+        await asyncio.sleep(interval)
@@ -1,37 +1,151 @@
-from sqlalchemy import select, func, delete
+from datetime import datetime
+from functools import lru_cache
+
+from sqlalchemy import Integer, bindparam, cast, select, delete, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models.like import Like
+from ..core import config
+from ..core.events import broker, post_channel
+from ..models.post import Post
+from . import versions
+from .counters import bump_likes
+from .loader import chunked, post_loader
+from .trending import record_like
+from .upsert import dialect_name, insert_ignore, inserted_or_existing, supports_dml_cte
 
+LIKE_COLUMNS = (Like.id, Like.user_id, Like.post_id, Like.created_at)
 
-async def like_post(db: AsyncSession, user_id: int, post_id: int) -> Like:
-    # проверим, нет ли уже лайка
-    q = select(Like).where(Like.user_id == user_id, Like.post_id == post_id)
-    res = await db.execute(q)
-    like = res.scalar_one_or_none()
-    if like:
-        return like
 
-    like = Like(user_id=user_id, post_id=post_id)
-    db.add(like)
+@lru_cache
+def _build_like_insert(dialect: str):
+    """Выражение строится один раз на диалект; компиляцию кэширует сам SQLAlchemy."""
+    ins = (
+        # таблица, а не модель: иначе ORM примет параметры execute() за значения bulk INSERT
+        insert_ignore(dialect, Like.__table__)
+        .from_select(
+            ["user_id", "post_id"],
+            select(cast(bindparam("user_id"), Integer), Post.id).where(Post.id == bindparam("post_id")),
+        )
+        .on_conflict_do_nothing(index_elements=["user_id", "post_id"])
+        .returning(*LIKE_COLUMNS)
+    )
+    if not supports_dml_cte(dialect):
+        return ins
+    ins = ins.cte("ins")
+    bump = (
+        update(Post)
+        .where(Post.id.in_(select(ins.c.post_id)))
+        .values(likes_count=Post.likes_count + 1)
+        .cte("bump")
+    )
+    existing = select(*LIKE_COLUMNS).where(
+        Like.user_id == bindparam("user_id"),
+        Like.post_id == bindparam("post_id"),
+    )
+    return inserted_or_existing(ins, existing).add_cte(bump)
+
+
+
+async def liked(user_id: int, post_id: int, created_at: datetime | None = None) -> None:
+    """После commit нового лайка: версия для ETag, счёт в трендах и событие в стрим поста."""
+    await versions.touch_likes(post_id)
+    # время из likes.created_at: по нему же вычитается вклад, когда лайк снимут
+    record_like(post_id, 1, at=created_at)
+    await broker.publish("like.created", {"post_id": post_id, "user_id": user_id}, post_channel(post_id))
+
+
+async def like_post(db: AsyncSession, user_id: int, post_id: int):
+    """
+    Идемпотентный лайк: INSERT ... SELECT FROM posts ON CONFLICT DO NOTHING RETURNING.
+    Возвращает (лайк, создан_сейчас); (None, False) — если поста нет.
+    На PostgreSQL вставка, инкремент likes_count и чтение уже существующего лайка —
+    один запрос с CTE.
+    """
+    stmt = _build_like_insert(dialect_name(db))
+    row = (await db.execute(stmt, {"user_id": user_id, "post_id": post_id})).first()
+    if supports_dml_cte(dialect_name(db)):
+        created = bool(row and row.created)
+    else:
+        created = row is not None
+        if created:
+            await bump_likes(db, post_id, 1)
     await db.commit()
-    await db.refresh(like)
-    return like
+    if created:
+        await liked(user_id, post_id, row.created_at)
+    if row is None:
+        # конфликт (лайк уже есть) или поста нет; на PostgreSQL сюда попадает и
+        # проигравший в гонке одинаковых лайков: снимок CTE не видит строку победителя
+        res = await db.execute(
+            select(*LIKE_COLUMNS).where(Like.user_id == user_id, Like.post_id == post_id)
+        )
+        row = res.first()
+    return row, created
 
 
-async def unlike_post(db: AsyncSession, user_id: int, post_id: int) -> None:
-    q = delete(Like).where(Like.user_id == user_id, Like.post_id == post_id)
-    await db.execute(q)
+async def unlike_post(db: AsyncSession, user_id: int, post_id: int) -> bool:
+    """DELETE ... RETURNING; True — если лайк действительно был снят."""
+    dele = (
+        delete(Like)
+        .where(Like.user_id == user_id, Like.post_id == post_id)
+        .returning(Like.post_id, Like.created_at)
+    )
+    if supports_dml_cte(dialect_name(db)):
+        gone = dele.cte("gone")
+        stmt = (
+            update(Post)
+            .where(Post.id == gone.c.post_id)
+            .values(likes_count=Post.likes_count - 1)
+            .returning(gone.c.created_at)
+            .add_cte(gone)
+            .execution_options(synchronize_session=False)
+        )
+        row = (await db.execute(stmt)).first()
+    else:
+        row = (await db.execute(dele)).first()
+        if row is not None:
+            await bump_likes(db, post_id, -1)
+    changed = row is not None
     await db.commit()
+    if changed:
+        await versions.touch_likes(post_id)
+        record_like(post_id, -1, at=row.created_at)
+        await broker.publish("like.deleted", {"post_id": post_id, "user_id": user_id}, post_channel(post_id))
+    return changed
 
 
-async def get_likes_count(db: AsyncSession, post_id: int) -> int:
-    q = select(func.count(Like.id)).where(Like.post_id == post_id)
+async def get_likes_count(db: AsyncSession, post_id: int) -> int | None:
+    """Счётчик из posts.likes_count; None — если поста нет."""
+    q = select(Post.likes_count).where(Post.id == post_id)
     res = await db.execute(q)
-    return res.scalar() or 0
+    return res.scalar_one_or_none()
 
 
 async def get_likes_for_post(db: AsyncSession, post_id: int):
     q = select(Like).where(Like.post_id == post_id)
     res = await db.execute(q)
-    return res.scalars().all()
\ No newline at end of file
+    return res.scalars().all()
+
+
+async def get_liked_post_ids(db: AsyncSession, user_id: int, post_ids) -> set[int]:
+    """Какие из post_ids лайкнул пользователь; по одному IN-запросу на пачку id."""
+    liked = set()
+    for chunk in chunked(list(post_ids), config.BATCH_CHUNK_SIZE):
+        res = await db.execute(
+            select(Like.post_id).where(Like.user_id == user_id, Like.post_id.in_(chunk))
+        )
+        liked.update(res.scalars().all())
+    return liked
+
+
+async def get_likes_summaries(db: AsyncSession, post_ids, viewer_id: int | None = None) -> dict:
+    """Сводки лайков по списку постов: {post_id: {...}}; несуществующие посты пропускаются."""
+    posts = await post_loader.load_many(db, post_ids)
+    liked = await get_liked_post_ids(db, viewer_id, posts) if viewer_id is not None else None
+    summaries = {}
+    for post_id, post in posts.items():
+        summary = {"post_id": post_id, "likes_count": post.likes_count}
+        if liked is not None:
+            summary["liked_by_me"] = post_id in liked
+        summaries[post_id] = summary
+    return summaries
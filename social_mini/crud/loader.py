@@ -0,0 +1,107 @@
+"""
+Загрузчик в духе DataLoader: одновременные запросы одних и тех же сущностей
+по id склеиваются в один WHERE id IN (...).
+
+Все вызовы load_many, пришедшие в одном такте event loop, собираются в пачку;
+id, которые уже грузятся, ждут текущий запрос, а не делают новый.
+Пачки отдельные для каждой базы (bind сессии вызвавшего): чтение с реплики
+не склеивается с чтением с основной базы. Пачка выполняется на собственной
+короткой сессии загрузчика, а не на сессии одного из вызвавших — чужая
+транзакция может быть пишущей или закрыться, пока остальные ждут.
+Загрузчики отдают Core-строки, не привязанные к сессии, поэтому их можно
+отдавать любому запросу.
+"""
+import asyncio
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from social_mini.core import config
+from social_mini.models.post import POST_COLUMNS, Post
+from social_mini.models.user import User
+
+
+def chunked(ids: list, size: int):
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+class BatchLoader:
+    """fetch(db, ids) -> {id: строка}; отсутствующие id просто не попадают в словарь."""
+
+    def __init__(self, fetch, chunk_size: int | None = None):
+        self._fetch = fetch
+        self.chunk_size = chunk_size or config.BATCH_CHUNK_SIZE
+        # bind -> {id: future}, ещё не отправленные
+        self._pending: dict = {}
+        # (bind, id) -> future, уже в запросе
+        self._inflight: dict = {}
+        self.batches = 0
+        self.requested = 0
+
+    async def load_many(self, db: AsyncSession, ids) -> dict:
+        loop = asyncio.get_running_loop()
+        bind = db.bind if db is not None else None
+        pending = self._pending.get(bind)
+        futures = {}
+        for key in dict.fromkeys(ids):
+            fut = self._inflight.get((bind, key)) or (pending and pending.get(key))
+            if fut is None:
+                if pending is None:
+                    pending = self._pending[bind] = {}
+                    loop.call_soon(self._start_dispatch, bind)
+                fut = pending[key] = loop.create_future()
+            futures[key] = fut
+        self.requested += len(futures)
+        if futures:
+            # wait, а не gather: отмена одного запроса не должна отменять общие future
+            await asyncio.wait(futures.values())
+        result = {}
+        for key, fut in futures.items():
+            value = fut.result()
+            if value is not None:
+                result[key] = value
+        return result
+
+    def _start_dispatch(self, bind) -> None:
+        asyncio.ensure_future(self._dispatch(bind))
+
+    async def _dispatch(self, bind) -> None:
+        pending = self._pending.pop(bind)
+        self._inflight.update(((bind, key), fut) for key, fut in pending.items())
+        try:
+            found = {}
+            async with AsyncSession(bind) as db:
+                for chunk in chunked(list(pending), self.chunk_size):
+                    found.update(await self._fetch(db, chunk))
+                    self.batches += 1
+        except Exception as exc:
+            for fut in pending.values():
+                if not fut.done():
+                    fut.set_exception(exc)
+        else:
+            for key, fut in pending.items():
+                if not fut.done():
+                    fut.set_result(found.get(key))
+        finally:
+            for key in pending:
+                self._inflight.pop((bind, key), None)
+
+    def stats(self) -> dict:
+        return {"requested_ids": self.requested, "queries": self.batches}
+
+
+async def _fetch_posts(db: AsyncSession, ids: list[int]) -> dict:
+    res = await db.execute(select(*POST_COLUMNS).where(Post.id.in_(ids)))
+    return {row.id: row for row in res.all()}
+
+
+async def _fetch_users(db: AsyncSession, ids: list[int]) -> dict:
+    res = await db.execute(
+        select(User.id, User.username, User.first_name, User.last_name).where(User.id.in_(ids))
+    )
+    return {row.id: row for row in res.all()}
+
+
+post_loader = BatchLoader(_fetch_posts)
+user_loader = BatchLoader(_fetch_users)
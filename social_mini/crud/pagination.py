@@ -0,0 +1,82 @@
+"""
+Keyset-пагинация по (created_at, id).
+
+Курсор — непрозрачная строка с последней отданной парой (created_at, id);
+следующая страница начинается строго после неё, поэтому стоимость страницы
+не зависит от её номера и выдача не «съезжает» при новых записях.
+"""
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import String, tuple_, type_coerce
+
+
+class InvalidCursor(ValueError):
+    """Курсор повреждён или подделан."""
+
+
+def _pack(values: list) -> str:
+    raw = json.dumps(values, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _unpack(cursor: str):
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode()))
+
+
+def encode_cursor(created_at: datetime, item_id: int) -> str:
+    return _pack([created_at.isoformat(), item_id])
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Разбирает курсор; на мусор отвечает InvalidCursor."""
+    try:
+        created_at, item_id = _unpack(cursor)
+        return datetime.fromisoformat(created_at), int(item_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+
+def encode_rank_cursor(rank: float, item_id: int) -> str:
+    """Курсор для выдачи, отсортированной по (rank, id) DESC — например, поиска."""
+    return _pack([rank, item_id])
+
+
+def decode_rank_cursor(cursor: str) -> tuple[float, int]:
+    try:
+        rank, item_id = _unpack(cursor)
+        return float(rank), int(item_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+
+def _bind_created_at(dialect_name: str, created_at: datetime):
+    if dialect_name == "sqlite":
+        # SQLite хранит CURRENT_TIMESTAMP строкой "YYYY-MM-DD HH:MM:SS",
+        # поэтому сравниваем со строкой в том же формате
+        return type_coerce(created_at.replace(tzinfo=None).isoformat(" "), String)
+    return created_at
+
+
+def apply_cursor(query, created_col, id_col, cursor: str | None, limit: int, dialect_name: str):
+    """
+    Добавляет к запросу условие «после курсора», сортировку (created_at, id) DESC
+    и limit + 1, чтобы понять, есть ли следующая страница.
+    """
+    if cursor:
+        created_at, last_id = decode_cursor(cursor)
+        query = query.where(
+            tuple_(created_col, id_col) < tuple_(_bind_created_at(dialect_name, created_at), last_id)
+        )
+    return query.order_by(created_col.desc(), id_col.desc()).limit(limit + 1)
+
+
+def make_page(items: list, limit: int) -> tuple[list, str | None]:
+    """Обрезает лишний элемент и строит курсор следующей страницы."""
+    if len(items) <= limit:
+        return items, None
+    items = items[:limit]
+    last = items[-1]
+    return items, encode_cursor(last.created_at, last.id)
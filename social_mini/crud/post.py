@@ -1,28 +1,117 @@
 # app/crud/post.py
 
+from sqlalchemy import delete, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from social_mini.models.post import Post
+from sqlalchemy.orm import aliased
+from social_mini.core.events import ALL_POSTS, author_channel, broker, post_channel
+from social_mini.models.comment import Comment
+from social_mini.models.post import POST_COLUMNS, Post
 from social_mini.schemas import PostCreate  # если используешь схемы
+from social_mini.core.jobs import job_queue
+from social_mini.crud import feed  # noqa: F401 — регистрирует обработчик feed.fan_out
+from social_mini.crud.like import get_liked_post_ids
+from social_mini.crud.loader import user_loader
+from social_mini.crud.pagination import apply_cursor, make_page
+from social_mini.crud import versions
+from social_mini.crud.counters import bump_posts
+from social_mini.crud.search import index_post, unindex_post
+from social_mini.crud.trending import trending
+from social_mini.crud.user import invalidate_profiles
 
-async def get_posts(db: AsyncSession, skip: int = 0, limit: int = 10):
-    result = await db.execute(select(Post).offset(skip).limit(limit))
-    return result.scalars().all()
+
+async def get_posts(db: AsyncSession, cursor: str | None = None, limit: int = 10):
+    """Страница постов (новые сверху) и курсор следующей страницы."""
+    q = apply_cursor(select(Post), Post.created_at, Post.id, cursor, limit, db.get_bind().dialect.name)
+    result = await db.execute(q)
+    return make_page(result.scalars().all(), limit)
 
 async def create_post(db: AsyncSession, post: PostCreate, owner_id: int):
     db_post = Post(**post.model_dump(), owner_id=owner_id)
     db.add(db_post)
+    await index_post(db, db_post)
+    await bump_posts(db, owner_id, 1)
     await db.commit()
     await db.refresh(db_post)
+    # мог остаться отрицательный ответ для этого id
+    await invalidate_post(db_post.id)
+    await invalidate_profiles(owner_id)
+    # раскладка по лентам подписчиков — в фоне, ответ её не ждёт
+    await job_queue.enqueue("feed.fan_out", {"post_id": db_post.id, "author_id": owner_id})
+    await broker.publish(
+        "post.created",
+        {"id": db_post.id, "title": db_post.title, "owner_id": owner_id},
+        author_channel(owner_id), ALL_POSTS,
+    )
     return db_post
 
 async def get_post(db: AsyncSession, post_id: int):
-    result = await db.execute(select(Post).where(Post.id == post_id))
-    return result.scalars().first()
-
-async def delete_post(db: AsyncSession, post_id: int):
-    post = await get_post(db, post_id)
-    if post:
-        await db.delete(post)
-        await db.commit()
-    return post
\ No newline at end of file
+    """Строка поста без search_vector; None — если поста нет."""
+    res = await db.execute(select(*POST_COLUMNS).where(Post.id == post_id))
+    return res.first()
+
+async def invalidate_post(post_id: int) -> None:
+    """Вызывать после каждого изменения или удаления поста: новые версии для ETag."""
+    await versions.touch_post(post_id)
+
+async def delete_post(db: AsyncSession, post_id: int) -> bool:
+    res = await db.execute(delete(Post).where(Post.id == post_id).returning(Post.owner_id))
+    owner_id = res.scalar_one_or_none()
+    deleted = owner_id is not None
+    if deleted:
+        unindex_post(db, post_id)
+        await bump_posts(db, owner_id, -1)
+    await db.commit()
+    await invalidate_post(post_id)
+    if deleted:
+        await invalidate_profiles(owner_id)
+        trending.forget(post_id)
+        await broker.publish("post.deleted", {"id": post_id}, post_channel(post_id), ALL_POSTS)
+    return deleted
+
+async def enrich_posts(
+    db: AsyncSession,
+    posts,
+    viewer_id: int | None = None,
+    expand: bool = True,
+    comments_preview: int = 0,
+):
+    """
+    Дополняет страницу постов тем, за чем фронтенд раньше ходил отдельно на каждый пост:
+    имя автора, liked_by_me и последние comments_preview комментариев.
+    Счётчики уже лежат в posts. Число запросов не зависит от длины страницы (не больше трёх).
+    """
+    rows = [{c.key: getattr(p, c.key) for c in POST_COLUMNS} for p in posts]
+    if not rows:
+        return rows
+    post_ids = [r["id"] for r in rows]
+
+    if expand:
+        authors = await user_loader.load_many(db, [r["owner_id"] for r in rows])
+        for r in rows:
+            author = authors.get(r["owner_id"])
+            r["author_username"] = author.username if author else None
+
+        if viewer_id is not None:
+            liked = await get_liked_post_ids(db, viewer_id, post_ids)
+            for r in rows:
+                r["liked_by_me"] = r["id"] in liked
+
+    if comments_preview > 0:
+        # последние K комментариев каждого поста одним запросом через row_number()
+        rn = func.row_number().over(
+            partition_by=Comment.post_id,
+            order_by=(Comment.created_at.desc(), Comment.id.desc()),
+        ).label("rn")
+        ranked = select(Comment, rn).where(Comment.post_id.in_(post_ids)).subquery()
+        latest = aliased(Comment, ranked)
+        res = await db.execute(
+            select(latest).where(ranked.c.rn <= comments_preview).order_by(ranked.c.post_id, ranked.c.rn)
+        )
+        by_post = {}
+        for comment in res.scalars().all():
+            by_post.setdefault(comment.post_id, []).append(comment)
+        for r in rows:
+            r["latest_comments"] = by_post.get(r["id"], [])
+
+    return rows
@@ -0,0 +1,81 @@
+"""
+Лёгкие строки для списков: Core-выборка только нужных колонок прямо в
+dataclass со __slots__, без ORM-объектов в identity map и без pydantic.
+
+Порядок полей совпадает со схемами ответа (PostOut, CommentOut, FollowOut),
+поэтому JSON получается тем же, что и через response_model.
+"""
+from dataclasses import dataclass, fields
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.comment import Comment
+from ..models.follow import Follow
+from ..models.post import Post
+from .pagination import apply_cursor, make_page
+
+
+@dataclass(slots=True)
+class PostRow:
+    id: int
+    title: str
+    content: str
+    owner_id: int
+    likes_count: int
+    comments_count: int
+
+
+@dataclass(slots=True)
+class CommentRow:
+    content: str
+    id: int
+    user_id: int
+    post_id: int
+    created_at: datetime
+
+
+@dataclass(slots=True)
+class FollowRow:
+    id: int
+    follower_id: int
+    user_id: int
+    created_at: datetime
+
+
+def columns_of(row_cls, model) -> tuple:
+    """Колонки модели в порядке полей DTO."""
+    return tuple(getattr(model, f.name) for f in fields(row_cls))
+
+
+async def fetch_rows(db: AsyncSession, row_cls, model, where, cursor: str | None, limit: int):
+    """
+    Страница DTO (created_at, id) DESC и курсор следующей. created_at и id
+    выбираются последними для курсора, даже если в DTO их нет.
+    """
+    columns = columns_of(row_cls, model)
+    q = select(*columns, model.created_at, model.id)
+    if where is not None:
+        q = q.where(where)
+    q = apply_cursor(q, model.created_at, model.id, cursor, limit, db.get_bind().dialect.name)
+    res = await db.execute(q)
+    page, next_cursor = make_page(res.all(), limit)
+    width = len(columns)
+    return [row_cls(*row[:width]) for row in page], next_cursor
+
+
+async def list_post_rows(db: AsyncSession, cursor: str | None = None, limit: int = 10):
+    return await fetch_rows(db, PostRow, Post, None, cursor, limit)
+
+
+async def list_comment_rows(db: AsyncSession, post_id: int, cursor: str | None = None, limit: int = 50):
+    return await fetch_rows(db, CommentRow, Comment, Comment.post_id == post_id, cursor, limit)
+
+
+async def list_following_rows(db: AsyncSession, user_id: int, cursor: str | None = None, limit: int = 50):
+    return await fetch_rows(db, FollowRow, Follow, Follow.follower_id == user_id, cursor, limit)
+
+
+async def list_follower_rows(db: AsyncSession, user_id: int, cursor: str | None = None, limit: int = 50):
+    return await fetch_rows(db, FollowRow, Follow, Follow.user_id == user_id, cursor, limit)
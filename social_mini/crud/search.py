@@ -0,0 +1,189 @@
+"""
+Полнотекстовый поиск по постам.
+
+PostgreSQL: колонка posts.search_vector (tsvector, GIN-индекс), заголовок с весом A,
+текст с весом B; ранжирование ts_rank_cd по всем совпадениям или, если задан
+SEARCH_RANK_WINDOW, только среди самых новых. Вектор пишется вместе с постом — в create_post и при редактировании.
+
+Остальные СУБД (SQLite в тестах): инвертированный индекс в памяти процесса,
+строится из таблицы при первом поиске и дальше поддерживается теми же вызовами.
+"""
+import re
+from collections import Counter
+
+from sqlalchemy import Text, cast, func, literal, literal_column, select, tuple_, update
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from social_mini.core import config
+from social_mini.models.post import POST_COLUMNS, Post
+from .pagination import decode_rank_cursor, encode_rank_cursor
+from .upsert import dialect_name
+
+_TOKEN_RE = re.compile(r"\w+")
+TITLE_WEIGHT = 2.0
+
+
+def uses_tsvector(dialect: str) -> bool:
+    return dialect == "postgresql"
+
+
+def search_vector_expr(title, content):
+    """tsvector поста; title/content — значения или колонки."""
+    cfg = _ts_config()
+    # вес — литерал в SQL: setweight принимает тип "char", а не varchar
+    title_vector = func.setweight(
+        func.to_tsvector(cfg, cast(func.coalesce(title, ""), Text)), literal_column("'A'")
+    )
+    content_vector = func.setweight(
+        func.to_tsvector(cfg, cast(func.coalesce(content, ""), Text)), literal_column("'B'")
+    )
+    return title_vector.op("||")(content_vector)
+
+
+def _ts_config():
+    return cast(literal(config.SEARCH_TS_CONFIG), REGCONFIG)
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+class InvertedIndex:
+    """term -> {post_id: вес}. Запрос — AND по всем словам, ранг — сумма весов."""
+
+    def __init__(self):
+        self._postings: dict[str, dict[int, float]] = {}
+        self._terms: dict[int, tuple] = {}
+        self.ready = False
+
+    def add(self, post_id: int, title: str, content: str) -> None:
+        self.remove(post_id)
+        weights = Counter()
+        for term in tokenize(title or ""):
+            weights[term] += TITLE_WEIGHT
+        for term in tokenize(content or ""):
+            weights[term] += 1.0
+        for term, weight in weights.items():
+            self._postings.setdefault(term, {})[post_id] = weight
+        self._terms[post_id] = tuple(weights)
+
+    def remove(self, post_id: int) -> None:
+        for term in self._terms.pop(post_id, ()):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(post_id, None)
+                if not postings:
+                    del self._postings[term]
+
+    def search(self, query: str) -> list[tuple[float, int]]:
+        """[(ранг, post_id)] по убыванию."""
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        postings = sorted((self._postings.get(t, {}) for t in terms), key=len)
+        ids = set(postings[0])
+        for p in postings[1:]:
+            ids &= p.keys()
+        hits = [(sum(p[i] for p in postings), i) for i in ids]
+        hits.sort(reverse=True)
+        return hits
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._terms.clear()
+        self.ready = False
+
+
+search_index = InvertedIndex()
+
+
+async def _ensure_index(db: AsyncSession) -> None:
+    if search_index.ready:
+        return
+    res = await db.execute(select(Post.id, Post.title, Post.content))
+    for post_id, title, content in res.all():
+        search_index.add(post_id, title, content)
+    search_index.ready = True
+
+
+async def index_post(db: AsyncSession, post: Post) -> None:
+    """
+    Обновляет поисковый индекс поста; вызывать до flush/commit.
+    На PostgreSQL вектор считается в том же INSERT/UPDATE, что и сам пост.
+    """
+    if uses_tsvector(dialect_name(db)):
+        post.search_vector = search_vector_expr(post.title, post.content)
+    elif search_index.ready:
+        if post.id is None:
+            await db.flush()
+        search_index.add(post.id, post.title, post.content)
+
+
+def unindex_post(db: AsyncSession, post_id: int) -> None:
+    if not uses_tsvector(dialect_name(db)):
+        search_index.remove(post_id)
+
+
+async def reindex_posts(db: AsyncSession) -> int:
+    """Заполняет search_vector у постов, созданных до появления поиска."""
+    if not uses_tsvector(dialect_name(db)):
+        search_index.clear()
+        await _ensure_index(db)
+        return len(search_index)
+    res = await db.execute(
+        update(Post)
+        .where(Post.search_vector.is_(None))
+        .values(search_vector=search_vector_expr(Post.title, Post.content))
+    )
+    await db.commit()
+    return res.rowcount
+
+
+async def search_posts(db: AsyncSession, q: str, cursor: str | None = None, limit: int = 20):
+    """Страница найденных постов по убыванию (rank, id) и курсор следующей."""
+    after = decode_rank_cursor(cursor) if cursor else None
+    if uses_tsvector(dialect_name(db)):
+        rows = await _search_tsvector(db, q, after, limit)
+    else:
+        rows = await _search_memory(db, q, after, limit)
+
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_rank_cursor(rows[-1]["rank"], rows[-1]["id"])
+
+
+async def _search_tsvector(db: AsyncSession, q: str, after, limit: int) -> list[dict]:
+    query = func.websearch_to_tsquery(_ts_config(), cast(literal(q), Text))
+    candidates = select(*POST_COLUMNS, Post.search_vector).where(Post.search_vector.op("@@")(query))
+    if config.SEARCH_RANK_WINDOW:
+        candidates = candidates.order_by(Post.id.desc()).limit(config.SEARCH_RANK_WINDOW)
+    candidates = candidates.subquery("candidates")
+
+    rank = func.ts_rank_cd(candidates.c.search_vector, query)
+    stmt = select(*(candidates.c[c.key] for c in POST_COLUMNS), rank.label("rank"))
+    if after:
+        stmt = stmt.where(tuple_(rank, candidates.c.id) < tuple_(*after))
+    stmt = stmt.order_by(rank.desc(), candidates.c.id.desc()).limit(limit + 1)
+    res = await db.execute(stmt)
+    return [dict(row) for row in res.mappings().all()]
+
+
+async def _search_memory(db: AsyncSession, q: str, after, limit: int) -> list[dict]:
+    await _ensure_index(db)
+    hits = search_index.search(q)
+    if config.SEARCH_RANK_WINDOW:
+        newest = set(sorted((i for _, i in hits), reverse=True)[:config.SEARCH_RANK_WINDOW])
+        hits = [h for h in hits if h[1] in newest]
+    if after:
+        hits = [h for h in hits if h < after]
+    hits = hits[:limit + 1]
+    if not hits:
+        return []
+    res = await db.execute(select(*POST_COLUMNS).where(Post.id.in_([i for _, i in hits])))
+    by_id = {row["id"]: row for row in res.mappings().all()}
+    return [{**by_id[i], "rank": rank} for rank, i in hits if i in by_id]
@@ -0,0 +1,288 @@
+"""
+Рейтинг «в тренде»: счёт поста — сумма весов лайков и комментариев, которая
+затухает экспоненциально с периодом полураспада окна (час / день / неделя).
+
+Forward decay: событие в момент t добавляет w·2^((t − EPOCH) / half_life).
+Такая сумма только растёт, но порядок по ней совпадает с порядком по текущему
+затухающему счёту, поэтому пересчитывать затухание при каждом чтении не нужно.
+Хранится её натуральный логарифм: для часового окна сама сумма переполнила бы
+float уже через несколько недель после EPOCH.
+
+Счёт обновляется на каждом лайке и комментарии (после commit), топ каждого окна —
+куча на TRENDING_TOP_K·2 постов. Чтение — сортировка топа и один запрос постов
+по id; таблицы likes и comments не читаются.
+
+Раз в TRENDING_CHECKPOINT_INTERVAL секунд приращения процесса складываются со
+счётом в post_scores, а топ перечитывается оттуда: так процессы видят события
+друг друга, а перезапуск не обнуляет рейтинг. Пост вне топа, набравший очки
+в другом процессе, попадает в топ с ближайшей контрольной точкой.
+"""
+import asyncio
+import heapq
+import logging
+import math
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core import config
+from ..models.post import POST_COLUMNS, Post
+from ..models.post_score import PostScore
+from .loader import chunked, post_loader
+from .upsert import dialect_name, insert_ignore
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc).timestamp()
+NEG_INF = float("-inf")
+WINDOWS = {"hour": 3600, "day": 86400, "week": 7 * 86400}
+# контрольные точки разных процессов не должны перемешивать чтение и запись
+_CHECKPOINT_LOCK = 0x7472656E64
+
+
+def log_add(a: float, b: float) -> float:
+    """log(e^a + e^b) без переполнения."""
+    if a == NEG_INF:
+        return b
+    if b == NEG_INF:
+        return a
+    hi, lo = (a, b) if a >= b else (b, a)
+    return hi + math.log1p(math.exp(lo - hi))
+
+
+def log_sub(a: float, b: float) -> float:
+    """log(e^a − e^b); −inf, если вычитаемое не меньше (с точностью до округления)."""
+    if b == NEG_INF:
+        return a
+    if b >= a - 1e-9:
+        return NEG_INF
+    return a + math.log1p(-math.exp(b - a))
+
+
+class TopK:
+    """
+    capacity постов с наибольшим ключом. Куча минимумов с ленивым удалением:
+    при обновлении ключа старая запись остаётся в куче и пропускается позже.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.keys: dict[int, float] = {}
+        self._heap: list[tuple[float, int]] = []
+
+    def _push(self, post_id: int, key: float) -> None:
+        self.keys[post_id] = key
+        heapq.heappush(self._heap, (key, post_id))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(k, p) for p, k in self.keys.items()]
+            heapq.heapify(self._heap)
+
+    def _lowest(self) -> tuple[float, int]:
+        while True:
+            key, post_id = self._heap[0]
+            if self.keys.get(post_id) == key:
+                return key, post_id
+            heapq.heappop(self._heap)
+
+    def update(self, post_id: int, key: float) -> None:
+        if key == NEG_INF:
+            self.keys.pop(post_id, None)
+        elif post_id in self.keys or len(self.keys) < self.capacity:
+            self._push(post_id, key)
+        else:
+            lowest_key, lowest_id = self._lowest()
+            if key > lowest_key:
+                del self.keys[lowest_id]
+                self._push(post_id, key)
+
+    def largest(self, n: int) -> list[tuple[int, float]]:
+        return heapq.nlargest(n, self.keys.items(), key=lambda item: item[1])
+
+
+class Window:
+    def __init__(self, name: str, half_life: float, capacity: int):
+        self.name = name
+        self.rate = math.log(2) / half_life
+        self.top = TopK(capacity)
+        # ключи постов, известные процессу: топ с контрольной точки плюс события после неё
+        self.keys: dict[int, float] = {}
+        # приращения с последней контрольной точки
+        self.added: dict[int, float] = {}
+        self.removed: dict[int, float] = {}
+
+    def log_weight(self, weight: float, now: float) -> float:
+        return math.log(weight) + self.rate * (now - EPOCH)
+
+    def score(self, key: float, now: float) -> float:
+        """Текущий затухающий счёт по ключу."""
+        return math.exp(key - self.rate * (now - EPOCH))
+
+    def record(self, post_id: int, weight: float, now: float) -> None:
+        x = self.log_weight(abs(weight), now)
+        current = self.keys.get(post_id, NEG_INF)
+        if weight > 0:
+            key = log_add(current, x)
+            self.added[post_id] = log_add(self.added.get(post_id, NEG_INF), x)
+        else:
+            key = log_sub(current, x)
+            self.removed[post_id] = log_add(self.removed.get(post_id, NEG_INF), x)
+        if key == NEG_INF:
+            self.keys.pop(post_id, None)
+        else:
+            self.keys[post_id] = key
+        self.top.update(post_id, key)
+
+    def forget(self, post_id: int) -> None:
+        for d in (self.keys, self.added, self.removed):
+            d.pop(post_id, None)
+        self.top.update(post_id, NEG_INF)
+
+    def reset(self, keys: dict[int, float]) -> None:
+        """Топ из контрольной точки плюс приращения, пришедшие, пока она писалась."""
+        for post_id, x in self.added.items():
+            keys[post_id] = log_add(keys.get(post_id, NEG_INF), x)
+        for post_id, x in self.removed.items():
+            keys[post_id] = log_sub(keys.get(post_id, NEG_INF), x)
+        self.keys = {p: k for p, k in keys.items() if k != NEG_INF}
+        self.top = TopK(self.top.capacity)
+        for post_id, key in self.keys.items():
+            self.top.update(post_id, key)
+
+
+class Trending:
+    def __init__(self, windows: dict[str, float] = WINDOWS, capacity: int = config.TRENDING_TOP_K * 2):
+        self.windows = {name: Window(name, half_life, capacity) for name, half_life in windows.items()}
+
+    def record(self, post_id: int, weight: float, now: float | None = None) -> None:
+        """now — время события: для отмены (weight < 0) — время исходного лайка или комментария."""
+        now = time.time() if now is None else now
+        for window in self.windows.values():
+            window.record(post_id, weight, now)
+
+    def forget(self, post_id: int) -> None:
+        for window in self.windows.values():
+            window.forget(post_id)
+
+    def top(self, window: str, limit: int, now: float | None = None) -> list[tuple[int, float]]:
+        now = time.time() if now is None else now
+        w = self.windows[window]
+        return [(post_id, w.score(key, now)) for post_id, key in w.top.largest(limit)]
+
+    async def checkpoint(self, db: AsyncSession, now: float | None = None) -> None:
+        """Складывает приращения со счётом в post_scores и перечитывает оттуда топ."""
+        now = time.time() if now is None else now
+        taken = {}
+        for w in self.windows.values():
+            taken[w.name] = (w.added, w.removed)
+            w.added, w.removed = {}, {}
+        try:
+            if dialect_name(db) == "postgresql":
+                await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _CHECKPOINT_LOCK})
+            tops = {}
+            for w in self.windows.values():
+                tops[w.name] = await self._merge(db, w, *taken[w.name], now)
+            await db.commit()
+        except BaseException:
+            # не записали — возвращаем приращения, чтобы учесть их в следующий раз
+            for w in self.windows.values():
+                added, removed = taken[w.name]
+                for post_id, x in added.items():
+                    w.added[post_id] = log_add(w.added.get(post_id, NEG_INF), x)
+                for post_id, x in removed.items():
+                    w.removed[post_id] = log_add(w.removed.get(post_id, NEG_INF), x)
+            raise
+        for w in self.windows.values():
+            w.reset(tops[w.name])
+
+    async def _merge(self, db: AsyncSession, w: Window, added: dict, removed: dict, now: float) -> dict:
+        # счёт ниже TRENDING_MIN_SCORE из рейтинга выбрасываем
+        floor = w.log_weight(config.TRENDING_MIN_SCORE, now)
+        dirty = list(set(added) | set(removed))
+        for chunk in chunked(dirty, config.BATCH_CHUNK_SIZE):
+            res = await db.execute(
+                select(PostScore.post_id, PostScore.log_score)
+                .where(PostScore.period == w.name, PostScore.post_id.in_(chunk))
+            )
+            stored = dict(res.all())
+            alive = set((await db.execute(select(Post.id).where(Post.id.in_(chunk)))).scalars())
+            upserts, gone = [], []
+            for post_id in chunk:
+                key = log_add(stored.get(post_id, NEG_INF), added.get(post_id, NEG_INF))
+                key = log_sub(key, removed.get(post_id, NEG_INF))
+                if post_id in alive and key > floor:
+                    upserts.append({"post_id": post_id, "period": w.name, "log_score": key})
+                elif post_id in stored:
+                    gone.append(post_id)
+            if upserts:
+                ins = insert_ignore(dialect_name(db), PostScore)
+                await db.execute(
+                    ins.on_conflict_do_update(
+                        index_elements=["post_id", "period"],
+                        set_={"log_score": ins.excluded.log_score},
+                    ),
+                    upserts,
+                )
+            if gone:
+                await db.execute(
+                    delete(PostScore).where(PostScore.period == w.name, PostScore.post_id.in_(gone))
+                )
+        await db.execute(delete(PostScore).where(PostScore.period == w.name, PostScore.log_score < floor))
+        res = await db.execute(
+            select(PostScore.post_id, PostScore.log_score)
+            .where(PostScore.period == w.name)
+            .order_by(PostScore.log_score.desc())
+            .limit(w.top.capacity)
+        )
+        return dict(res.all())
+
+
+trending = Trending()
+
+
+def _event_time(at: datetime | None) -> float | None:
+    if at is None:
+        return None
+    # SQLite отдаёт время без зоны, а пишется оно в UTC
+    return (at if at.tzinfo else at.replace(tzinfo=timezone.utc)).timestamp()
+
+
+def record_like(post_id: int, delta: int, at: datetime | None = None) -> None:
+    """
+    delta=-1 — снятый лайк; at — когда он был поставлен: вычитаем его вклад на тот
+    момент, а не вес нового события, иначе старый лайк обнулил бы весь счёт поста.
+    """
+    trending.record(post_id, config.TRENDING_LIKE_WEIGHT * delta, _event_time(at))
+
+
+def record_comment(post_id: int, delta: int, at: datetime | None = None) -> None:
+    """Как record_like: для удалённого комментария at — время его создания."""
+    trending.record(post_id, config.TRENDING_COMMENT_WEIGHT * delta, _event_time(at))
+
+
+async def get_trending(db: AsyncSession, window: str, limit: int) -> list[dict]:
+    """Топ окна: посты с текущим счётом; удалённые посты пропускаются."""
+    top = trending.top(window, limit)
+    posts = await post_loader.load_many(db, [post_id for post_id, _ in top])
+    result = []
+    for post_id, score in top:
+        post = posts.get(post_id)
+        if post is not None:
+            result.append({**{c.key: getattr(post, c.key) for c in POST_COLUMNS}, "score": round(score, 4)})
+    return result
+
+
+async def save_checkpoint(session_maker) -> None:
+    try:
+        async with session_maker() as db:
+            await trending.checkpoint(db)
+    except Exception:
+        logger.exception("Trending checkpoint failed")
+
+
+async def run_checkpoints(session_maker, interval: int = config.TRENDING_CHECKPOINT_INTERVAL) -> None:
+    """Фоновая задача: первая контрольная точка сразу — она же загружает рейтинг после старта."""
+    while True:
+        await save_checkpoint(session_maker)
+        await asyncio.sleep(interval)
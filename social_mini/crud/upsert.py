@@ -0,0 +1,45 @@
+"""
+INSERT ... ON CONFLICT DO NOTHING для PostgreSQL и SQLite.
+
+Обе СУБД поддерживают ON CONFLICT и RETURNING, поэтому идемпотентная запись
+и ответ «изменилось ли что-нибудь» получаются одним запросом без предварительного SELECT.
+"""
+from sqlalchemy import exists, false, select, true, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def dialect_name(db: AsyncSession) -> str:
+    return db.get_bind().dialect.name
+
+
+def insert_ignore(dialect: str, model):
+    """
+    INSERT для диалекта. У обоих вариантов одинаковый API:
+    .values()/.from_select(), затем .on_conflict_do_nothing(index_elements=[...]).
+    """
+    if dialect == "postgresql":
+        return postgresql.insert(model)
+    if dialect == "sqlite":
+        return sqlite.insert(model)
+    raise ValueError(
+        f"INSERT ... ON CONFLICT DO NOTHING is only implemented for postgresql and sqlite, not {dialect!r}"
+    )
+
+
+def supports_dml_cte(dialect: str) -> bool:
+    """INSERT/UPDATE/DELETE внутри WITH умеет только PostgreSQL."""
+    return dialect == "postgresql"
+
+
+def inserted_or_existing(ins_cte, existing):
+    """
+    PostgreSQL: одним запросом отдаёт вставленную строку (created = true)
+    или уже существующую (created = false). ins_cte — INSERT ... RETURNING в виде CTE,
+    existing — SELECT тех же колонок по уникальному ключу.
+    """
+    inserted = select(ins_cte, true().label("created"))
+    existing = existing.add_columns(false().label("created")).where(
+        ~exists().select_from(ins_cte)
+    )
+    return union_all(inserted, existing)
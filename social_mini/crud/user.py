@@ -4,14 +4,22 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from social_mini.models.user import User
 from social_mini.schemas.user import UserCreate
-from social_mini.core.security import get_password_hash
+from social_mini.core import config, security
+from social_mini.core.cache import build_cache
+from social_mini.database import STALE_MARK, can_fill_cache, invalidate_cached
+
+PROFILE_COLUMNS = (
+    User.id, User.username, User.first_name, User.last_name,
+    User.followers_count, User.following_count, User.posts_count,
+)
+profile_cache = build_cache("profile", config.PROFILE_CACHE_SIZE, config.PROFILE_CACHE_TTL)
 
 async def get_user_by_username(db: AsyncSession, username: str):
     result = await db.execute(select(User).where(User.username == username))
     return result.scalars().first()
 
 async def create_user(db: AsyncSession, user: UserCreate):
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await security.get_password_hash_async(user.password)
     db_user = User(
         username=user.username,
         email=user.email,
@@ -22,4 +30,27 @@ async def create_user(db: AsyncSession, user: UserCreate):
     db.add(db_user)
     await db.commit()
     await db.refresh(db_user)
-    return db_user
\ No newline at end of file
+    security.invalidate_user(db_user.username)
+    return db_user
+
+async def get_profile(db: AsyncSession, user_id: int) -> dict | None:
+    """
+    Профиль со счётчиками: одно чтение users по первичному ключу, счётчики
+    денормализованы (crud/counters.py); перед ним — кэш на PROFILE_CACHE_TTL секунд.
+    """
+    cached = await profile_cache.get(user_id)
+    if cached is not None and cached != STALE_MARK:
+        return cached
+    res = await db.execute(select(*PROFILE_COLUMNS).where(User.id == user_id))
+    row = res.first()
+    if row is None:
+        return None
+    profile = dict(row._mapping)
+    if can_fill_cache(db, cached):
+        await profile_cache.set(user_id, profile)
+    return profile
+
+async def invalidate_profiles(*user_ids: int) -> None:
+    """Вызывать после commit изменений счётчиков: автор изменения сразу видит новые числа."""
+    for user_id in user_ids:
+        await invalidate_cached(profile_cache, user_id)
@@ -0,0 +1,74 @@
+"""
+Версии коллекций для ETag: случайная метка, которая меняется после каждой записи.
+
+Метки лежат в кэш-бэкенде (CACHE_BACKEND), а не в основных таблицах, поэтому
+проверка If-None-Match не ходит в БД. При нескольких процессах нужен общий бэкенд,
+иначе процесс не узнает о записи, сделанной соседом.
+
+Если метка вытеснена из кэша, появляется новая: клиент получит полный ответ,
+но устаревший 304 невозможен. По той же причине запись всегда ставит новую метку,
+а не удаляет старую.
+
+В метке есть время записи (stamp_age): пока реплика может отставать
+(READ_YOUR_WRITES_SECONDS), ответ, прочитанный с неё, ETag не получает —
+иначе старое тело закешировалось бы под новой меткой.
+"""
+import math
+import time
+import uuid
+
+from social_mini.core import config
+from social_mini.core.cache import build_cache
+
+version_store = build_cache("ver", config.VERSION_CACHE_SIZE, config.VERSION_CACHE_TTL)
+
+POSTS = "posts"
+
+
+def likes_of(post_id: int) -> str:
+    return f"likes:{post_id}"
+
+
+def comments_of(post_id: int) -> str:
+    return f"comments:{post_id}"
+
+
+def _new_stamp() -> str:
+    return f"{uuid.uuid4().hex[:16]}@{time.time():.3f}"
+
+
+def stamp_age(stamp: str) -> float:
+    """Сколько секунд назад поставлена метка; для меток без времени — бесконечность."""
+    _, _, at = stamp.partition("@")
+    try:
+        return time.time() - float(at)
+    except ValueError:
+        return math.inf
+
+
+async def current(scope: str) -> str:
+    stamp = await version_store.get(scope)
+    if stamp is None:
+        stamp = _new_stamp()
+        await version_store.set(scope, stamp)
+    return stamp
+
+
+async def touch(*scopes: str) -> None:
+    """Вызывать после commit: новая метка для каждой затронутой коллекции."""
+    for scope in scopes:
+        await version_store.set(scope, _new_stamp())
+
+
+async def touch_post(post_id: int) -> None:
+    """Пост создан, изменён или удалён: меняется общий список."""
+    await touch(POSTS, likes_of(post_id), comments_of(post_id))
+
+
+async def touch_likes(post_id: int) -> None:
+    # likes_count есть и в общем списке
+    await touch(POSTS, likes_of(post_id))
+
+
+async def touch_comments(post_id: int) -> None:
+    await touch(POSTS, comments_of(post_id))
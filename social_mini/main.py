@@ -1,21 +1,178 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
+from functools import partial
+
+from fastapi import FastAPI, Response
 from fastapi.staticfiles import StaticFiles
 
-from social_mini.api import auth, posts
-from social_mini.api import social_extra
+from social_mini.api import auth, posts, feed, users
+from social_mini.api import events, social_extra
+from social_mini.core import admission, config
+from social_mini.core.events import broker
+from social_mini.core.jobs import job_queue
+from social_mini.core import metrics
+from social_mini.core import profiler
+from social_mini.core.security import get_auth_cache_stats, password_hasher
+from social_mini.crud.counters import run_reconciler
+from social_mini.crud.graph import follow_graph, run_rebuilds
+from social_mini.crud.loader import post_loader, user_loader
+from social_mini.crud.user import profile_cache
+from social_mini.crud.trending import run_checkpoints, save_checkpoint
+from social_mini.database import async_session_maker, engine, get_pool_stats, read_engine, recent_writes
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # фоновые задачи живут ровно столько, сколько приложение
+    tasks = []
+    if config.COUNTERS_RECONCILE_INTERVAL > 0:
+        tasks.append(asyncio.create_task(run_reconciler(async_session_maker)))
+    if config.TRENDING_CHECKPOINT_INTERVAL > 0:
+        tasks.append(asyncio.create_task(run_checkpoints(async_session_maker)))
+    tasks.append(asyncio.create_task(run_rebuilds()))
+    await broker.start()
+    await job_queue.start()
+    yield
+    # сначала дорабатываем задачи: их обработчики публикуют события
+    await job_queue.stop()
+    await broker.stop()
+    for task in tasks:
+        task.cancel()
+    for task in tasks:
+        with suppress(asyncio.CancelledError):
+            await task
+    if config.TRENDING_CHECKPOINT_INTERVAL > 0:
+        # приращения с последней контрольной точки не должны пропасть при перезапуске
+        await save_checkpoint(async_session_maker)
+
 
 app = FastAPI(
     title="Social Mini",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
+# добавленный позже — внешний: метрики видят и отказы 503/429
+if config.ADMISSION_ENABLED:
+    app.add_middleware(admission.AdmissionMiddleware)
+if config.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
+
+def instrument_engine(target_engine) -> None:
+    """Счётчики SQL для /metrics и хуки профилировщика на движке."""
+    if config.METRICS_ENABLED:
+        metrics.install_db_metrics(target_engine.sync_engine)
+    # хуки профилировщика дешёвые, пока профиль не включён, и нужны тестам (assert_max_queries)
+    profiler.install_query_profiler(target_engine.sync_engine)
+
+
+# с DATABASE_READ_URL чтения идут через второй движок — хуки нужны на обоих
+DB_ENGINES = [engine] if read_engine is engine else [engine, read_engine]
+for _engine in DB_ENGINES:
+    instrument_engine(_engine)
+if config.QUERY_PROFILE or config.DEBUG:
+    app.add_middleware(profiler.QueryProfilerMiddleware)
+
+
+def _pool_stat(target_engine, key: str):
+    return get_pool_stats(target_engine).get(key, 0)
+
+
+# пул реплики — те же метрики с префиксом db_replica_pool_
+for _engine, _prefix in zip(DB_ENGINES, ("db_pool", "db_replica_pool")):
+    for _key, _doc in (
+        ("size", "Connection pool size."),
+        ("checked_out", "Connections currently checked out."),
+        ("overflow", "Connections open beyond pool_size."),
+    ):
+        metrics.registry.register(metrics.Gauge(f"{_prefix}_{_key}", _doc, collect=partial(_pool_stat, _engine, _key)))
+    metrics.registry.register(metrics.Counter(
+        f"{_prefix}_waits_total", "Checkouts that had to wait for a connection.",
+        collect=partial(_pool_stat, _engine, "waits")))
+    metrics.registry.register(metrics.Counter(
+        f"{_prefix}_wait_seconds_total", "Total time spent waiting for a connection.",
+        collect=partial(_pool_stat, _engine, "wait_time_total")))
+metrics.registry.register(metrics.Gauge(
+    "password_hash_in_flight", "bcrypt jobs running or queued.", collect=lambda: password_hasher.in_flight))
+metrics.registry.register(metrics.Counter(
+    "password_hash_rejected_total", "Logins rejected with 429 because the bcrypt pool was full.",
+    collect=lambda: password_hasher.rejected))
+metrics.registry.register(metrics.Gauge(
+    "admission_in_flight", "Requests admitted and running, by route class.", ("class",),
+    collect=lambda: {(k,): v.in_flight for k, v in admission.limiters.items()}))
+metrics.registry.register(metrics.Gauge(
+    "admission_queued", "Requests waiting for admission, by route class.", ("class",),
+    collect=lambda: {(k,): v.queued for k, v in admission.limiters.items()}))
+metrics.registry.register(metrics.Counter(
+    "admission_rejected_total", "Requests shed with 503, by route class and reason.", ("class", "reason"),
+    collect=lambda: {(k, r): n for k, v in admission.limiters.items() for r, n in v.rejected.items()}))
+metrics.registry.register(metrics.Gauge(
+    "jobs_queue_depth", "Background jobs waiting or scheduled for retry.", collect=lambda: job_queue.store.depth))
+metrics.registry.register(metrics.Gauge(
+    "jobs_lag_seconds", "Age of the oldest waiting background job.", collect=lambda: job_queue.store.lag))
+metrics.registry.register(metrics.Counter(
+    "jobs_processed_total", "Background jobs completed, by type.", ("type",),
+    collect=lambda: {(t,): n for t, n in job_queue.processed.items()}))
+metrics.registry.register(metrics.Counter(
+    "jobs_failed_total", "Background job attempts that raised, by type.", ("type",),
+    collect=lambda: {(t,): n for t, n in job_queue.failed.items()}))
+metrics.registry.register(metrics.Gauge(
+    "event_streams", "Open GET /events/stream connections.", collect=lambda: broker.subscribers))
+metrics.registry.register(metrics.Counter(
+    "events_dropped_total", "Events dropped from full per-connection buffers.", collect=lambda: broker.dropped))
+
 app.include_router(auth.router)
 app.include_router(posts.router)
 app.include_router(social_extra.router)
+app.include_router(feed.router)
+app.include_router(users.router)
+app.include_router(events.router)
 
 app.mount("/frontend", StaticFiles(directory="frontend", html=True), name="frontend")
 
 
 @app.get("/")
 async def root():
-    return {"message": "Social Mini API", "docs": "/docs", "frontend": "/frontend"}
\ No newline at end of file
+    return {"message": "Social Mini API", "docs": "/docs", "frontend": "/frontend"}
+
+
+@app.get("/health/db")
+async def db_health():
+    """Живая статистика пула соединений (и пула реплики, если она задана)."""
+    stats = get_pool_stats()
+    if read_engine is not engine:
+        stats["replica"] = get_pool_stats(read_engine)
+    return stats
+
+
+@app.get("/health/admission")
+async def admission_health():
+    """Занятость и отказы по классам запросов, срабатывания лимита частоты."""
+    return admission.get_admission_stats()
+
+
+@app.get("/health/jobs")
+async def jobs_health():
+    """Глубина и отставание очереди фоновых задач, счётчики по типам."""
+    return job_queue.stats()
+
+
+@app.get("/health/cache")
+async def cache_health():
+    """Попадания и промахи кэшей; сколько id склеили пакетные загрузчики."""
+    return {
+        "auth": get_auth_cache_stats(),
+        "profiles": profile_cache.stats(),
+        "loaders": {"posts": post_loader.stats(), "users": user_loader.stats()},
+        "events": broker.stats(),
+        "recent_writes": recent_writes.stats(),
+        "follow_graph": follow_graph.stats(),
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Метрики в текстовом формате Prometheus."""
+    return Response(metrics.registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
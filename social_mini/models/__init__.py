@@ -0,0 +1,13 @@
+# social_mini/models/__init__.py
+# импорт всех моделей регистрирует их таблицы в Base.metadata (alembic, create_all)
+from .base import Base
+from .comment import Comment
+from .feed import FeedEntry
+from .follow import Follow
+from .job import Job
+from .like import Like
+from .post import Post
+from .post_score import PostScore
+from .user import User
+
+__all__ = ["Base", "Comment", "FeedEntry", "Follow", "Job", "Like", "Post", "PostScore", "User"]
@@ -1,5 +1,5 @@
 # social_mini/models/comment.py
-from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from .base import Base
 
@@ -12,4 +12,9 @@ class Comment(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), nullable=False)
\ No newline at end of file
+    post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), nullable=False)
+
+    __table_args__ = (
+        # комментарии поста страницами: WHERE post_id = ? ORDER BY created_at DESC, id DESC
+        Index("ix_comments_post_created", "post_id", "created_at", "id"),
+    )
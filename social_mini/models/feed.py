@@ -0,0 +1,21 @@
+# social_mini/models/feed.py
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, UniqueConstraint, Index
+from .base import Base
+
+
+class FeedEntry(Base):
+    """Материализованная строка ленты: пост автора, на которого подписан user_id."""
+    __tablename__ = "feed_entries"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), nullable=False, index=True)
+    author_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    # копия posts.created_at, чтобы чтение ленты было одним range scan по индексу
+    created_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "post_id", name="uq_feed_user_post"),
+        Index("ix_feed_user_created", "user_id", "created_at", "post_id"),
+        Index("ix_feed_user_author", "user_id", "author_id"),
+    )
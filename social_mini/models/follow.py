@@ -1,5 +1,5 @@
 # social_mini/models/follow.py
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.sql import func
 from .base import Base
 
@@ -14,4 +14,8 @@ class Follow(Base):
 
     __table_args__ = (
         UniqueConstraint("follower_id", "user_id", name="uq_follow_pair"),
+        # подписки/подписчики страницами по (created_at, id); INCLUDE делает выборку
+        # строк Follow index-only scan'ом на PostgreSQL
+        Index("ix_follows_follower_created", "follower_id", "created_at", "id", postgresql_include=["user_id"]),
+        Index("ix_follows_user_created", "user_id", "created_at", "id", postgresql_include=["follower_id"]),
     )
\ No newline at end of file
@@ -0,0 +1,21 @@
+# social_mini/models/job.py
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+from sqlalchemy.sql import func
+from .base import Base
+
+
+class Job(Base):
+    """Отложенная задача для JOBS_BACKEND=table (core/jobs.py): переживает перезапуск."""
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True)
+    type = Column(String(64), nullable=False)
+    payload = Column(Text, nullable=False)  # JSON
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    # не раньше этого момента; взятая воркером задача сдвигается на JOBS_LEASE вперёд
+    run_at = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_jobs_run_at", "run_at", "id"),
+    )
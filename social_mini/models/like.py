@@ -1,5 +1,5 @@
 # social_mini/models/like.py
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.sql import func
 from .base import Base
 
@@ -14,4 +14,6 @@ class Like(Base):
 
     __table_args__ = (
         UniqueConstraint("user_id", "post_id", name="uq_like_user_post"),
+        # уникальный индекс ведёт по user_id; лайки поста и пересчёт счётчиков идут по post_id
+        Index("ix_likes_post_user", "post_id", "user_id"),
     )
\ No newline at end of file
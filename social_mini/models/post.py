@@ -1,5 +1,7 @@
 # social_mini/models/post.py
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 from .base import Base
 
@@ -11,4 +13,22 @@ class Post(Base):
     title = Column(String, index=True, nullable=False)
     content = Column(Text, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
\ No newline at end of file
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    # денормализованные счётчики, обновляются атомарно в crud/like.py и crud/comment.py
+    likes_count = Column(Integer, nullable=False, default=0, server_default="0")
+    comments_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # полнотекстовый индекс (PostgreSQL); заполняется в crud/search.py.
+    # deferred — обычные выборки постов его не тянут
+    search_vector = deferred(Column(TSVECTOR().with_variant(Text(), "sqlite"), nullable=True))
+
+    __table_args__ = (
+        # keyset-пагинация общей ленты: ORDER BY created_at DESC, id DESC
+        Index("ix_posts_created_id", "created_at", "id"),
+        # посты автора: бэкфилл ленты после подписки и подмешивание «тяжёлых» авторов
+        Index("ix_posts_owner_created", "owner_id", "created_at", "id"),
+        Index("ix_posts_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
+
+# колонки для ответов API — всё, кроме search_vector
+POST_COLUMNS = tuple(c for c in Post.__table__.columns if c.key != "search_vector")
@@ -0,0 +1,21 @@
+# social_mini/models/post_score.py
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Index
+from .base import Base
+
+
+class PostScore(Base):
+    """
+    Контрольная точка рейтинга «в тренде» (crud/trending.py). log_score —
+    логарифм затухающего счёта, приведённого к общей эпохе: порядок по нему
+    совпадает с порядком по текущему счёту, поэтому топ — один проход по индексу.
+    """
+    __tablename__ = "post_scores"
+
+    post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True)
+    # hour / day / week; не window — это зарезервированное слово в PostgreSQL
+    period = Column(String(16), primary_key=True)
+    log_score = Column(Float, nullable=False)
+
+    __table_args__ = (
+        Index("ix_post_scores_period_score", "period", "log_score"),
+    )
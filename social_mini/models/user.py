@@ -1,5 +1,5 @@
 # social_mini/models/user.py
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, Boolean, false
 from .base import Base
 
 
@@ -11,4 +11,10 @@ class User(Base):
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     first_name = Column(String, nullable=True)
-    last_name = Column(String, nullable=True)
\ No newline at end of file
+    last_name = Column(String, nullable=True)
+    # у автора слишком много подписчиков — его посты подмешиваются в ленту при чтении
+    fanout_on_read = Column(Boolean, nullable=False, default=False, server_default=false())
+    # денормализованные счётчики профиля; меняются вместе с follows и posts (crud/counters.py)
+    followers_count = Column(Integer, nullable=False, default=0, server_default="0")
+    following_count = Column(Integer, nullable=False, default=0, server_default="0")
+    posts_count = Column(Integer, nullable=False, default=0, server_default="0")
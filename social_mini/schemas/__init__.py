@@ -1,2 +1,2 @@
-from .user import UserCreate, UserOut, TokenData, Token
-from .post import PostCreate, PostOut
\ No newline at end of file
+from .user import UserCreate, UserOut, UserPublic, TokenData, Token
+from .post import PostCreate, PostOut, PostDetailOut, PostSearchOut, TrendingPostOut
\ No newline at end of file
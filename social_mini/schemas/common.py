@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+
+
+class ChangeResult(BaseModel):
+    """Ответ идемпотентных операций: изменилось ли что-нибудь."""
+    changed: bool
+
+
+class BatchIds(BaseModel):
+    """Тело пакетных запросов: список id."""
+    ids: list[int]
@@ -9,4 +9,9 @@ class FollowOut(BaseModel):
     created_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class FollowCounts(BaseModel):
+    followers: int
+    following: int
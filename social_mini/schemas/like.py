@@ -16,4 +16,8 @@ class LikeOut(BaseModel):
 class LikesSummary(BaseModel):
     """Краткая инфа по лайкам поста."""
     post_id: int
-    likes_count: int
\ No newline at end of file
+    likes_count: int
+
+class LikeStatus(LikesSummary):
+    """Сводка для пакетного запроса; liked_by_me — только для авторизованных."""
+    liked_by_me: bool | None = None
@@ -1,5 +1,7 @@
 from pydantic import BaseModel
 
+from .comment import CommentOut
+
 class PostCreate(BaseModel):
     title: str
     content: str
@@ -9,6 +11,25 @@ class PostOut(BaseModel):
     title: str
     content: str
     owner_id: int
+    likes_count: int = 0
+    comments_count: int = 0
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class PostDetailOut(PostOut):
+    """PostOut с полями для ?expand / ?comments; незапрошенные поля в ответ не попадают."""
+    author_username: str | None = None
+    liked_by_me: bool | None = None
+    latest_comments: list[CommentOut] | None = None
+
+
+class PostSearchOut(PostOut):
+    """Результат поиска: пост и его релевантность."""
+    rank: float
+
+
+class TrendingPostOut(PostOut):
+    """Пост в трендах и его текущий затухающий счёт."""
+    score: float
@@ -18,6 +18,26 @@ class UserOut(BaseModel):
     class Config:
         from_attributes = True
 
+class UserPublic(BaseModel):
+    """Публичные поля пользователя (без email)."""
+    id: int
+    username: str
+    first_name: str | None = None
+    last_name: str | None = None
+
+    class Config:
+        from_attributes = True
+
+class UserProfileOut(UserPublic):
+    """Публичный профиль со счётчиками."""
+    followers_count: int = 0
+    following_count: int = 0
+    posts_count: int = 0
+
+class UserSuggestionOut(UserPublic):
+    """Кого почитать: mutual — сколько ваших подписок на него подписано."""
+    mutual: int
+
 class TokenData(BaseModel):
     username: str | None = None
 
@@ -1,20 +1,85 @@
+import asyncio
+import contextlib
+import os
+import uuid
+
+# pytest-asyncio создаёт новый event loop на каждый тест, а соединения из пула
+# привязаны к циклу, в котором открыты, — в тестах пул не нужен
+os.environ.setdefault("DB_POOL_MODE", "null")
+
 import pytest
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import NullPool
 
+from social_mini.core.profiler import profile_queries
 from social_mini.main import app
-from social_mini.models.user import Base
+from social_mini.models import Base
 from social_mini.database import DATABASE_URL
 
 
+@pytest.fixture(scope="session", autouse=True)
+def db_schema():
+    """Недостающие таблицы в DATABASE_URL: пустая SQLite-база годится для прогона."""
+    async def _create():
+        engine = create_async_engine(DATABASE_URL, poolclass=NullPool)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        await engine.dispose()
+
+    asyncio.run(_create())
+
+
 @pytest.fixture
 async def client():
     async with AsyncClient(app=app, base_url="http://test") as ac:
         yield ac
 
 
+@pytest.fixture
+def register_and_login():
+    """Регистрирует пользователя с уникальным именем и возвращает его id, имя и заголовки."""
+    async def _register_and_login(ac: AsyncClient, prefix: str) -> dict:
+        username = f"{prefix}_{uuid.uuid4().hex[:8]}"
+        reg = await ac.post("/auth/register", json={
+            "username": username,
+            "email": f"{username}@example.com",
+            "password": "secret123",
+            "first_name": "Test",
+            "last_name": "User"
+        })
+        token_resp = await ac.post("/auth/token", data={
+            "username": username,
+            "password": "secret123"
+        })
+        token = token_resp.json()["access_token"]
+        return {
+            "id": reg.json()["id"],
+            "username": username,
+            "headers": {"Authorization": f"Bearer {token}"},
+        }
+
+    return _register_and_login
+
+
+@pytest.fixture
+def assert_max_queries():
+    """
+    Бюджет SQL-выражений на блок:
+
+        with assert_max_queries(2):
+            await ac.post(...)
+    """
+    @contextlib.contextmanager
+    def _assert_max_queries(n: int):
+        with profile_queries() as profile:
+            yield profile
+        assert profile.count <= n, f"expected at most {n} queries, got {profile.report()}"
+
+    return _assert_max_queries
+
+
 @pytest.fixture
 async def test_db():
     # Создаём отдельную тестовую БД (например, SQLite)
@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+
+from social_mini.core.admission import (
+    AUTH,
+    READ,
+    WRITE,
+    AdmissionMiddleware,
+    ConcurrencyLimiter,
+    RateLimiter,
+    Rejected,
+    route_class,
+)
+from social_mini.core.cache import LocalSharedClient, SharedBackend
+
+
+def test_route_class():
+    assert route_class("POST", "/auth/token") == AUTH
+    assert route_class("GET", "/posts/") == READ
+    assert route_class("DELETE", "/posts/1/like") == WRITE
+    assert route_class("GET", "/health/db") is None
+    assert route_class("GET", "/events/stream") is None
+
+
+@pytest.mark.asyncio
+async def test_limiter_queue_and_deadline():
+    limiter = ConcurrencyLimiter(limit=1, max_queue=1, timeout=0.05)
+    await limiter.acquire()
+
+    waiting = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    assert limiter.queued == 1
+    with pytest.raises(Rejected) as e:
+        await limiter.acquire()
+    assert e.value.reason == "queue_full"
+
+    # слот переходит ждущему, in_flight не проседает
+    limiter.release()
+    await waiting
+    assert limiter.in_flight == 1
+
+    with pytest.raises(Rejected) as e:
+        await limiter.acquire()
+    assert e.value.reason == "timeout"
+    assert limiter.queued == 0
+
+    limiter.release()
+    assert limiter.in_flight == 0
+    assert limiter.stats()["rejected"] == {"queue_full": 1, "timeout": 1}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("store", [None, SharedBackend(LocalSharedClient(), "ratelimit", 60)])
+async def test_rate_limiter_burst_then_reject(store):
+    limiter = RateLimiter(rate=1, burst=3, store=store)
+    for _ in range(3):
+        await limiter.take("user:a")
+    with pytest.raises(Rejected) as e:
+        await limiter.take("user:a")
+    assert e.value.reason == "rate_limited"
+    assert 0 < e.value.retry_after <= 1
+    # у другого клиента своё ведро
+    await limiter.take("user:b")
+
+
+def slow_app(started: asyncio.Event, finish: asyncio.Event):
+    async def app(scope, receive, send):
+        started.set()
+        await finish.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+    return app
+
+
+@pytest.mark.asyncio
+async def test_middleware_sheds_with_503():
+    started, finish = asyncio.Event(), asyncio.Event()
+    limits = {kind: ConcurrencyLimiter(1, 0, 0.05) for kind in (AUTH, WRITE, READ)}
+    shielded = AdmissionMiddleware(slow_app(started, finish), limits=limits)
+    async with AsyncClient(app=shielded, base_url="http://test") as ac:
+        first = asyncio.create_task(ac.get("/posts/"))
+        await started.wait()
+
+        resp = await ac.get("/posts/")
+        assert resp.status_code == 503
+        assert resp.headers["retry-after"] == "1"
+
+        # у записи свой бюджет, и служебные пути не ограничиваются
+        post = asyncio.create_task(ac.post("/posts/"))
+        health = asyncio.create_task(ac.get("/health/db"))
+        finish.set()
+        assert (await first).status_code == 200
+        assert (await post).status_code == 200
+        assert (await health).status_code == 200
+    assert all(limiter.in_flight == 0 for limiter in limits.values())
+
+
+@pytest.mark.asyncio
+async def test_middleware_rate_limits_per_client():
+    started, finish = asyncio.Event(), asyncio.Event()
+    finish.set()
+    limits = {kind: ConcurrencyLimiter(10, 10, 1) for kind in (AUTH, WRITE, READ)}
+    limited = AdmissionMiddleware(slow_app(started, finish), limits=limits, rate=RateLimiter(rate=1, burst=2))
+    async with AsyncClient(app=limited, base_url="http://test") as ac:
+        assert (await ac.get("/posts/")).status_code == 200
+        assert (await ac.get("/posts/")).status_code == 200
+        resp = await ac.get("/posts/")
+        assert resp.status_code == 429
+        assert "retry-after" in resp.headers
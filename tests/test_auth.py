@@ -38,4 +38,37 @@ async def test_login_user():
     assert response.status_code == 200
     data = response.json()
     assert "access_token" in data
-    assert data["token_type"] == "bearer"
\ No newline at end of file
+    assert data["token_type"] == "bearer"
+
+
+@pytest.mark.asyncio
+async def test_current_user_is_cached(register_and_login):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        user = await register_and_login(ac, "cached")
+        before = (await ac.get("/health/cache")).json()["auth"]
+        for _ in range(3):
+            response = await ac.get("/feed", headers=user["headers"])
+            assert response.status_code == 200
+        after = (await ac.get("/health/cache")).json()["auth"]
+        bad = await ac.get("/feed", headers={"Authorization": "Bearer broken"})
+
+    # первый запрос заполняет кэши, остальные в них попадают
+    assert after["tokens"]["hits"] - before["tokens"]["hits"] >= 2
+    assert after["users"]["hits"] - before["users"]["hits"] >= 2
+    assert bad.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_login_rejected_when_hash_pool_saturated(monkeypatch, register_and_login):
+    from social_mini.core.security import password_hasher
+
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        user = await register_and_login(ac, "busy")
+        # пул bcrypt «забит» — сразу 429, а не очередь
+        monkeypatch.setattr(password_hasher, "capacity", 0)
+        response = await ac.post("/auth/token", data={
+            "username": user["username"],
+            "password": "secret123"
+        })
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
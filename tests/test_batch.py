@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from social_mini.main import app
+
+
+@pytest.mark.asyncio
+async def test_batch_lookups(register_and_login):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        author = await register_and_login(ac, "batch")
+        reader = await register_and_login(ac, "batchreader")
+        ids = []
+        for i in range(3):
+            resp = await ac.post("/posts/", json={"title": f"b{i}", "content": "x"},
+                                 headers=author["headers"])
+            ids.append(resp.json()["id"])
+        await ac.post(f"/posts/{ids[1]}/like", headers=reader["headers"])
+
+        missing = max(ids) + 100000
+        query = ",".join(str(i) for i in ids + [missing])
+        posts = (await ac.get(f"/posts/batch?ids={query}")).json()
+        assert set(posts) == {str(i) for i in ids}
+        assert posts[str(ids[0])]["title"] == "b0"
+
+        likes = (await ac.post("/posts/likes:batch", json={"ids": ids},
+                               headers=reader["headers"])).json()
+        assert likes[str(ids[1])] == {"post_id": ids[1], "likes_count": 1, "liked_by_me": True}
+        assert likes[str(ids[0])]["liked_by_me"] is False
+        anon = (await ac.post("/posts/likes:batch", json={"ids": ids})).json()
+        assert "liked_by_me" not in anon[str(ids[1])]
+
+        users = (await ac.get(f"/users/batch?ids={author['id']}&ids={reader['id']}")).json()
+        assert users[str(author["id"])]["username"] == author["username"]
+        assert "email" not in users[str(reader["id"])]
+
+        bad = await ac.get("/users/batch?ids=1,x")
+    assert bad.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_concurrent_batches_are_coalesced():
+    from social_mini.crud.loader import post_loader
+
+    calls = []
+
+    async def fetch(db, chunk):
+        calls.append(list(chunk))
+        return {i: i for i in chunk}
+
+    # подменяем только функцию выборки, чтобы посчитать запросы
+    original = post_loader._fetch
+    post_loader._fetch = fetch
+    try:
+        results = await asyncio.gather(
+            post_loader.load_many(None, [1, 2, 3]),
+            post_loader.load_many(None, [3, 4]),
+            post_loader.load_many(None, [4]),
+        )
+    finally:
+        post_loader._fetch = original
+    assert calls == [[1, 2, 3, 4]]
+    assert results[1] == {3: 3, 4: 4}
+
+
+@pytest.mark.asyncio
+async def test_batches_run_on_own_session_per_database(tmp_path):
+    from social_mini.crud.loader import BatchLoader
+    from social_mini.database import async_session_maker
+
+    other = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'other.db'}", poolclass=NullPool)
+    calls = []
+
+    async def fetch(db, chunk):
+        calls.append((db, db.bind, sorted(chunk)))
+        return {i: i for i in chunk}
+
+    loader = BatchLoader(fetch)
+    try:
+        async with async_session_maker() as primary, AsyncSession(other) as replica:
+            results = await asyncio.gather(
+                loader.load_many(primary, [1, 2]),
+                loader.load_many(replica, [2, 3]),
+                loader.load_many(primary, [3]),
+            )
+            # пачка на каждую базу, и ни одна не выполняется на сессии вызвавшего
+            assert sorted((bind is other, chunk) for _, bind, chunk in calls) == [(False, [1, 2, 3]), (True, [2, 3])]
+            assert not {id(db) for db, _, _ in calls} & {id(primary), id(replica)}
+    finally:
+        await other.dispose()
+    assert results == [{1: 1, 2: 2}, {2: 2, 3: 3}, {3: 3}]
@@ -0,0 +1,25 @@
+import pytest
+
+from social_mini.core.cache import LocalSharedClient, MemoryBackend, SharedBackend
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", [
+    MemoryBackend(maxsize=2, ttl=60),
+    SharedBackend(LocalSharedClient(), prefix="test", ttl=60),
+])
+async def test_cache_backends(backend):
+    assert await backend.get(1) is None
+    await backend.set(1, {"id": 1, "title": "a"})
+    assert await backend.get(1) == {"id": 1, "title": "a"}
+
+    await backend.delete(1)
+    assert await backend.get(1) is None
+
+    # нулевой TTL — не кэшируем
+    await backend.set(2, {"id": 2}, ttl=0)
+    assert await backend.get(2) is None
+
+    stats = backend.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 3
@@ -0,0 +1,58 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event
+
+from social_mini.database import engine
+from social_mini.main import app
+
+
+@pytest.mark.asyncio
+async def test_conditional_get(register_and_login):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        user = await register_and_login(ac, "etag")
+        post_id = (await ac.post("/posts/", json={"title": "etag", "content": "x"},
+                                 headers=user["headers"])).json()["id"]
+
+        for path in ("/posts/?limit=5", f"/posts/{post_id}/likes", f"/posts/{post_id}/comments"):
+            first = await ac.get(path)
+            assert first.status_code == 200
+            etag = first.headers["ETag"]
+            assert etag.startswith('W/"')
+            assert "no-cache" in first.headers["Cache-Control"]
+            statements = []
+
+            def count(*args, **kwargs):
+                statements.append(1)
+
+            event.listen(engine.sync_engine, "before_cursor_execute", count)
+            try:
+                again = await ac.get(path, headers={"If-None-Match": etag})
+            finally:
+                event.remove(engine.sync_engine, "before_cursor_execute", count)
+            assert again.status_code == 304
+            assert again.content == b""
+            # 304 отдаётся без единого запроса к БД
+            assert statements == []
+
+        likes_etag = (await ac.get(f"/posts/{post_id}/likes")).headers["ETag"]
+        comments_etag = (await ac.get(f"/posts/{post_id}/comments")).headers["ETag"]
+        list_etag = (await ac.get("/posts/?limit=5")).headers["ETag"]
+
+        # лайк меняет версию лайков и общего списка, но не комментариев
+        await ac.post(f"/posts/{post_id}/like", headers=user["headers"])
+        likes = await ac.get(f"/posts/{post_id}/likes", headers={"If-None-Match": likes_etag})
+        assert likes.status_code == 200
+        assert likes.json()["likes_count"] == 1
+        listing = await ac.get("/posts/?limit=5", headers={"If-None-Match": list_etag})
+        assert listing.status_code == 200
+        comments = await ac.get(f"/posts/{post_id}/comments", headers={"If-None-Match": comments_etag})
+        assert comments.status_code == 304
+
+        await ac.post(f"/posts/{post_id}/comments", json={"content": "hi"}, headers=user["headers"])
+        comments = await ac.get(f"/posts/{post_id}/comments", headers={"If-None-Match": comments_etag})
+        assert comments.status_code == 200
+
+        # у авторизованного свой ETag (в ответе может быть liked_by_me)
+        mine = await ac.get("/posts/?limit=5", headers=user["headers"])
+        assert mine.headers["ETag"] != listing.headers["ETag"]
+    assert mine.headers["Cache-Control"].startswith("private")
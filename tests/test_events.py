@@ -0,0 +1,200 @@
+import asyncio
+import json
+
+import pytest
+from httpx import AsyncClient
+
+from social_mini.core import config
+from social_mini.core.events import (
+    ALL_POSTS,
+    Broker,
+    LocalBackend,
+    LocalPubSubClient,
+    SharedBackend,
+    broker,
+    post_channel,
+)
+from social_mini.main import app
+
+
+def parse_frames(body: bytes) -> list[tuple[str, dict]]:
+    frames = []
+    for block in body.decode().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line and not line.startswith(":"))
+        if "event" in fields:
+            frames.append((fields["event"], json.loads(fields["data"])))
+    return frames
+
+
+@pytest.mark.asyncio
+async def test_broker_fanout_only_to_subscribed_channels():
+    b = Broker(LocalBackend())
+    a = b.subscribe([post_channel(1)])
+    c = b.subscribe([post_channel(2), ALL_POSTS])
+    await b.publish("like.created", {"post_id": 1, "user_id": 7}, post_channel(1))
+    await b.publish("post.created", {"id": 3}, ALL_POSTS)
+
+    assert [e.type for e in await a.next_batch(0.1)] == ["like.created"]
+    assert [e.type for e in await c.next_batch(0.1)] == ["post.created"]
+    assert await a.next_batch(0.01) is None
+
+    b.unsubscribe(a)
+    b.unsubscribe(c)
+    assert b.stats()["subscribers"] == 0
+    assert b.stats()["channels"] == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_drops_oldest():
+    b = Broker(LocalBackend())
+    sub = b.subscribe([ALL_POSTS], buffer=3)
+    for i in range(10):
+        await b.publish("post.created", {"id": i}, ALL_POSTS)
+
+    batch = await sub.next_batch(0.1)
+    assert [e.data["id"] for e in batch] == [7, 8, 9]
+    assert sub.dropped == 7
+    assert b.dropped == 7
+
+
+@pytest.mark.asyncio
+async def test_many_idle_subscribers_share_one_frame():
+    b = Broker(LocalBackend())
+    subs = [b.subscribe([ALL_POSTS], buffer=2) for _ in range(5000)]
+    await b.publish("post.created", {"id": 1}, ALL_POSTS)
+    frames = {id((await sub.next_batch(0))[0].frame) for sub in subs[:100]}
+    assert len(frames) == 1
+    assert b.delivered == 5000
+
+
+@pytest.mark.asyncio
+async def test_shared_backend_delivers_across_brokers():
+    client = LocalPubSubClient()
+    first, second = Broker(SharedBackend(client)), Broker(SharedBackend(client))
+    await first.start()
+    await second.start()
+    try:
+        sub = second.subscribe([post_channel(5)])
+        await first.publish("comment.created", {"id": 1, "post_id": 5}, post_channel(5))
+        batch = await sub.next_batch(1)
+        assert batch[0].type == "comment.created"
+        assert batch[0].data == {"id": 1, "post_id": 5}
+    finally:
+        await first.stop()
+        await second.stop()
+
+
+async def open_stream(query: str):
+    """
+    Поток через сырой ASGI: httpx.ASGITransport ждёт конца тела, а SSE не кончается.
+    Возвращает очередь кусков тела, функцию отключения клиента и задачу приложения.
+    """
+    chunks: asyncio.Queue = asyncio.Queue()
+    disconnected = asyncio.Event()
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            await chunks.put(message["status"])
+        elif message.get("body"):
+            await chunks.put(message["body"])
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": "/events/stream", "raw_path": b"/events/stream",
+        "query_string": query.encode(), "headers": [(b"host", b"test")],
+        "client": ("127.0.0.1", 1), "server": ("test", 80),
+    }
+    task = asyncio.create_task(app(scope, receive, send))
+    return chunks, disconnected.set, task
+
+
+async def read_until(chunks: asyncio.Queue, event_type: str) -> list[tuple[str, dict]]:
+    body = b""
+    while True:
+        body += await asyncio.wait_for(chunks.get(), 5)
+        frames = parse_frames(body)
+        if any(t == event_type for t, _ in frames):
+            return frames
+
+
+@pytest.mark.asyncio
+async def test_stream_delivers_events(monkeypatch, register_and_login):
+    monkeypatch.setattr(config, "EVENTS_HEARTBEAT", 0.05)
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        author = await register_and_login(ac, "ev_author")
+        reader = await register_and_login(ac, "ev_reader")
+        resp = await ac.post("/posts/", json={"title": "t", "content": "c"}, headers=author["headers"])
+        post_id = resp.json()["id"]
+
+        resp = await ac.get("/events/stream")
+        assert resp.status_code == 401
+
+        token = reader["headers"]["Authorization"].split()[1]
+        before = broker.subscribers
+        chunks, disconnect, task = await open_stream(f"access_token={token}&posts={post_id}")
+        assert await chunks.get() == 200
+        assert (await chunks.get()).startswith(b"retry:")
+        assert await asyncio.wait_for(chunks.get(), 5) == b": ping\n\n"
+
+        await ac.post(f"/posts/{post_id}/like", headers=author["headers"])
+        frames = await read_until(chunks, "like.created")
+        assert ("like.created", {"post_id": post_id, "user_id": author["id"]}) in frames
+
+        # подписка из того же стрима сразу добавляет канал автора
+        await ac.post(f"/users/{author['id']}/follow", headers=reader["headers"])
+        await read_until(chunks, "follow.created")
+        await ac.post("/posts/", json={"title": "new", "content": "c"}, headers=author["headers"])
+        frames = await read_until(chunks, "post.created")
+        [new_id] = [d["id"] for t, d in frames if t == "post.created" and d["title"] == "new"]
+
+        # на лайки нового поста стрим подписался сам, без переподключения
+        await ac.post(f"/posts/{new_id}/like", headers=author["headers"])
+        frames = await read_until(chunks, "like.created")
+        assert ("like.created", {"post_id": new_id, "user_id": author["id"]}) in frames
+
+        disconnect()
+        await asyncio.wait_for(task, 5)
+        assert broker.subscribers == before
+
+
+@pytest.mark.asyncio
+async def test_stream_keeps_only_latest_new_post_channels(monkeypatch, register_and_login):
+    monkeypatch.setattr(config, "EVENTS_NEW_POST_CHANNELS", 2)
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        author = await register_and_login(ac, "ev_many")
+        token = author["headers"]["Authorization"].split()[1]
+        chunks, disconnect, task = await open_stream(f"access_token={token}&all_posts=true")
+        assert await chunks.get() == 200
+        ids = []
+        for i in range(4):
+            resp = await ac.post("/posts/", json={"title": f"p{i}", "content": "c"}, headers=author["headers"])
+            ids.append(resp.json()["id"])
+            await read_until(chunks, "post.created")
+
+        # поток с all_posts не копит каналы всех постов сайта
+        assert [post_channel(i) in broker._channels for i in ids] == [False, False, True, True]
+        await ac.delete(f"/posts/{ids[-1]}", headers=author["headers"])
+        await read_until(chunks, "post.deleted")
+        assert post_channel(ids[-1]) not in broker._channels
+
+        disconnect()
+        await asyncio.wait_for(task, 5)
+
+
+@pytest.mark.asyncio
+async def test_stream_limit(monkeypatch, register_and_login):
+    monkeypatch.setattr(config, "EVENTS_MAX_CONNECTIONS", 0)
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        user = await register_and_login(ac, "ev_limit")
+        resp = await ac.get("/events/stream", headers=user["headers"])
+        assert resp.status_code == 503
+        assert "retry-after" in resp.headers
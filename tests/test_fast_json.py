@@ -0,0 +1,41 @@
+import pytest
+from httpx import AsyncClient
+
+from social_mini.core import config
+from social_mini.main import app
+
+
+async def _both_modes(ac, monkeypatch, url, headers=None):
+    monkeypatch.setattr(config, "FAST_JSON_LISTS", True)
+    fast = await ac.get(url, headers=headers)
+    monkeypatch.setattr(config, "FAST_JSON_LISTS", False)
+    slow = await ac.get(url, headers=headers)
+    monkeypatch.setattr(config, "FAST_JSON_LISTS", True)
+    return fast, slow
+
+
+@pytest.mark.asyncio
+async def test_fast_lists_match_response_models(monkeypatch, register_and_login):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        author = await register_and_login(ac, "fj_author")
+        reader = await register_and_login(ac, "fj_reader")
+        post = (await ac.post("/posts/", json={"title": "Привет", "content": "«текст»"},
+                              headers=author["headers"])).json()
+        for i in range(3):
+            await ac.post(f"/posts/{post['id']}/comments", json={"content": f"комментарий {i}"},
+                          headers=reader["headers"])
+        await ac.post(f"/users/{author['id']}/follow", headers=reader["headers"])
+
+        for url, headers in [
+            ("/posts/?limit=2", None),
+            (f"/posts/{post['id']}/comments?limit=2", None),
+            ("/users/me/following", reader["headers"]),
+            ("/users/me/followers", author["headers"]),
+        ]:
+            fast, slow = await _both_modes(ac, monkeypatch, url, headers)
+            assert fast.status_code == slow.status_code == 200
+            assert fast.json() == slow.json(), url
+            assert fast.json(), url
+            # курсор и ETag переносятся в готовый ответ
+            assert fast.headers.get("X-Next-Cursor") == slow.headers.get("X-Next-Cursor")
+            assert ("ETag" in fast.headers) == ("ETag" in slow.headers)
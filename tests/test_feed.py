@@ -0,0 +1,72 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+
+from social_mini.core import config
+from social_mini.crud import feed as feed_crud
+from social_mini.database import async_session_maker
+from social_mini.main import app
+from social_mini.models.feed import FeedEntry
+from social_mini.models.user import User
+
+
+@pytest.mark.asyncio
+async def test_feed_follow_post_unfollow(register_and_login):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        author = await register_and_login(ac, "author")
+        reader = await register_and_login(ac, "reader")
+
+        # пост до подписки попадает в ленту через backfill
+        old = await ac.post("/posts/", json={"title": "Old", "content": "before follow"},
+                            headers=author["headers"])
+        await ac.post(f"/users/{author['id']}/follow", headers=reader["headers"])
+
+        # новый пост раскладывается при записи
+        new = await ac.post("/posts/", json={"title": "New", "content": "after follow"},
+                            headers=author["headers"])
+
+        response = await ac.get("/feed", headers=reader["headers"])
+        assert response.status_code == 200
+        ids = [p["id"] for p in response.json()]
+        assert ids == [new.json()["id"], old.json()["id"]]
+
+        await ac.delete(f"/users/{author['id']}/follow", headers=reader["headers"])
+        response = await ac.get("/feed", headers=reader["headers"])
+    assert response.json() == []
+
+
+@pytest.mark.asyncio
+async def test_pull_mode_is_sticky(register_and_login, monkeypatch):
+    monkeypatch.setattr(config, "FEED_FANOUT_LIMIT", 1)
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        author = await register_and_login(ac, "sticky")
+        readers = [await register_and_login(ac, f"sticky_r{i}") for i in range(2)]
+        for reader in readers:
+            await ac.post(f"/users/{author['id']}/follow", headers=reader["headers"])
+
+        # подписчиков больше лимита — посты подмешиваются при чтении
+        first = (await ac.post("/posts/", json={"title": "a", "content": "c"}, headers=author["headers"])).json()["id"]
+        # подписчиков снова не больше лимита, но режим не меняется: первый пост не пропадает
+        await ac.delete(f"/users/{author['id']}/follow", headers=readers[1]["headers"])
+        second = (await ac.post("/posts/", json={"title": "b", "content": "c"}, headers=author["headers"])).json()["id"]
+
+        feed = (await ac.get("/feed", headers=readers[0]["headers"])).json()
+    assert [p["id"] for p in feed] == [second, first]
+    async with async_session_maker() as db:
+        assert (await db.get(User, author["id"])).fanout_on_read is True
+
+
+@pytest.mark.asyncio
+async def test_backfill_skips_posts_already_in_feed(register_and_login):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        author = await register_and_login(ac, "bf_author")
+        reader = await register_and_login(ac, "bf_reader")
+        await ac.post("/posts/", json={"title": "a", "content": "c"}, headers=author["headers"])
+        await ac.post(f"/users/{author['id']}/follow", headers=reader["headers"])
+
+    # повторная раскладка тех же постов (гонка с фоновой задачей) — не ошибка
+    async with async_session_maker() as db:
+        await feed_crud.backfill_author(db, user_id=reader["id"], author_id=author["id"])
+        await db.commit()
+        count = (await db.execute(select(func.count()).where(FeedEntry.user_id == reader["id"]))).scalar_one()
+    assert count == 1
@@ -0,0 +1,101 @@
+from array import array
+
+import pytest
+from httpx import AsyncClient
+
+from social_mini.crud.graph import FollowGraph, build_csr, follow_graph
+from social_mini.main import app
+
+
+def edges(*pairs):
+    pairs = sorted(pairs)
+    return array("i", [s for s, _ in pairs]), array("i", [d for _, d in pairs])
+
+
+def test_build_csr_both_directions():
+    following, followers = build_csr(*edges((1, 2), (1, 3), (2, 3), (4, 3)))
+    assert list(following.neighbors(1)) == [2, 3]
+    assert list(followers.neighbors(3)) == [1, 2, 4]
+    assert followers.degree(3) == 3
+    # пользователи без рёбер и за пределами снимка
+    assert list(following.neighbors(3)) == []
+    assert following.degree(100) == 0
+
+
+def test_overlay_on_top_of_snapshot():
+    following, _ = build_csr(*edges((1, 2), (1, 3)))
+    following.remove(1, 2)
+    following.add(1, 5)
+    following.add(1, 3)  # уже в снимке — ничего не меняет
+    assert following.neighbors(1) == [3, 5]
+    assert following.degree(1) == 2
+    following.add(1, 2)
+    following.remove(1, 5)
+    assert list(following.neighbors(1)) == [2, 3]
+    assert following.pending == 0
+
+
+def test_changes_during_rebuild_are_replayed():
+    graph = FollowGraph()
+    graph.following, graph.followers = build_csr(*edges((1, 2)))
+    graph.built = True
+    graph._journal = []
+    graph.follow(1, 3)
+    graph.unfollow(1, 2)
+    # новый снимок мог успеть увидеть только часть изменений — журнал идемпотентен
+    journal = graph._journal
+    graph.following, graph.followers = build_csr(*edges((1, 2), (1, 3)))
+    for change in journal:
+        graph._apply(*change)
+    assert list(graph.following.neighbors(1)) == [3]
+    assert graph.counts(2) == {"followers": 0, "following": 0}
+
+
+def test_suggestions_ranked_by_overlap():
+    graph = FollowGraph()
+    graph.following, graph.followers = build_csr(*edges(
+        (1, 2), (1, 3), (2, 4), (3, 4), (2, 5), (3, 1), (6, 5),
+    ))
+    # на 4 подписаны обе мои подписки, на 5 — одна; себя (3 -> 1) и уже прочитанных не советуем
+    assert graph.suggestions(1, 10) == [(4, 2), (5, 1)]
+    assert graph.suggestions(1, 1) == [(4, 2)]
+
+
+@pytest.mark.asyncio
+async def test_graph_endpoints_follow_writes(register_and_login):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        me, a, b, star = [await register_and_login(ac, f"g_{n}") for n in ("me", "a", "b", "star")]
+
+        async def follow(who, whom):
+            await ac.post(f"/users/{whom['id']}/follow", headers=who["headers"])
+
+        await follow(me, a)
+        await follow(me, b)
+        await follow(a, star)
+        await follow(b, star)
+        await follow(a, b)
+
+        resp = await ac.get("/users/me/suggestions", headers=me["headers"])
+        assert resp.status_code == 200
+        assert [(u["id"], u["mutual"]) for u in resp.json()] == [(star["id"], 2)]
+        assert resp.json()[0]["username"] == star["username"]
+
+        resp = await ac.get(f"/users/{b['id']}/mutual-followers", headers=a["headers"])
+        assert [u["id"] for u in resp.json()] == [me["id"]]
+
+        resp = await ac.get(f"/users/{star['id']}/follow-counts", headers=me["headers"])
+        assert resp.json() == {"followers": 2, "following": 0}
+        resp = await ac.get("/users/999999999/follow-counts", headers=me["headers"])
+        assert resp.status_code == 404
+        resp = await ac.get(f"/users/{star['id']}/follow-counts")
+        assert resp.status_code == 401
+
+        await ac.delete(f"/users/{star['id']}/follow", headers=b["headers"])
+        resp = await ac.get("/users/me/suggestions", headers=me["headers"])
+        assert [(u["id"], u["mutual"]) for u in resp.json()] == [(star["id"], 1)]
+
+        # снимок из базы совпадает с тем, что набрал оверлей
+        before = [follow_graph.counts(u["id"]) for u in (me, a, b, star)]
+        await follow_graph.rebuild()
+        assert [follow_graph.counts(u["id"]) for u in (me, a, b, star)] == before
+        assert follow_graph.following.pending == 0
@@ -0,0 +1,83 @@
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, event, text
+
+from social_mini.crud import comment as comment_crud
+from social_mini.crud import feed as feed_crud
+from social_mini.crud import follow as follow_crud
+from social_mini.crud import like as like_crud
+from social_mini.database import async_session_maker, engine
+from social_mini.models import Base
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# (горячий CRUD-вызов, индекс, которым он должен читать таблицу)
+HOT_QUERIES = [
+    (lambda db: comment_crud.get_comments_for_post(db, 1), "ix_comments_post_created"),
+    (lambda db: like_crud.get_likes_for_post(db, 1), "ix_likes_post_user"),
+    (lambda db: follow_crud.get_followers(db, 1), "ix_follows_user_created"),
+    (lambda db: follow_crud.get_following(db, 1), "ix_follows_follower_created"),
+    (lambda db: feed_crud.backfill_author(db, 1, 2), "ix_posts_owner_created"),
+    (lambda db: feed_crud.get_feed(db, 1), "ix_feed_user_created"),
+]
+
+
+async def _captured_statements(call) -> list[tuple]:
+    """SQL и параметры, которые реально отправляет CRUD-функция."""
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        async with async_session_maker() as db:
+            await call(db)
+            await db.rollback()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+    return captured
+
+
+async def _plan(conn, statement: str, parameters) -> str:
+    if conn.dialect.name == "sqlite":
+        rows = await conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)
+        return "\n".join(row[-1] for row in rows)
+    rows = await conn.exec_driver_sql("EXPLAIN " + statement, parameters)
+    return "\n".join(row[0] for row in rows)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("call, index", HOT_QUERIES, ids=[i for _, i in HOT_QUERIES])
+async def test_hot_query_uses_index(call, index):
+    statements = await _captured_statements(call)
+    assert statements
+    plans = []
+    async with engine.connect() as conn:
+        if conn.dialect.name == "postgresql":
+            # на почти пустых таблицах seq scan и сортировка дешевле любого индекса —
+            # запрещаем их, чтобы увидеть, есть ли индекс под фильтр и порядок сразу
+            await conn.execute(text("SET enable_seqscan = off"))
+            await conn.execute(text("SET enable_sort = off"))
+        for statement, parameters in statements:
+            plans.append(await _plan(conn, statement, parameters))
+    assert any(index in plan for plan in plans), "\n\n".join(plans)
+
+
+def test_migrations_match_models(tmp_path):
+    db_path = tmp_path / "migrated.db"
+    cfg = Config(str(ROOT / "alembic.ini"))
+    cfg.set_main_option("script_location", str(ROOT / "alembic"))
+    cfg.attributes["url"] = f"sqlite+aiosqlite:///{db_path}"
+    command.upgrade(cfg, "head")
+
+    sync_engine = create_engine(f"sqlite:///{db_path}")
+    with sync_engine.connect() as conn:
+        diff = compare_metadata(MigrationContext.configure(conn), Base.metadata)
+    sync_engine.dispose()
+    assert diff == []
@@ -0,0 +1,176 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import delete, func, select
+
+from social_mini.core.jobs import Job as QueuedJob
+from social_mini.core.jobs import JobQueue, MemoryStore, TableStore, job_queue
+from social_mini.database import async_session_maker
+from social_mini.main import app
+from social_mini.models.job import Job
+
+
+def recording_queue(store=None, fail_on=None, failures: int = 0, **kwargs) -> tuple[JobQueue, list]:
+    """Очередь с обработчиками a и b, которые записывают пачки; fail_on падает failures раз."""
+    queue = JobQueue(store or MemoryStore(), workers=1, batch_size=10, backoff=0.01, poll_interval=0.05, **kwargs)
+    batches = []
+    left = {"failures": failures}
+
+    async def handle(payloads):
+        if fail_on in [p["n"] for p in payloads] and left["failures"]:
+            left["failures"] -= 1
+            raise RuntimeError("boom")
+        batches.append([p["n"] for p in payloads])
+
+    queue.handler("a")(handle)
+    queue.handler("b")(handle)
+    return queue, batches
+
+
+@pytest.mark.asyncio
+async def test_inline_without_workers():
+    queue, batches = recording_queue()
+    await queue.enqueue("a", {"n": 1})
+    assert batches == [[1]]
+    with pytest.raises(ValueError):
+        await queue.enqueue("unknown", {})
+
+
+@pytest.mark.asyncio
+async def test_same_type_jobs_are_coalesced_and_drained_on_stop():
+    queue, batches = recording_queue()
+    await queue.start()
+    for n in range(5):
+        await queue.enqueue("a", {"n": n})
+    await queue.enqueue("b", {"n": 100})
+    await queue.enqueue("a", {"n": 5})
+    await queue.stop()
+
+    assert batches == [[0, 1, 2, 3, 4, 5], [100]]
+    assert queue.stats()["depth"] == 0
+    assert queue.processed == {"a": 6, "b": 1}
+
+
+@pytest.mark.asyncio
+async def test_failed_job_is_retried_alone():
+    queue, batches = recording_queue(fail_on=2, failures=2)
+    await queue.start()
+    for n in range(4):
+        await queue.enqueue("a", {"n": n})
+    # повтор отложен: drain не ждёт его, поэтому останавливаемся, когда всё обработано
+    while queue.processed.get("a", 0) < 4:
+        await asyncio.sleep(0.01)
+    await queue.stop()
+
+    # пачка упала, её разобрали по одной; задача 2 упала ещё раз и прошла на повторе
+    assert batches == [[0], [1], [3], [2]]
+    assert queue.failed == {"a": 1}
+    assert queue.dropped == 0
+
+
+@pytest.mark.asyncio
+async def test_job_dropped_after_max_attempts():
+    queue, batches = recording_queue(fail_on=1, failures=10, max_attempts=2)
+    await queue.start()
+    await queue.enqueue("a", {"n": 1})
+    while not queue.dropped:
+        await asyncio.sleep(0.01)
+    await queue.stop()
+    assert batches == []
+    assert queue.failed == {"a": 2}
+    assert queue.stats()["depth"] == 0
+
+
+class FlakyStore(MemoryStore):
+    """done и retry падают по разу — как хранилище, потерявшее соединение."""
+
+    def __init__(self):
+        super().__init__()
+        self.broken = {"done", "retry"}
+
+    async def done(self, jobs):
+        if "done" in self.broken:
+            self.broken.discard("done")
+            raise RuntimeError("store down")
+        await super().done(jobs)
+
+    async def retry(self, job, delay):
+        if "retry" in self.broken:
+            self.broken.discard("retry")
+            raise RuntimeError("store down")
+        await super().retry(job, delay)
+
+
+@pytest.mark.asyncio
+async def test_worker_survives_store_errors():
+    store = FlakyStore()
+    queue, batches = recording_queue(store, fail_on=1, failures=1)
+    await queue.start()
+    await queue.enqueue("a", {"n": 0})
+    await queue.enqueue("b", {"n": 1})
+
+    async def until(condition):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(until(lambda: not store.broken), 5)
+    # воркер пережил обе ошибки и берёт следующие задачи
+    await queue.enqueue("a", {"n": 2})
+    await asyncio.wait_for(until(lambda: [2] in batches), 5)
+    assert all(not task.done() for task in queue._tasks)
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_table_store_survives_restart():
+    async with async_session_maker() as db:
+        await db.execute(delete(Job))
+        await db.commit()
+
+    store = TableStore(async_session_maker, lease=60)
+    queue, batches = recording_queue(store)
+    # «упавший» процесс: задачи записаны, воркеры их не разобрали
+    await queue.start()
+    await queue.stop(timeout=0)
+    await store.put([QueuedJob("a", {"n": 1}), QueuedJob("a", {"n": 2})])
+    await store.refresh()
+    assert store.depth == 2
+
+    restarted, batches = recording_queue(TableStore(async_session_maker, lease=60))
+    await restarted.start()
+    while restarted.processed.get("a", 0) < 2:
+        await asyncio.sleep(0.01)
+    await restarted.stop()
+    assert batches == [[1, 2]]
+    async with async_session_maker() as db:
+        assert (await db.execute(select(func.count(Job.id)))).scalar_one() == 0
+
+
+@pytest.mark.asyncio
+async def test_table_store_lease_hides_taken_jobs():
+    async with async_session_maker() as db:
+        await db.execute(delete(Job))
+        await db.commit()
+    store = TableStore(async_session_maker, lease=60)
+    await store.put([QueuedJob("a", {"n": 1})])
+    taken = await store.take(10)
+    assert [j.payload for j in taken] == [{"n": 1}]
+    assert await store.take(10) == []
+    await store.done(taken)
+
+
+@pytest.mark.asyncio
+async def test_feed_fan_out_runs_in_background(register_and_login):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        author = await register_and_login(ac, "jobs_author")
+        reader = await register_and_login(ac, "jobs_reader")
+        await ac.post(f"/users/{author['id']}/follow", headers=reader["headers"])
+
+        await job_queue.start()
+        try:
+            resp = await ac.post("/posts/", json={"title": "bg", "content": "c"}, headers=author["headers"])
+        finally:
+            await job_queue.stop()
+        resp = await ac.get("/feed", headers=reader["headers"])
+    assert [p["title"] for p in resp.json()] == ["bg"]
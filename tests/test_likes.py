@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from social_mini.main import app
+
+
+@pytest.mark.asyncio
+async def test_like_counters(register_and_login):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        user = await register_and_login(ac, "liker")
+        post = await ac.post("/posts/", json={"title": "Liked", "content": "post"},
+                             headers=user["headers"])
+        post_id = post.json()["id"]
+
+        # повторный лайк не увеличивает счётчик
+        first = await ac.post(f"/posts/{post_id}/like", headers=user["headers"])
+        second = await ac.post(f"/posts/{post_id}/like", headers=user["headers"])
+        assert first.status_code == 201
+        assert second.status_code == 200
+        assert second.json()["id"] == first.json()["id"]
+        response = await ac.get(f"/posts/{post_id}/likes")
+        assert response.json() == {"post_id": post_id, "likes_count": 1}
+
+        await ac.post(f"/posts/{post_id}/comments", json={"content": "hi"}, headers=user["headers"])
+        posts = (await ac.get("/posts/")).json()
+        listed = next(p for p in posts if p["id"] == post_id)
+        assert listed["likes_count"] == 1
+        assert listed["comments_count"] == 1
+
+        removed = await ac.delete(f"/posts/{post_id}/like", headers=user["headers"])
+        again = await ac.delete(f"/posts/{post_id}/like", headers=user["headers"])
+        assert removed.json() == {"changed": True}
+        assert again.json() == {"changed": False}
+        response = await ac.get(f"/posts/{post_id}/likes")
+    assert response.json()["likes_count"] == 0
+
+
+@pytest.mark.asyncio
+async def test_likes_of_missing_post(register_and_login):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        user = await register_and_login(ac, "ghost")
+        response = await ac.get("/posts/999999/likes")
+        like = await ac.post("/posts/999999/like", headers=user["headers"])
+    assert response.status_code == 404
+    assert like.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_concurrent_double_like(register_and_login):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        user = await register_and_login(ac, "racer")
+        post = await ac.post("/posts/", json={"title": "Race", "content": "post"}, headers=user["headers"])
+        post_id = post.json()["id"]
+
+        # проигравший ON CONFLICT не должен отвечать 404 на существующий пост
+        responses = await asyncio.gather(*(
+            ac.post(f"/posts/{post_id}/like", headers=user["headers"]) for _ in range(4)
+        ))
+        assert sorted(r.status_code for r in responses) == [200, 200, 200, 201]
+        assert len({r.json()["id"] for r in responses}) == 1
+        response = await ac.get(f"/posts/{post_id}/likes")
+    assert response.json()["likes_count"] == 1
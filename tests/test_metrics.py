@@ -0,0 +1,35 @@
+import pytest
+from httpx import AsyncClient
+
+from social_mini.core import metrics
+from social_mini.main import app
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(register_and_login):
+    route = "/posts/{post_id}/likes"
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        user = await register_and_login(ac, "metrics")
+        post_id = (await ac.post("/posts/", json={"title": "m", "content": "x"},
+                                 headers=user["headers"])).json()["id"]
+
+        requests_before = metrics.http_requests.value(route, "GET", 200)
+        queries_before = metrics.request_queries.sum(route)
+        await ac.get(f"/posts/{post_id}/likes")
+        await ac.get("/posts/0/likes")
+
+        response = await ac.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+
+    assert metrics.http_requests.value(route, "GET", 200) == requests_before + 1
+    assert f'http_requests_total{{route="{route}",method="GET",status="404"}}' in body
+    assert f'http_request_duration_seconds_bucket{{route="{route}",method="GET",le="+Inf"}}' in body
+    # SQL-запросы привязаны к HTTP-запросу, который их сделал
+    assert metrics.request_queries.sum(route) >= queries_before + 2
+    assert "db_queries_total " in body
+    assert "db_pool_checked_out " in body
+    # в момент выгрузки выполняется только сам /metrics
+    assert 'http_requests_in_flight{route="/metrics",method="GET"} 1' in body
+    assert f'http_requests_in_flight{{route="{route}"' not in body
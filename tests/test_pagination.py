@@ -0,0 +1,40 @@
+import pytest
+from httpx import AsyncClient
+from social_mini.main import app
+
+
+@pytest.mark.asyncio
+async def test_comments_cursor_pagination(register_and_login):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        user = await register_and_login(ac, "pager")
+        post = await ac.post("/posts/", json={"title": "Paged", "content": "comments"},
+                             headers=user["headers"])
+        post_id = post.json()["id"]
+        created = []
+        for i in range(5):
+            resp = await ac.post(f"/posts/{post_id}/comments", json={"content": f"c{i}"},
+                                 headers=user["headers"])
+            created.append(resp.json()["id"])
+
+        seen, cursor, pages = [], None, 0
+        while True:
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            resp = await ac.get(f"/posts/{post_id}/comments", params=params)
+            assert resp.status_code == 200
+            seen += [c["id"] for c in resp.json()]
+            pages += 1
+            cursor = resp.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+    assert pages == 3
+    assert seen == sorted(created, reverse=True)
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor():
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.get("/posts/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
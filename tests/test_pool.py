@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from social_mini.core import config
+from social_mini.database import DATABASE_URL, build_engine_kwargs, get_pool_stats
+
+
+@pytest.mark.asyncio
+async def test_pool_counts_only_blocked_checkouts(monkeypatch):
+    monkeypatch.setattr(config, "DB_POOL_SIZE", 1)
+    monkeypatch.setattr(config, "DB_MAX_OVERFLOW", 0)
+    engine = create_async_engine(DATABASE_URL, **build_engine_kwargs("queue"))
+    other = create_async_engine(DATABASE_URL, **build_engine_kwargs("queue"))
+    try:
+        # свободное соединение выдаётся сразу — это не ожидание
+        for _ in range(3):
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        assert get_pool_stats(engine)["waits"] == 0
+
+        async def second_checkout():
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+
+        async with engine.connect():
+            waiter = asyncio.create_task(second_checkout())
+            await asyncio.sleep(0.05)
+        await asyncio.wait_for(waiter, 5)
+
+        stats = get_pool_stats(engine)
+        assert stats["waits"] == 1
+        assert stats["wait_time_max"] > 0
+        # у другого пула своя статистика
+        assert get_pool_stats(other)["waits"] == 0
+    finally:
+        await engine.dispose()
+        await other.dispose()
@@ -1,6 +1,11 @@
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import delete, select
+
+from social_mini.database import async_session_maker
 from social_mini.main import app
+from social_mini.models.comment import Comment
+from social_mini.models.post import Post
 
 
 @pytest.mark.asyncio
@@ -39,4 +44,86 @@ async def test_get_posts():
     async with AsyncClient(app=app, base_url="http://test") as ac:
         response = await ac.get("/posts/")
     assert response.status_code == 200
-    assert isinstance(response.json(), list)
\ No newline at end of file
+    assert isinstance(response.json(), list)
+
+@pytest.mark.asyncio
+async def test_posts_expand(register_and_login):
+    from sqlalchemy import event
+    from social_mini.database import engine
+
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        author = await register_and_login(ac, "author")
+        reader = await register_and_login(ac, "reader")
+        ids = []
+        for i in range(3):
+            resp = await ac.post("/posts/", json={"title": f"p{i}", "content": "x"},
+                                 headers=author["headers"])
+            ids.append(resp.json()["id"])
+        for i in range(3):
+            await ac.post(f"/posts/{ids[0]}/comments", json={"content": f"c{i}"},
+                          headers=reader["headers"])
+        await ac.post(f"/posts/{ids[0]}/like", headers=reader["headers"])
+
+        plain = (await ac.get("/posts/?limit=3")).json()
+        assert "author_username" not in plain[0]
+
+        posts = (await ac.get("/posts/?limit=3&expand=true&comments=2",
+                              headers=reader["headers"])).json()
+        by_id = {p["id"]: p for p in posts}
+        assert by_id[ids[0]]["author_username"] == author["username"]
+        assert by_id[ids[0]]["liked_by_me"] is True
+        assert by_id[ids[1]]["liked_by_me"] is False
+        assert [c["content"] for c in by_id[ids[0]]["latest_comments"]] == ["c2", "c1"]
+        assert by_id[ids[1]]["latest_comments"] == []
+
+        # аноним получает автора, но не liked_by_me
+        anon = (await ac.get("/posts/?limit=3&expand=true")).json()
+        assert "liked_by_me" not in anon[0]
+
+        # число запросов не зависит от размера страницы
+        statements = []
+
+        def count(*args, **kwargs):
+            statements.append(1)
+
+        event.listen(engine.sync_engine, "before_cursor_execute", count)
+        try:
+            await ac.get("/posts/?limit=1&expand=true&comments=2", headers=reader["headers"])
+            small = len(statements)
+            statements.clear()
+            await ac.get("/posts/?limit=3&expand=true&comments=2", headers=reader["headers"])
+            large = len(statements)
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", count)
+    assert small == large
+
+
+@pytest.mark.asyncio
+async def test_comment_on_deleted_post(register_and_login):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        user = await register_and_login(ac, "gone")
+        post_id = (await ac.post("/posts/", json={"title": "gone", "content": "x"},
+                                 headers=user["headers"])).json()["id"]
+        deleted = await ac.delete(f"/posts/{post_id}", headers=user["headers"])
+        assert deleted.status_code == 200
+        resp = await ac.post(f"/posts/{post_id}/comments", json={"content": "late"},
+                             headers=user["headers"])
+    assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_comment_on_post_deleted_by_another_process(register_and_login):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        user = await register_and_login(ac, "stale")
+        post_id = (await ac.post("/posts/", json={"title": "stale", "content": "x"},
+                                 headers=user["headers"])).json()["id"]
+        async with async_session_maker() as db:
+            # пост удалил другой процесс в обход crud
+            await db.execute(delete(Post).where(Post.id == post_id))
+            await db.commit()
+
+        # существование проверяет сама вставка комментария
+        resp = await ac.post(f"/posts/{post_id}/comments", json={"content": "late"}, headers=user["headers"])
+        assert resp.status_code == 404
+        async with async_session_maker() as db:
+            assert (await db.execute(select(Comment).where(Comment.post_id == post_id))).first() is None
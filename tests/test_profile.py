@@ -0,0 +1,59 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import update
+
+from social_mini.crud.counters import reconcile_user_counters
+from social_mini.database import async_session_maker
+from social_mini.main import app
+from social_mini.models.user import User
+
+
+@pytest.mark.asyncio
+async def test_profile_counters_follow_writes(register_and_login, assert_max_queries):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        author = await register_and_login(ac, "prof_author")
+        fans = [await register_and_login(ac, f"prof_fan{i}") for i in range(2)]
+
+        with assert_max_queries(1):
+            resp = await ac.get(f"/users/{author['id']}")
+        assert resp.status_code == 200
+        assert resp.json() == {
+            "id": author["id"], "username": author["username"], "first_name": "Test", "last_name": "User",
+            "followers_count": 0, "following_count": 0, "posts_count": 0,
+        }
+        # повторный просмотр — из кэша
+        with assert_max_queries(0):
+            await ac.get(f"/users/{author['id']}")
+
+        for fan in fans:
+            await ac.post(f"/users/{author['id']}/follow", headers=fan["headers"])
+        # повторная подписка счётчик не трогает
+        await ac.post(f"/users/{author['id']}/follow", headers=fans[0]["headers"])
+        await ac.delete(f"/users/{author['id']}/follow", headers=fans[1]["headers"])
+        post_ids = [
+            (await ac.post("/posts/", json={"title": t, "content": "c"}, headers=author["headers"])).json()["id"]
+            for t in ("one", "two")
+        ]
+        await ac.delete(f"/posts/{post_ids[0]}", headers=author["headers"])
+
+        profile = (await ac.get(f"/users/{author['id']}")).json()
+        assert (profile["followers_count"], profile["following_count"], profile["posts_count"]) == (1, 0, 1)
+        profile = (await ac.get(f"/users/{fans[0]['id']}")).json()
+        assert (profile["followers_count"], profile["following_count"]) == (0, 1)
+
+        assert (await ac.get("/users/999999999")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_reconcile_user_counters(register_and_login):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        author = await register_and_login(ac, "prof_drift")
+        fan = await register_and_login(ac, "prof_drift_fan")
+        await ac.post(f"/users/{author['id']}/follow", headers=fan["headers"])
+
+    async with async_session_maker() as db:
+        await db.execute(update(User).where(User.id == author["id"]).values(followers_count=42, posts_count=-1))
+        await db.commit()
+        assert await reconcile_user_counters(db, batch_size=2) >= 1
+        user = await db.get(User, author["id"])
+        assert (user.followers_count, user.posts_count) == (1, 0)
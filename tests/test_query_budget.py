@@ -0,0 +1,76 @@
+import logging
+
+import pytest
+from httpx import AsyncClient
+
+from social_mini.core import config
+from social_mini.core.profiler import QueryProfilerMiddleware, profile_queries, statement_shape
+from social_mini.crud.upsert import supports_dml_cte
+from social_mini.database import engine
+from social_mini.main import app
+
+
+def test_statement_shape_ignores_values():
+    assert statement_shape("SELECT * FROM posts WHERE id = $1") == statement_shape(
+        "SELECT  *\nFROM posts WHERE id = $7")
+    assert statement_shape("SELECT * FROM likes WHERE post_id IN (?, ?, ?)") == statement_shape(
+        "SELECT * FROM likes WHERE post_id IN (?)")
+    assert "::INTEGER" in statement_shape("SELECT $1::INTEGER")
+
+
+@pytest.mark.asyncio
+async def test_query_budgets(register_and_login, assert_max_queries):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        author = await register_and_login(ac, "qb_author")
+        reader = await register_and_login(ac, "qb_reader")
+        ids = []
+        for i in range(5):
+            resp = await ac.post("/posts/", json={"title": f"t{i}", "content": "c"}, headers=author["headers"])
+            ids.append(resp.json()["id"])
+
+        # токен и пользователь уже в кэше — get_current_user не ходит в БД
+        with assert_max_queries(3):
+            resp = await ac.post(f"/posts/{ids[0]}/like", headers=reader["headers"])
+        assert resp.status_code == 201
+
+        # счётчики подписок на PostgreSQL меняет тот же запрос (CTE), на остальных — отдельный UPDATE
+        with assert_max_queries(2 if supports_dml_cte(engine.dialect.name) else 3):
+            resp = await ac.post(f"/users/{author['id']}/follow", headers=reader["headers"])
+        assert resp.status_code == 201
+
+        with assert_max_queries(2):
+            resp = await ac.get("/feed", headers=reader["headers"])
+        assert len(resp.json()) == 5
+
+        # число запросов не зависит от размера страницы
+        with assert_max_queries(4) as profile:
+            resp = await ac.get("/posts/?expand=true&comments=3", headers=reader["headers"])
+        assert resp.status_code == 200
+        assert not profile.n_plus_one()
+
+
+@pytest.mark.asyncio
+async def test_n_plus_one_reported_in_debug(monkeypatch, caplog, register_and_login):
+    monkeypatch.setattr(config, "DEBUG", True)
+    profiled = QueryProfilerMiddleware(app)
+    async with AsyncClient(app=profiled, base_url="http://test") as ac:
+        user = await register_and_login(ac, "qb_debug")
+        resp = await ac.get("/posts/")
+        assert "x-query-count" not in resp.headers
+
+        resp = await ac.get("/posts/", headers={"X-Query-Profile": "1"})
+        assert int(resp.headers["x-query-count"]) >= 1
+        assert resp.headers["server-timing"].startswith("db;dur=")
+
+        # нарочно N+1: по запросу на каждый id
+        with profile_queries() as profile:
+            for _ in range(config.QUERY_PROFILE_N_PLUS_ONE):
+                await ac.get(f"/users/batch?ids={user['id']}")
+        assert list(profile.n_plus_one().values()) == [config.QUERY_PROFILE_N_PLUS_ONE]
+
+    with caplog.at_level(logging.WARNING, logger="social_mini.core.profiler"):
+        async with AsyncClient(app=profiled, base_url="http://test") as ac:
+            monkeypatch.setattr(config, "QUERY_PROFILE_N_PLUS_ONE", 1)
+            resp = await ac.get("/posts/", headers={"X-Query-Profile": "1"})
+    assert resp.headers["x-query-n-plus-one"] == "1"
+    assert "Possible N+1" in caplog.text
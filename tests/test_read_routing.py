@@ -0,0 +1,113 @@
+from datetime import timedelta
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from social_mini import database
+from social_mini.core import config, security
+from social_mini.core.cache import MemoryBackend
+from social_mini.core.profiler import profile_queries
+from social_mini.crud import user as user_crud
+from social_mini.crud.user import profile_cache
+from social_mini.main import app, instrument_engine
+from social_mini.models import Base
+
+
+@pytest_asyncio.fixture
+async def replica(tmp_path, monkeypatch):
+    """
+    Вторая база — отдельный SQLite-файл, в который ничего не реплицируется:
+    так видно, с какой базы читал эндпоинт.
+    """
+    read_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}", poolclass=NullPool)
+    async with read_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    instrument_engine(read_engine)
+    monkeypatch.setattr(database, "read_engine", read_engine)
+    monkeypatch.setattr(database, "read_session_maker", sessionmaker(
+        read_engine, class_=AsyncSession, expire_on_commit=False))
+    monkeypatch.setattr(database, "recent_writes", MemoryBackend(100, 60))
+    yield read_engine
+    await read_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_replica_except_right_after_write(replica, register_and_login):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        user = await register_and_login(ac, "rr_writer")
+        resp = await ac.post("/posts/", json={"title": "fresh", "content": "c"}, headers=user["headers"])
+        post_id = resp.json()["id"]
+
+        # автор только что писал — читает с основной базы и видит свой пост
+        resp = await ac.get("/posts/", headers=user["headers"])
+        assert post_id in [p["id"] for p in resp.json()]
+        resp = await ac.get(f"/posts/{post_id}/comments", headers=user["headers"])
+        assert resp.status_code == 200
+
+        # аноним читает с реплики, где поста ещё нет; запросы к ней тоже считаются
+        with profile_queries() as profile:
+            resp = await ac.get("/posts/")
+        assert resp.json() == []
+        assert profile.count >= 1
+
+        # окно закончилось — автор тоже на реплике
+        await database.recent_writes.clear()
+        resp = await ac.get("/posts/", headers=user["headers"])
+        assert resp.json() == []
+
+        # новая запись снова закрепляет за основной базой
+        await ac.post(f"/posts/{post_id}/like", headers=user["headers"])
+        resp = await ac.get(f"/posts/{post_id}/likes", headers=user["headers"])
+        assert resp.json()["likes_count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_single_database_does_not_track_writes(register_and_login):
+    assert database.read_engine is database.engine
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        user = await register_and_login(ac, "rr_single")
+        await ac.post("/posts/", json={"title": "t", "content": "c"}, headers=user["headers"])
+    assert database.recent_writes.stats()["size"] == 0
+
+
+@pytest.mark.asyncio
+async def test_sticky_across_tokens_of_same_user(replica, register_and_login):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        user = await register_and_login(ac, "rr_devices")
+        post_id = (await ac.post("/posts/", json={"title": "t", "content": "c"}, headers=user["headers"])).json()["id"]
+
+        # второе устройство: другой токен того же пользователя
+        other = security.create_access_token({"sub": user["username"]}, timedelta(minutes=5))
+        resp = await ac.get("/posts/", headers={"Authorization": f"Bearer {other}"})
+        assert post_id in [p["id"] for p in resp.json()]
+
+
+@pytest.mark.asyncio
+async def test_replica_reads_skip_etag_and_cache_right_after_write(replica, register_and_login, monkeypatch):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        user = await register_and_login(ac, "rr_etag")
+        await ac.post("/posts/", json={"title": "t", "content": "c"}, headers=user["headers"])
+
+        # реплика ещё не видела запись: без ETag, чтобы старое тело не легло под новую метку
+        resp = await ac.get("/posts/")
+        assert "etag" not in resp.headers
+        # основная база — ETag как обычно
+        resp = await ac.get("/posts/", headers=user["headers"])
+        assert "etag" in resp.headers
+
+        monkeypatch.setattr(config, "READ_YOUR_WRITES_SECONDS", 0)
+        resp = await ac.get("/posts/")
+        assert "etag" in resp.headers
+
+    # сброшенную запись кэша (профиль автора после нового поста) не заполняет чтение с реплики
+    assert await profile_cache.get(user["id"]) == database.STALE_MARK
+    async with database.read_session_maker() as db:
+        assert await user_crud.get_profile(db, user["id"]) is None
+    assert await profile_cache.get(user["id"]) == database.STALE_MARK
+    async with database.async_session_maker() as db:
+        assert (await user_crud.get_profile(db, user["id"]))["posts_count"] == 1
+    assert (await profile_cache.get(user["id"]))["posts_count"] == 1
@@ -0,0 +1,75 @@
+import uuid
+
+import pytest
+from httpx import AsyncClient
+
+from social_mini.main import app
+
+
+@pytest.mark.asyncio
+async def test_search_posts(register_and_login):
+    word = "w" + uuid.uuid4().hex[:10]
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        user = await register_and_login(ac, "searcher")
+        in_title = (await ac.post("/posts/", json={"title": f"{word} news", "content": "body"},
+                                  headers=user["headers"])).json()
+        in_body = []
+        for i in range(3):
+            resp = await ac.post("/posts/", json={"title": f"other {i}", "content": f"about {word}"},
+                                 headers=user["headers"])
+            in_body.append(resp.json()["id"])
+
+        first = await ac.get(f"/posts/search?q={word}&limit=2")
+        assert first.status_code == 200
+        page = first.json()
+        # совпадение в заголовке весит больше
+        assert page[0]["id"] == in_title["id"]
+        assert page[0]["rank"] > page[1]["rank"]
+
+        second = await ac.get(f"/posts/search?q={word}&limit=2&cursor={first.headers['X-Next-Cursor']}")
+        found = [p["id"] for p in page + second.json()]
+        assert sorted(found) == sorted([in_title["id"], *in_body])
+        assert "X-Next-Cursor" not in second.headers
+
+        # правка и удаление сразу видны в поиске
+        await ac.put(f"/posts/{in_body[0]}", json={"title": "edited", "content": "nothing"},
+                     headers=user["headers"])
+        await ac.delete(f"/posts/{in_body[1]}", headers=user["headers"])
+        after = (await ac.get(f"/posts/search?q={word}")).json()
+        assert sorted(p["id"] for p in after) == sorted([in_title["id"], in_body[2]])
+
+        both = (await ac.get(f"/posts/search?q={word} news")).json()
+        assert [p["id"] for p in both] == [in_title["id"]]
+
+        bad = await ac.get(f"/posts/search?q={word}&cursor=garbage")
+    assert bad.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_search_rank_window(register_and_login, monkeypatch):
+    from social_mini.core import config
+
+    word = "w" + uuid.uuid4().hex[:10]
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        user = await register_and_login(ac, "windowed")
+        ids = []
+        for i in range(3):
+            resp = await ac.post("/posts/", json={"title": f"post {i}", "content": word},
+                                 headers=user["headers"])
+            ids.append(resp.json()["id"])
+
+        # по умолчанию через курсор доступны все совпадения
+        found, cursor = [], None
+        while True:
+            url = f"/posts/search?q={word}&limit=1" + (f"&cursor={cursor}" if cursor else "")
+            resp = await ac.get(url)
+            found += [p["id"] for p in resp.json()]
+            cursor = resp.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+        assert sorted(found) == sorted(ids)
+
+        # быстрый режим ранжирует только самые новые
+        monkeypatch.setattr(config, "SEARCH_RANK_WINDOW", 2)
+        windowed = (await ac.get(f"/posts/search?q={word}")).json()
+    assert sorted(p["id"] for p in windowed) == sorted(ids[1:])
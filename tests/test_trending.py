@@ -0,0 +1,159 @@
+import math
+import time
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import delete, select
+
+from social_mini.core.profiler import profile_queries
+from social_mini.crud import trending as trending_crud
+from social_mini.crud.trending import EPOCH, TopK, Trending
+from social_mini.database import async_session_maker
+from social_mini.main import app
+from social_mini.models.post_score import PostScore
+
+HOUR = {"hour": 3600}
+REAL_TIME = time.time
+
+
+def test_score_halves_every_half_life():
+    t = Trending(HOUR, capacity=10)
+    t.record(1, 4, now=EPOCH + 1000)
+    assert t.top("hour", 1, now=EPOCH + 1000)[0][1] == pytest.approx(4)
+    assert t.top("hour", 1, now=EPOCH + 1000 + 3600)[0][1] == pytest.approx(2)
+
+    # свежий лайк важнее четырёх двухчасовой давности
+    t.record(2, 1.5, now=EPOCH + 1000 + 7200)
+    assert [p for p, _ in t.top("hour", 2, now=EPOCH + 1000 + 7200)] == [2, 1]
+
+
+def test_late_unlike_subtracts_decayed_like():
+    t = Trending({"hour": 3600, "day": 86400}, capacity=10)
+    t0 = EPOCH + 1000
+    for _ in range(10):
+        t.record(1, 1, now=t0)
+    # лайк сняли через четыре часа: вычитается его вклад на момент постановки
+    t.record(1, -1, now=t0)
+    later = t0 + 4 * 3600
+    assert t.top("hour", 1, now=later) == [(1, pytest.approx(9 / 16))]
+    assert t.top("day", 1, now=later) == [(1, pytest.approx(9 * 2 ** (-4 / 24)))]
+
+
+def test_no_overflow_years_after_epoch():
+    t = Trending(HOUR, capacity=10)
+    now = EPOCH + 10 * 365 * 86400
+    t.record(1, 1, now=now)
+    t.record(1, 1, now=now)
+    [(post_id, score)] = t.top("hour", 1, now=now)
+    assert math.isfinite(score) and score == pytest.approx(2)
+
+
+def test_unlike_and_forget():
+    t = Trending(HOUR, capacity=10)
+    t.record(1, 1, now=EPOCH)
+    t.record(2, 2, now=EPOCH)
+    t.record(1, -1, now=EPOCH)
+    assert [p for p, _ in t.top("hour", 10, now=EPOCH)] == [2]
+    t.forget(2)
+    assert t.top("hour", 10, now=EPOCH) == []
+
+
+def test_topk_evicts_lowest():
+    top = TopK(2)
+    for post_id, key in [(1, 1.0), (2, 2.0), (3, 3.0), (1, 0.5)]:
+        top.update(post_id, key)
+    assert top.largest(5) == [(3, 3.0), (2, 2.0)]
+    # обновления одного поста не раздувают кучу бесконечно
+    for i in range(100):
+        top.update(3, 3.0 + i)
+    assert len(top._heap) <= 8
+
+
+@pytest.mark.asyncio
+async def test_trending_endpoint_does_not_read_likes(register_and_login):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        author = await register_and_login(ac, "tr_author")
+        fans = [await register_and_login(ac, f"tr_fan{i}") for i in range(2)]
+        ids = []
+        for title in ("quiet", "liked", "discussed"):
+            resp = await ac.post("/posts/", json={"title": title, "content": "c"}, headers=author["headers"])
+            ids.append(resp.json()["id"])
+        quiet, liked, discussed = ids
+        for fan in fans:
+            await ac.post(f"/posts/{liked}/like", headers=fan["headers"])
+        # комментарий весит вдвое больше лайка, снятый лайк вычитается
+        await ac.post(f"/posts/{discussed}/comments", json={"content": "!"}, headers=fans[0]["headers"])
+        await ac.post(f"/posts/{discussed}/comments", json={"content": "!"}, headers=fans[1]["headers"])
+        await ac.post(f"/posts/{quiet}/like", headers=fans[0]["headers"])
+        await ac.delete(f"/posts/{quiet}/like", headers=fans[0]["headers"])
+
+        with profile_queries() as profile:
+            resp = await ac.get("/posts/trending", params={"window": "hour", "limit": 100})
+        assert resp.status_code == 200
+        assert not any("likes" in s.lower().split("from", 1)[-1] for s, _ in profile.statements)
+
+        mine = [p for p in resp.json() if p["id"] in ids]
+        assert [p["id"] for p in mine] == [discussed, liked]
+        assert mine[0]["score"] == pytest.approx(4, rel=1e-3)
+        assert mine[1]["likes_count"] == 2
+
+        await ac.delete(f"/posts/{discussed}", headers=author["headers"])
+        resp = await ac.get("/posts/trending", params={"window": "hour", "limit": 100})
+        assert discussed not in [p["id"] for p in resp.json()]
+
+        assert (await ac.get("/posts/trending", params={"window": "year"})).status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_merges_processes_and_survives_restart(register_and_login):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        author = await register_and_login(ac, "tr_ckpt")
+        p1, p2 = [
+            (await ac.post("/posts/", json={"title": t, "content": "c"}, headers=author["headers"])).json()["id"]
+            for t in ("a", "b")
+        ]
+    async with async_session_maker() as db:
+        await db.execute(delete(PostScore))
+        await db.commit()
+
+    now = EPOCH + 86400
+    first, second = Trending(HOUR, capacity=10), Trending(HOUR, capacity=10)
+    first.record(p1, 1, now=now)
+    second.record(p1, 1, now=now)
+    second.record(p2, 1, now=now)
+    second.record(p2, -1, now=now)
+    async with async_session_maker() as db:
+        await first.checkpoint(db, now=now)
+        await second.checkpoint(db, now=now)
+        rows = (await db.execute(select(PostScore.post_id, PostScore.period))).all()
+    assert rows == [(p1, "hour")]
+    # второй процесс после контрольной точки видит лайк первого
+    assert second.top("hour", 10, now=now) == [(p1, pytest.approx(2))]
+
+    restarted = Trending(HOUR, capacity=10)
+    async with async_session_maker() as db:
+        await restarted.checkpoint(db, now=now + 3600)
+    assert restarted.top("hour", 10, now=now + 3600) == [(p1, pytest.approx(1))]
+
+    # счёт затух ниже TRENDING_MIN_SCORE — строка удаляется
+    async with async_session_maker() as db:
+        await restarted.checkpoint(db, now=now + 10 * 3600)
+        assert (await db.execute(select(PostScore.post_id))).all() == []
+    assert restarted.top("hour", 10, now=now + 10 * 3600) == []
+
+
+@pytest.mark.asyncio
+async def test_unlike_hours_later_keeps_other_likes(register_and_login, monkeypatch):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        author = await register_and_login(ac, "tr_late")
+        fans = [await register_and_login(ac, f"tr_late_fan{i}") for i in range(3)]
+        post_id = (await ac.post("/posts/", json={"title": "t", "content": "c"}, headers=author["headers"])).json()["id"]
+        for fan in fans:
+            await ac.post(f"/posts/{post_id}/like", headers=fan["headers"])
+
+        # снимаем лайк «через четыре часа»: время события берётся из likes.created_at
+        with monkeypatch.context() as m:
+            m.setattr(time, "time", lambda: REAL_TIME() + 4 * 3600)
+            await ac.delete(f"/posts/{post_id}/like", headers=fans[0]["headers"])
+        scores = dict(trending_crud.trending.top("hour", 1000, now=REAL_TIME() + 4 * 3600))
+    assert scores[post_id] == pytest.approx(2 / 16, rel=0.01)